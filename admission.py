@@ -0,0 +1,209 @@
+"""
+Admission Control - per-client rate limits and a cache-aware fast lane
+Every request spends a token from its client's bucket. Requests that local
+caches can answer go straight through (the fast lane); requests that need
+upstream calls take one of a few slow-lane slots, waiting in a bounded queue
+served round-robin across clients, so a burst of cache misses from one
+client neither starves cached answers nor other clients' misses.
+
+Needs a threaded server (gunicorn --worker-class gthread, or the Flask
+development server), since the queue holds requests inside one process.
+
+Environment:
+    ADMISSION_CONTROL           set to 1 to enable (off by default)
+    ADMISSION_RATE_PER_MINUTE   requests per client per minute (default 60)
+    ADMISSION_BURST             requests a client may send at once (default 20)
+    ADMISSION_SLOW_SLOTS        concurrent requests needing upstream calls (default 4)
+    ADMISSION_MAX_QUEUE         slow-lane requests allowed to wait (default 32)
+    ADMISSION_QUEUE_TIMEOUT     longest wait for a slow-lane slot in seconds (default 5)
+    ADMISSION_CLIENT_HEADER     header identifying the client, e.g. X-Forwarded-For
+                                behind a proxy (default: the peer address)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+from token_bucket import TokenBucket
+
+# Buckets kept before idle (full) ones are forgotten
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Request turned away; carries the HTTP status and a Retry-After hint"""
+
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("client", "granted")
+
+    def __init__(self, client: str):
+        self.client = client
+        self.granted = False
+
+
+class AdmissionController:
+    """Per-client token buckets in front of a fair-share slow lane"""
+
+    def __init__(self, rate_per_minute: float = 60, burst: float = 20, slow_slots: int = 4,
+                 max_queue: int = 32, queue_timeout: float = 5.0, client_header: Optional[str] = None):
+        """
+        Args:
+            rate_per_minute: Sustained requests allowed per client
+            burst: Requests a client may send back to back
+            slow_slots: Requests needing upstream calls processed at once
+            max_queue: Slow-lane requests allowed to wait; a single client may
+                       hold at most a quarter of the queue
+            queue_timeout: Longest wait for a slow-lane slot, in seconds
+            client_header: Request header identifying the client (first
+                           comma-separated value), or None for the peer address
+        """
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.slow_slots = slow_slots
+        self.max_queue = max_queue
+        self.max_queued_per_client = max(1, max_queue // 4)
+        self.queue_timeout = queue_timeout
+        self.client_header = client_header
+        self.counts = {"fast": 0, "slow": 0, "rate_limited": 0, "queue_full": 0, "timed_out": 0}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        # Waiting tickets per client; clients are served in turn (round robin)
+        self._waiting: "OrderedDict[str, Deque[_Ticket]]" = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_env(cls) -> Optional["AdmissionController"]:
+        """Controller configured from the environment, or None unless ADMISSION_CONTROL=1"""
+        if os.environ.get("ADMISSION_CONTROL") != "1":
+            return None
+        return cls(
+            rate_per_minute=float(os.environ.get("ADMISSION_RATE_PER_MINUTE", 60)),
+            burst=float(os.environ.get("ADMISSION_BURST", 20)),
+            slow_slots=int(os.environ.get("ADMISSION_SLOW_SLOTS", 4)),
+            max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", 32)),
+            queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", 5)),
+            client_header=os.environ.get("ADMISSION_CLIENT_HEADER") or None,
+        )
+
+    def client_id(self, request) -> str:
+        """Client a Flask request is accounted to"""
+        if self.client_header:
+            value = request.headers.get(self.client_header, "")
+            client = value.split(",")[0].strip()
+            if client:
+                return client
+        return request.remote_addr or "unknown"
+
+    def _bucket(self, client: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                if len(self._buckets) >= MAX_TRACKED_CLIENTS:
+                    # Full buckets belong to idle clients; a new bucket starts full anyway
+                    self._buckets = {key: value for key, value in self._buckets.items()
+                                     if value.available() < value.capacity}
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    @contextmanager
+    def admit(self, client: str, fast: bool, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Admit a request for the duration of the with block
+
+        Args:
+            client: Client identifier (see client_id)
+            fast: The request can be answered from local caches
+            timeout: Longest wait for a slow-lane slot (capped at queue_timeout),
+                     e.g. the remaining request deadline
+
+        Yields:
+            The lane the request was admitted to, "fast" or "slow"
+
+        Raises:
+            AdmissionRejected: 429 when the client is over its rate, 503 when
+                the slow lane is full or no slot freed up in time
+        """
+        bucket = self._bucket(client)
+        if not bucket.try_acquire():
+            self.counts["rate_limited"] += 1
+            raise AdmissionRejected(429, "Too many requests, please slow down", bucket.wait_time())
+        if fast:
+            self.counts["fast"] += 1
+            yield "fast"
+            return
+
+        wait = self.queue_timeout if timeout is None else max(0.0, min(timeout, self.queue_timeout))
+        self._acquire_slot(client, wait)
+        self.counts["slow"] += 1
+        try:
+            yield "slow"
+        finally:
+            self._release_slot()
+
+    def _acquire_slot(self, client: str, wait: float) -> None:
+        with self._condition:
+            if self._active < self.slow_slots and not self._queued:
+                self._active += 1
+                return
+            tickets = self._waiting.get(client)
+            if self._queued >= self.max_queue or (tickets and len(tickets) >= self.max_queued_per_client):
+                self.counts["queue_full"] += 1
+                raise AdmissionRejected(503, "Server busy, please retry shortly", self.queue_timeout)
+
+            ticket = _Ticket(client)
+            if tickets is None:
+                tickets = self._waiting[client] = deque()
+            tickets.append(ticket)
+            self._queued += 1
+            give_up_at = time.monotonic() + wait
+            while not ticket.granted:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    self._withdraw(ticket)
+                    self.counts["timed_out"] += 1
+                    raise AdmissionRejected(503, "Server busy, please retry shortly", self.queue_timeout)
+                self._condition.wait(remaining)
+
+    def _withdraw(self, ticket: _Ticket) -> None:
+        tickets = self._waiting.get(ticket.client)
+        if tickets is not None:
+            tickets.remove(ticket)
+            self._queued -= 1
+            if not tickets:
+                del self._waiting[ticket.client]
+
+    def _release_slot(self) -> None:
+        with self._condition:
+            self._active -= 1
+            granted = False
+            while self._active < self.slow_slots and self._waiting:
+                # Next client in turn gets its oldest ticket, then goes to the back
+                client, tickets = self._waiting.popitem(last=False)
+                ticket = tickets.popleft()
+                self._queued -= 1
+                if tickets:
+                    self._waiting[client] = tickets
+                ticket.granted = True
+                self._active += 1
+                granted = True
+            if granted:
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                **self.counts,
+                "active": self._active,
+                "queued": self._queued,
+                "clients": len(self._buckets),
+            }
@@ -1,11 +1,201 @@
 """
 Flask Web Server for Multi-Agent Tourism System
 """
-from flask import Flask, request, jsonify, render_template_string
-from tourism_agent import TourismAgent
+import hashlib
+import math
+import os
+import threading
+import time
+from contextlib import ExitStack
+from flask import Flask, request, jsonify, render_template_string, g
+from traffic_capture import TrafficCapture
+from profiling import Profiler, request_task
+from response_encoding import Compressor, NegotiatingJSONProvider
+from admission import AdmissionController, AdmissionRejected
+from job_store import JobStore
 
 app = Flask(__name__)
-agent = TourismAgent()
+# orjson serialization, and MessagePack for clients that ask for it
+app.json = NegotiatingJSONProvider(app)
+
+# The agent (and with it requests and the agent modules) is built on first use,
+# so cold starts serving /, /health or static routes skip that work entirely
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_agent():
+    """Tourism agent shared by all requests, constructed on first call"""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                from tourism_agent import TourismAgent
+                _agent = TourismAgent()
+    return _agent
+
+# Sampled JSONL log of /query traffic for replay_traffic.py (off unless CAPTURE_PATH is set)
+capture = TrafficCapture.from_env()
+# Sampling profiler for live requests (off unless PROFILE_SAMPLE_RATE or PROFILE_TOKEN is set)
+profiler = Profiler.from_env()
+
+if profiler is not None:
+    @app.before_request
+    def start_profile():
+        if profiler.wants(request.path, request.headers):
+            g.profile = profiler.start(request.path)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profiler.finish(profile)
+        return response
+
+    @app.teardown_request
+    def abandon_profile(error=None):
+        # after_request is skipped when a request fails with an unhandled error
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profiler.finish(profile)
+
+# gzip/zstd for bodies above COMPRESS_MIN_BYTES (on unless RESPONSE_COMPRESSION=0)
+compressor = Compressor.from_env()
+
+if compressor is not None:
+    @app.after_request
+    def compress_response(response):
+        return compressor.apply(response, request)
+
+# Per-client rate limits and a fast lane for cached answers (off unless ADMISSION_CONTROL=1)
+admission = AdmissionController.from_env()
+
+# Slow /query requests continue in the background as pollable jobs (off unless ASYNC_AFTER_SECONDS is set)
+jobs = JobStore.from_env()
+
+# Overall time budget per endpoint, in seconds
+ENDPOINT_DEADLINES = {
+    'query': float(os.environ.get('QUERY_DEADLINE_SECONDS', 20)),
+    # Jobs no longer hold a request open, so they may run longer
+    'job': float(os.environ.get('JOB_DEADLINE_SECONDS', 60)),
+}
+
+# How long past its max-age the web page may show a cached answer while it revalidates
+CLIENT_STALE_SECONDS = int(os.environ.get('CLIENT_STALE_SECONDS', 86400))
+
+# Service worker for the web page: keeps the page shell for offline use, and
+# answers repeat /query requests from a client-side cache keyed by the
+# normalized query, honouring the Cache-Control freshness of each answer
+# (max-age, then stale-while-revalidate) and revalidating in the background
+SERVICE_WORKER_JS = """
+const VERSION = '{{ version }}';
+const SHELL_CACHE = `shell-${VERSION}`;
+const ANSWER_CACHE = 'answers-v1';
+const MAX_ANSWERS = 100;
+
+function normalizeQuery(text) {
+    return (text || '').toLowerCase().replace(/[\\s]+/g, ' ').replace(/[?!.,\\s]+$/, '').trim();
+}
+
+function answerKey(body) {
+    const key = normalizeQuery(body.query) + '|' + normalizeQuery(body.place);
+    return new Request(`/__answers?key=${encodeURIComponent(key)}`);
+}
+
+function freshness(response) {
+    const directives = {};
+    (response.headers.get('Cache-Control') || '').split(',').forEach(part => {
+        const [name, value] = part.trim().split('=');
+        directives[name] = parseInt(value) || 0;
+    });
+    return { maxAge: (directives['max-age'] || 0) * 1000, stale: (directives['stale-while-revalidate'] || 0) * 1000 };
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.add('/')).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys().then(names => Promise.all(
+        names.filter(name => name.startsWith('shell-') && name !== SHELL_CACHE).map(name => caches.delete(name))
+    )).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    if (url.origin !== self.location.origin) return;
+    if (event.request.method === 'GET' && url.pathname === '/') {
+        // Network first so deploys show up; the cached shell when offline
+        event.respondWith(fetch(event.request).then(response => {
+            if (response.ok) {
+                const copy = response.clone();
+                caches.open(SHELL_CACHE).then(cache => cache.put('/', copy));
+            }
+            return response;
+        }).catch(() => caches.match('/', { cacheName: SHELL_CACHE })));
+    } else if (event.request.method === 'POST' && url.pathname === '/query') {
+        event.respondWith(answer(event));
+    }
+});
+
+async function answer(event) {
+    const body = await event.request.clone().json().catch(() => null);
+    if (!body) return fetch(event.request);
+    const key = answerKey(body);
+    const cache = await caches.open(ANSWER_CACHE);
+    const cached = await cache.match(key);
+    const network = () => fetch(event.request.clone()).then(response => store(cache, key, response));
+
+    if (cached) {
+        const age = Date.now() - parseInt(cached.headers.get('X-Cached-At') || '0');
+        const { maxAge, stale } = freshness(cached);
+        const fresh = age < maxAge;
+        if (fresh || age < maxAge + stale) {
+            // A session still has to learn about the place asked for, so
+            // conversations revalidate even fresh answers
+            if (!fresh || body.session_id) {
+                event.waitUntil(network().then(response => notify(body, response)).catch(() => {}));
+            }
+            return labelled(cached, fresh ? 'fresh' : 'stale');
+        }
+        // Too old to show without asking; still better than nothing offline
+        return network().catch(() => labelled(cached, 'stale'));
+    }
+    return network();
+}
+
+async function store(cache, key, response) {
+    // Errors (e.g. 429/503 under load) and pending jobs leave a cached answer in place
+    if (response.status !== 200) return response;
+    if (freshness(response).maxAge > 0) {
+        const headers = new Headers(response.headers);
+        headers.set('X-Cached-At', String(Date.now()));
+        // The stored body is already decoded
+        headers.delete('Content-Encoding');
+        headers.delete('Content-Length');
+        await cache.put(key, new Response(await response.clone().blob(), { status: response.status, headers }));
+        const keys = await cache.keys();
+        // Keys come back in insertion order: drop the oldest answers
+        await Promise.all(keys.slice(0, Math.max(0, keys.length - MAX_ANSWERS)).map(old => cache.delete(old)));
+    } else {
+        await cache.delete(key);
+    }
+    return response;
+}
+
+function labelled(response, state) {
+    const headers = new Headers(response.headers);
+    headers.set('X-Client-Cache', state);
+    return new Response(response.body, { status: response.status, headers });
+}
+
+async function notify(body, response) {
+    if (!response.ok) return;
+    const data = await response.clone().json();
+    const clients = await self.clients.matchAll({ type: 'window' });
+    clients.forEach(client => client.postMessage({ type: 'answer-updated', query: body.query, place: body.place || null, data }));
+}
+"""
 
 # HTML template for the web interface
 HTML_TEMPLATE = """
@@ -428,8 +618,55 @@ HTML_TEMPLATE = """
             } else {
                 charCounter.style.color = '#9ca3af';
             }
+            selectedPlace = null;
+            fetchSuggestions(e.target.value);
         });
         
+        // Conversation context for follow-ups ("what about tomorrow?"); the
+        // server assigns the id on the first query
+        let sessionId = null;
+        
+        // Place autocomplete: a chosen suggestion is sent as 'place' so the
+        // server can skip place extraction and geocoding
+        let selectedPlace = null;
+        let suggestions = [];
+        let suggestController = null;
+        
+        async function fetchSuggestions(text) {
+            const q = text.trim();
+            if (suggestController) suggestController.abort();
+            if (!q) {
+                displayHistory();
+                return;
+            }
+            suggestController = new AbortController();
+            try {
+                const response = await fetch(`/suggest?q=${encodeURIComponent(q)}`, { signal: suggestController.signal });
+                const data = await response.json();
+                suggestions = data.suggestions || [];
+                displaySuggestions();
+            } catch (error) {
+                // Aborted by a newer keystroke, or offline: keep what is shown
+            }
+        }
+        
+        function displaySuggestions() {
+            if (suggestions.length === 0) {
+                historyDropdown.style.display = 'none';
+                return;
+            }
+            historyDropdown.innerHTML = suggestions.map((item, i) =>
+                `<div class="history-item" onmousedown="selectSuggestion(${i})">
+                    <span>📍 ${escapeHtml(item.name)}</span>
+                </div>`
+            ).join('');
+            historyDropdown.style.display = 'block';
+        }
+        
+        function selectSuggestion(i) {
+            quickSearch(suggestions[i].name);
+        }
+        
         // Search history management
         function getSearchHistory() {
             const history = localStorage.getItem('searchHistory');
@@ -488,6 +725,8 @@ HTML_TEMPLATE = """
         // Quick search
         function quickSearch(city) {
             userInput.value = `I'm going to ${city}, what is the temperature there? And what are the places I can visit?`;
+            selectedPlace = city;
+            historyDropdown.style.display = 'none';
             document.getElementById('queryForm').dispatchEvent(new Event('submit', { cancelable: true, bubbles: true }));
         }
         
@@ -556,19 +795,26 @@ HTML_TEMPLATE = """
             
             // Save to history
             saveToHistory(input);
+            lastAsked = { query: normalizeQuery(input), place: normalizeQuery(selectedPlace) };
             
             responseDiv.textContent = '';
             responseDiv.classList.remove('fade-in');
             loadingDiv.style.display = 'block';
             
             try {
-                const response = await fetch('/query', {
+                let response = await fetch('/query', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
                     },
-                    body: JSON.stringify({ query: input })
+                    body: JSON.stringify(selectedPlace
+                        ? { query: input, place: selectedPlace, session_id: sessionId }
+                        : { query: input, session_id: sessionId })
                 });
+                if (response.status === 202) {
+                    // Slow lookup handed to a background job: poll for the answer
+                    response = await waitForJob((await response.json()).job_id);
+                }
                 
                 if (!response.ok) {
                     throw new Error(`Server error: ${response.status}`);
@@ -576,39 +822,7 @@ HTML_TEMPLATE = """
                 
                 const data = await response.json();
                 loadingDiv.style.display = 'none';
-                
-                if (data.success && data.response) {
-                    const responseText = data.response;
-                    
-                    // Extract temperature for weather icon
-                    let weatherIcon = '';
-                    const tempMatch = responseText.match(/(\d+)°C/);
-                    if (tempMatch) {
-                        const temp = parseInt(tempMatch[1]);
-                        weatherIcon = `<span class="weather-icon">${getWeatherIcon(temp)}</span>`;
-                    }
-                    
-                    responseDiv.innerHTML = `
-                        <div class="response-actions">
-                            <div class="action-btn" onclick="copyToClipboard(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
-                                📋 Copy
-                            </div>
-                            <div class="action-btn" onclick="shareResults(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
-                                🔗 Share
-                            </div>
-                            <div class="action-btn" onclick="exportResults(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
-                                💾 Export
-                            </div>
-                        </div>
-                        <div style="padding-right: 120px;">${weatherIcon}${escapeHtml(responseText)}</div>
-                    `;
-                    responseDiv.classList.add('fade-in');
-                } else {
-                    const errorMsg = data.error || 'No response received from server';
-                    responseDiv.textContent = '❌ Error: ' + errorMsg;
-                    responseDiv.style.borderLeftColor = '#ef4444';
-                    responseDiv.classList.add('fade-in');
-                }
+                renderAnswer(data);
             } catch (error) {
                 loadingDiv.style.display = 'none';
                 const errorMsg = error.message || 'Network error occurred';
@@ -618,12 +832,87 @@ HTML_TEMPLATE = """
             }
         });
         
+        async function waitForJob(jobId) {
+            for (let attempt = 0; attempt < 120; attempt++) {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                const response = await fetch(`/jobs/${jobId}`);
+                if (response.status !== 202) return response;
+            }
+            throw new Error('The request is taking too long, please try again later');
+        }
+        
+        // Show an answer (also called again when a cached answer is revalidated)
+        function renderAnswer(data) {
+            const responseDiv = document.getElementById('response');
+            if (data.session_id) sessionId = data.session_id;
+            
+            if (data.success && data.response) {
+                const responseText = data.response;
+                shownResponse = responseText;
+                
+                // Extract temperature for weather icon
+                let weatherIcon = '';
+                const tempMatch = responseText.match(/(\d+)°C/);
+                if (tempMatch) {
+                    const temp = parseInt(tempMatch[1]);
+                    weatherIcon = `<span class="weather-icon">${getWeatherIcon(temp)}</span>`;
+                }
+                
+                responseDiv.innerHTML = `
+                    <div class="response-actions">
+                        <div class="action-btn" onclick="copyToClipboard(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
+                            📋 Copy
+                        </div>
+                        <div class="action-btn" onclick="shareResults(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
+                            🔗 Share
+                        </div>
+                        <div class="action-btn" onclick="exportResults(\`${responseText.replace(/`/g, '\\`').replace(/\$/g, '\\$')}\`)">
+                            💾 Export
+                        </div>
+                    </div>
+                    <div style="padding-right: 120px;">${weatherIcon}${escapeHtml(responseText)}</div>
+                `;
+                responseDiv.classList.add('fade-in');
+            } else {
+                const errorMsg = data.error || 'No response received from server';
+                responseDiv.textContent = '❌ Error: ' + errorMsg;
+                responseDiv.style.borderLeftColor = '#ef4444';
+                responseDiv.classList.add('fade-in');
+            }
+        }
+        
         function escapeHtml(text) {
             const div = document.createElement('div');
             div.textContent = text;
             return div.innerHTML;
         }
         
+        // Client-side answer cache and offline page (see /sw.js): repeat
+        // queries render from the cache, and a newer answer found while
+        // revalidating replaces the one on screen
+        let lastAsked = null;
+        let shownResponse = null;
+        
+        function normalizeQuery(text) {
+            return (text || '').toLowerCase().replace(/[\\s]+/g, ' ').replace(/[?!.,\\s]+$/, '').trim();
+        }
+        
+        if ('serviceWorker' in navigator) {
+            navigator.serviceWorker.register('/sw.js').catch(() => {});
+            navigator.serviceWorker.addEventListener('message', event => {
+                const message = event.data || {};
+                if (message.type !== 'answer-updated' || !lastAsked) return;
+                if (normalizeQuery(message.query) === lastAsked.query &&
+                        normalizeQuery(message.place) === lastAsked.place) {
+                    if (message.data.response && message.data.response !== shownResponse) {
+                        renderAnswer(message.data);
+                    } else if (message.data.session_id) {
+                        sessionId = message.data.session_id;
+                    }
+                }
+            });
+        }
+        
         // Load history on page load
         displayHistory();
     </script>
@@ -636,9 +925,23 @@ def index():
     """Serve the main web interface"""
     return render_template_string(HTML_TEMPLATE)
 
+# A new page or worker changes the version, so the worker replaces the cached shell
+SERVICE_WORKER_VERSION = hashlib.sha1((HTML_TEMPLATE + SERVICE_WORKER_JS).encode('utf-8')).hexdigest()[:12]
+
+@app.route('/sw.js')
+def service_worker():
+    """Serve the web page's service worker"""
+    response = app.response_class(render_template_string(SERVICE_WORKER_JS, version=SERVICE_WORKER_VERSION),
+                                  mimetype='application/javascript')
+    # Browsers check for a new worker on each visit
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/query', methods=['POST'])
 def query():
     """Handle API queries"""
+    started_at = time.time()
+    user_input, place, result = '', None, None
     try:
         data = request.get_json()
         if not data:
@@ -646,50 +949,231 @@ def query():
                 'success': False,
                 'error': 'Invalid request data'
             }), 400
-            
+        if (not isinstance(data, dict) or not isinstance(data.get('query', ''), str)
+                or not isinstance(data.get('place') or '', str)):
+            return jsonify({
+                'success': False,
+                'error': 'query and place must be strings'
+            }), 400
+
         user_input = data.get('query', '').strip()
+        # Place picked from /suggest; skips extraction and geocoding
+        place = (data.get('place') or '').strip() or None
         
-        if not user_input:
+        if not user_input and not place:
             return jsonify({
                 'success': False,
                 'error': 'Please provide a query'
             }), 400
         
-        # Process the request using the tourism agent
-        response = agent.process_request(user_input)
+        # Process the request using the tourism agent within the endpoint's budget
+        from deadline import Deadline
+        agent = get_agent()
+        # Conversation context: sent as null to start one, then echoed back
+        session = agent.sessions.get_or_create(data.get('session_id')) if 'session_id' in data else None
+        client, fast = None, False
+        if admission is not None:
+            client = admission.client_id(request)
+        if admission is not None or jobs is not None:
+            fast = agent.answerable_from_cache(user_input or place, place, session)
         
-        if not response:
-            return jsonify({
-                'success': False,
-                'error': 'No response generated'
-            }), 500
+        if jobs is None or fast:
+            # Cache-answerable requests never wait behind slow ones for a job worker
+            deadline = Deadline(ENDPOINT_DEADLINES['query'])
+            result = answer_query(agent, user_input or place, place, session, deadline, client, fast)
+        else:
+            deadline = Deadline(ENDPOINT_DEADLINES['job'])
+            # Queue for a slow-lane slot here, so job workers only run admitted work
+            admitted = admit_query(client, fast, deadline)
+            job = jobs.submit(request_task(run_job), admitted, agent, user_input, place, session, deadline,
+                              started_at)
+            if job is None:
+                admitted.close()
+                raise AdmissionRejected(503, "Server busy, please retry shortly", jobs.async_after)
+            if not job.wait(jobs.async_after):
+                # Still running: the client polls /jobs/<id>; run_job captures the outcome
+                return job_pending(job)
+            return job_response(job)
         
-        return jsonify({
-            'success': True,
-            'response': response
-        })
+        response = query_response(result)
+        capture_query(user_input, place, result, response.status_code, started_at)
+        return response
         
+    except AdmissionRejected as e:
+        return rejected_response(e)
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
         print(f"Error in query endpoint: {error_trace}")
+        capture_query(user_input, place, result, 500, started_at)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def admit_query(client, fast, deadline):
+    """
+    Admit a query (see AdmissionController.admit); the returned ExitStack
+    holds its slow-lane slot until closed, possibly on another thread.
+    Without admission control the stack is empty.
+    """
+    admitted = ExitStack()
+    if admission is not None:
+        admitted.enter_context(admission.admit(client, fast, deadline.remaining()))
+    return admitted
+
+def answer_query(agent, user_input, place, session, deadline, client=None, fast=False):
+    """Run process_query, through admission control when it is enabled"""
+    with admit_query(client, fast, deadline):
+        result = agent.process_query(user_input, deadline, place, session)
+    result['session_id'] = session.id if session is not None else None
+    return result
+
+def run_job(admitted, agent, user_input, place, session, deadline, started_at):
+    """Job body: answer an admitted query, free its slot and capture the outcome"""
+    result, status = None, 500
+    try:
+        with admitted:
+            result = agent.process_query(user_input or place, deadline, place, session)
+        result['session_id'] = session.id if session is not None else None
+        status = 200 if result['response'] else 500
+        return result
+    finally:
+        capture_query(user_input, place, result, status, started_at)
+
+def query_response(result):
+    """JSON response for a process_query result"""
+    if not result['response']:
+        response = jsonify({
+            'success': False,
+            'error': 'No response generated'
+        })
+        response.status_code = 500
+        return response
+    
+    body = {
+        'success': True,
+        'response': result['response'],
+        'partial': result['partial'],
+        'missing': result['missing']
+    }
+    if result.get('session_id'):
+        body['session_id'] = result['session_id']
+    response = jsonify(body)
+    # Freshness for the web page's answer cache; POST responses are not cached by HTTP caches
+    if result['max_age'] > 0:
+        response.headers['Cache-Control'] = (f"private, max-age={result['max_age']}, "
+                                             f"stale-while-revalidate={CLIENT_STALE_SECONDS}")
+    else:
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def rejected_response(error):
+    """429/503 response for a request turned away under load"""
+    rejected = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    rejected.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return rejected, error.status
+
+def job_pending(job):
+    """202 response pointing the client at a running job"""
+    response = jsonify({
+        'success': True,
+        'status': 'pending',
+        'job_id': job.id
+    })
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job.id}"
+    response.headers['Retry-After'] = '1'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a /query request that became a job: 202 while running, then the /query response"""
+    job = jobs.get(job_id) if jobs is not None else None
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unknown or expired job'
+        }), 404
+    if job.status == 'pending':
+        return job_pending(job)
+    return job_response(job)
+
+def job_response(job):
+    """/query response of a finished job"""
+    if isinstance(job.error, AdmissionRejected):
+        return rejected_response(job.error)
+    if job.error is not None:
+        return jsonify({
+            'success': False,
+            'error': str(job.error)
+        }), 500
+    return query_response(job.result)
+
+@app.route('/cluster/query', methods=['POST'])
+def cluster_query():
+    """Answer a query forwarded by a cluster node that does not own its place"""
+    agent = get_agent()
+    if agent.cluster is None or not agent.cluster.authorized(request.headers):
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+    data = request.get_json(silent=True) or {}
+    from deadline import Deadline
+    from session_store import Session
+    # The forwarding node's remaining budget, never more than any endpoint allows
+    try:
+        budget = float(data.get('budget', ENDPOINT_DEADLINES['query']))
+    except (TypeError, ValueError):
+        budget = math.nan
+    if not 0 < budget < math.inf:
+        return jsonify({'success': False, 'error': 'Invalid budget'}), 400
+    budget = min(budget, max(ENDPOINT_DEADLINES.values()))
+    session = None
+    if data.get('session'):
+        session = Session()
+        session.restore(data.get('context'))
+    result = agent.process_query(data.get('query', ''), Deadline(budget), data.get('place'), session,
+                                 forwarded=True)
+    return jsonify({
+        'result': result,
+        'context': session.context() if session is not None else None
+    })
+
+def capture_query(user_input, place, result, status, started_at):
+    """Log a /query request to the traffic capture, if enabled and sampled"""
+    if capture is None or not capture.sampled():
+        return
+    try:
+        capture.record(user_input, place, result, status, started_at, (time.time() - started_at) * 1000)
+    except OSError as e:
+        print(f"Traffic capture error: {e}")
+
+@app.route('/suggest', methods=['GET'])
+def suggest():
+    """Autocomplete known place names for the text typed so far"""
+    prefix = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 5)), 1), 10)
+    except ValueError:
+        limit = 5
+    return jsonify({'suggestions': get_agent().place_suggester.suggest(prefix, limit)})
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({'status': 'healthy'}), 200
 
 if __name__ == '__main__':
-    import os
     port = int(os.environ.get('PORT', 5000))
     print("\n" + "="*60)
     print("Starting Multi-Agent Tourism System Server...")
     print("="*60)
     print(f"\nServer will be available at: http://localhost:{port}")
     print("Press Ctrl+C to stop the server\n")
+    # A long-running server pays agent construction up front instead of on the first request
+    get_agent()
     app.run(host='0.0.0.0', port=port, debug=False)
 
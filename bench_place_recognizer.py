@@ -0,0 +1,144 @@
+"""
+Place recognizer benchmark
+Runs a labelled corpus of queries through the gazetteer recognizer (with
+the pattern cascade as fallback) and through the pattern cascade alone,
+reporting extraction accuracy, time per query and the misses of each
+
+Usage:
+    python bench_place_recognizer.py --repeat 200 --show-misses
+"""
+import argparse
+import time
+from typing import Callable, List, Optional, Tuple
+
+from known_places import PLACE_ALIASES
+
+# (query, expected place or None); aliases count as their canonical place
+CORPUS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("I'm going to Bangalore, what is the temperature there?", "Bangalore"),
+    ("I'm going to go to Bangalore, let's plan my trip.", "Bangalore"),
+    ("I'm going to Bangalore, what is the temperature there? And what are the places I can plan my trip?",
+     "Bangalore"),
+    ("What's the weather in Paris?", "Paris"),
+    ("what's the weather in paris", "Paris"),
+    ("Paris weather tomorrow", "Paris"),
+    ("Tokyo tomorrow", "Tokyo"),
+    ("Will it rain in Tokyo on Saturday?", "Tokyo"),
+    ("Places to visit in Rome", "Rome"),
+    ("Which museums can I visit in Rome?", "Rome"),
+    ("museums in florence", "Florence"),
+    ("How hot is it in Dubai right now?", "Dubai"),
+    ("temperature in Singapore", "Singapore"),
+    ("Plan my trip to Barcelona", "Barcelona"),
+    ("plan a trip to lisbon please", "Lisbon"),
+    ("I want to visit Amsterdam, what can I see?", "Amsterdam"),
+    ("What can I visit in New York?", "New York"),
+    ("weather in new york city tomorrow", "New York"),
+    ("NYC museums", "New York"),
+    ("Things to do in Los Angeles", "Los Angeles"),
+    ("Is it cold in San Francisco in the evening?", "San Francisco"),
+    ("Attractions in Rio de Janeiro", "Rio de Janeiro"),
+    ("What's the forecast for Ho Chi Minh City next week?", "Ho Chi Minh City"),
+    ("Saigon weather", "Ho Chi Minh City"),
+    ("I'm heading to Bombay, what places can I go?", "Mumbai"),
+    ("Beaches near Bengaluru", "Bangalore"),
+    ("Is Kraków worth visiting in winter?", "Krakow"),
+    ("What should I see in St. Petersburg?", "Saint Petersburg"),
+    ("What's the weather like in Nice in May?", "Nice"),
+    ("Nice places to visit in Tokyo?", "Tokyo"),
+    ("Tell me a nice place to visit in Lyon", "Lyon"),
+    ("What's the temperature in Cape Town today?", "Cape Town"),
+    ("historic sites in Kuala Lumpur", "Kuala Lumpur"),
+    ("Sightseeing in Buenos Aires", "Buenos Aires"),
+    ("Zoos in Sydney", "Sydney"),
+    ("Is it raining in London?", "London"),
+    ("london parks", "London"),
+    ("viewpoints in Edinburgh", "Edinburgh"),
+    ("I'm travelling to Reykjavik, how cold is it?", "Reykjavik"),
+    ("Where can I go in Marrakesh?", "Marrakech"),
+    ("what is the weather like in Vegas this weekend", "Las Vegas"),
+    # Places outside the gazetteer: the pattern cascade has to find them
+    ("I'm going to Hampi, what can I visit?", "Hampi"),
+    ("What's the weather in Ooty?", "Ooty"),
+    ("Trip to Hallstatt", "Hallstatt"),
+    ("places to visit in Sintra", "Sintra"),
+    ("Let's plan a trip to Colmar", "Colmar"),
+    ("weather in Bled tomorrow", "Bled"),
+    ("What can I see in Chefchaouen?", "Chefchaouen"),
+    ("museums in Leiden", "Leiden"),
+    # Ambiguous aliases opening a longer name belong to that name
+    ("I'm going to La Paz", "La Paz"),
+    ("Trip to La Rochelle", "La Rochelle"),
+    ("I want to visit Rio Grande", "Rio Grande"),
+    # No place at all
+    ("what's the temperature there?", None),
+    ("what are the places I can plan my trip?", None),
+)
+
+# (query, expected destinations) for multi-city extraction; fewer than two
+# destinations means the query is answered as a single place
+MULTI_CORPUS: Tuple[Tuple[str, List[str]], ...] = (
+    ("Trip to Paris, Lyon and Nice", ["Paris", "Lyon", "Nice"]),
+    ("I'm visiting Rome then Florence then Venice", ["Rome", "Florence", "Venice"]),
+    # "let" inside Valletta is not a terminator
+    ("trip to Valletta and Rome", ["Valletta", "Rome"]),
+    # Categories of one place are not destinations
+    ("I want to see museums and parks in Paris", []),
+    ("Trip to Paris and Lyon, what museums are there?", ["Paris", "Lyon"]),
+)
+
+
+def _canonical(name: Optional[str]) -> Optional[str]:
+    if name is None:
+        return None
+    lowered = name.lower().strip()
+    return PLACE_ALIASES.get(lowered, lowered).lower()
+
+
+def _evaluate(label: str, extract: Callable[[str], Optional[str]], repeat: int, show_misses: bool) -> None:
+    misses: List[Tuple[str, Optional[str], Optional[str]]] = []
+    for query, expected in CORPUS:
+        found = extract(query)
+        if _canonical(found) != _canonical(expected):
+            misses.append((query, expected, found))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query, _ in CORPUS:
+            extract(query)
+    per_query_us = (time.perf_counter() - start) / (repeat * len(CORPUS)) * 1e6
+
+    correct = len(CORPUS) - len(misses)
+    print(f"{label:<26} {correct}/{len(CORPUS)} correct ({correct / len(CORPUS):.0%})  {per_query_us:7.1f} us/query")
+    if show_misses:
+        for query, expected, found in misses:
+            print(f"    {query!r}: expected {expected!r}, got {found!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark place name extraction on a labelled corpus")
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the corpus for timing")
+    parser.add_argument("--show-misses", action="store_true", help="list wrongly extracted queries")
+    args = parser.parse_args(argv)
+
+    # Extraction needs no network; skip agent construction side effects
+    from tourism_agent import TourismAgent
+    agent = TourismAgent.__new__(TourismAgent)
+    from place_recognizer import PlaceRecognizer
+    agent.place_recognizer = PlaceRecognizer()
+
+    print(f"{len(CORPUS)} labelled queries, gazetteer of {len(agent.place_recognizer)} names\n")
+    _evaluate("patterns only", agent.extract_place_name_by_patterns, args.repeat, args.show_misses)
+    _evaluate("gazetteer + patterns", agent.extract_place_name, args.repeat, args.show_misses)
+
+    misses = [(query, expected, agent.extract_place_names(query)) for query, expected in MULTI_CORPUS]
+    misses = [miss for miss in misses if miss[1] != miss[2]]
+    correct = len(MULTI_CORPUS) - len(misses)
+    print(f"{'multi-city':<26} {correct}/{len(MULTI_CORPUS)} correct ({correct / len(MULTI_CORPUS):.0%})")
+    if args.show_misses:
+        for query, expected, found in misses:
+            print(f"    {query!r}: expected {expected!r}, got {found!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Response encoding benchmark
+Collects real /query and /suggest payloads (the app running against
+stub_upstreams) and reports bytes on the wire and serialization plus
+compression CPU per response for each encoding the server can negotiate
+
+Usage:
+    python bench_response_encoding.py --iterations 2000
+"""
+import argparse
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+QUERIES = (
+    "What's the weather in Paris?",
+    "I'm going to Bangalore, what places can I visit?",
+    "I'm going to Bangalore, what is the temperature there? And what are the places I can plan my trip?",
+    "Which museums can I visit in Rome?",
+    "What will the weather be like in Tokyo tomorrow?",
+)
+
+
+def collect_payloads(port: int) -> List[Tuple[str, Any]]:
+    """Run the app in-process against stub upstreams and keep the decoded response bodies"""
+    from stub_upstreams import StubBehaviour, serve
+    serve(port, StubBehaviour())
+    base = f"http://127.0.0.1:{port}"
+    os.environ.update(OVERPASS_ENDPOINTS=f"{base}/api/interpreter", NOMINATIM_URL=f"{base}/search",
+                      OPEN_METEO_URL=f"{base}/v1/forecast", WARM_SNAPSHOT_PATH="")
+    from app import app
+    client = app.test_client()
+
+    payloads = []
+    for query in QUERIES:
+        response = client.post("/query", json={"query": query})
+        payloads.append((f"/query {query[:32]}", response.get_json()))
+    response = client.get("/suggest?q=sa&limit=10")
+    payloads.append(("/suggest q=sa", response.get_json()))
+    return payloads
+
+
+def _encoders() -> Dict[str, Callable[[Any], bytes]]:
+    from response_encoding import dumps_json, dumps_msgpack, msgpack, orjson
+    encoders = {"json (stdlib)": lambda obj: json.dumps(obj, separators=(",", ":")).encode("utf-8")}
+    if orjson is not None:
+        encoders["json (orjson)"] = dumps_json
+    if msgpack is not None:
+        encoders["msgpack"] = dumps_msgpack
+    return encoders
+
+
+def _compressors() -> Dict[str, Optional[Callable[[bytes], bytes]]]:
+    from response_encoding import Compressor, zstandard
+    compressor = Compressor()
+    compressors = {"identity": None, "gzip": lambda data: compressor.compress(data, "gzip")}
+    if zstandard is not None:
+        compressors["zstd"] = lambda data: compressor.compress(data, "zstd")
+    return compressors
+
+
+def _cpu_us(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--iterations", type=int, default=2000, help="repetitions per measurement")
+    parser.add_argument("--port", type=int, default=9071, help="port for the stub upstreams")
+    args = parser.parse_args(argv)
+
+    payloads = collect_payloads(args.port)
+    encoders = _encoders()
+    compressors = _compressors()
+    missing = [name for name, present in (("orjson", "json (orjson)" in encoders), ("msgpack", "msgpack" in encoders),
+                                          ("zstandard", "zstd" in compressors)) if not present]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+
+    for label, payload in payloads:
+        print(f"\n{label}")
+        print(f"  {'encoding':<16} {'compression':<12} {'bytes':>7} {'encode us':>10} {'compress us':>12} {'total us':>9}")
+        for encoder_name, encode in encoders.items():
+            body = encode(payload)
+            encode_us = _cpu_us(lambda: encode(payload), args.iterations)
+            for compressor_name, compress in compressors.items():
+                if compress is None:
+                    size, compress_us = len(body), 0.0
+                else:
+                    size = len(compress(body))
+                    compress_us = _cpu_us(lambda: compress(body), args.iterations)
+                print(f"  {encoder_name:<16} {compressor_name:<12} {size:>7} {encode_us:>10.1f} "
+                      f"{compress_us:>12.1f} {encode_us + compress_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
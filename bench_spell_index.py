@@ -0,0 +1,75 @@
+"""
+Spell index benchmark
+Measures correction lookup time against the seed vocabulary, a larger
+synthetic vocabulary, and a linear difflib scan for comparison
+
+Usage:
+    python bench_spell_index.py --vocabulary 20000 --lookups 2000
+"""
+import argparse
+import random
+import string
+import time
+from difflib import get_close_matches
+from typing import List, Optional
+
+from known_places import SEED_PLACES
+from spell_index import SpellIndex
+
+TYPOS = ("bangalor", "pariss", "barcelna", "amsterdm", "tokio", "sydeny", "londn",
+         "edinbrugh", "kuala lumpar", "new yrok", "mumbay", "venise", "reykjavick")
+
+
+def _misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word))
+    operation = rng.choice(("delete", "insert", "replace", "swap"))
+    if operation == "delete" and len(word) > 1:
+        return word[:i] + word[i + 1:]
+    if operation == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if operation == "swap" and i + 1 < len(word):
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def _timed(label: str, lookup, queries: List[str]) -> None:
+    start = time.perf_counter()
+    corrected = sum(1 for query in queries if lookup(query))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(queries)} lookups  {elapsed / len(queries) * 1e6:8.1f} us/lookup  "
+          f"{corrected} corrected")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark place-name spelling correction")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="synthetic names added to the seed list")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    seed_names = [name for name, _, _ in SEED_PLACES]
+
+    index = SpellIndex()
+    print(f"Seed vocabulary: {len(index)} names")
+    for typo in TYPOS:
+        print(f"  {typo!r:>16} -> {index.correct(typo)!r}")
+    queries = [_misspell(rng.choice(seed_names).lower(), rng) for _ in range(args.lookups)]
+    _timed("SpellIndex (seed)", index.correct, queries)
+
+    synthetic = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+                 for _ in range(args.vocabulary)]
+    start = time.perf_counter()
+    large = SpellIndex(seed_names + synthetic)
+    print(f"\nBuilt index of {len(large)} names in {time.perf_counter() - start:.2f}s")
+    vocabulary = seed_names + synthetic
+    queries = [_misspell(rng.choice(vocabulary).lower(), rng) for _ in range(args.lookups)]
+    _timed("SpellIndex (large)", large.correct, queries)
+
+    lowered = [name.lower() for name in vocabulary]
+    sample = queries[:max(1, args.lookups // 20)]
+    _timed("difflib scan (large)", lambda q: get_close_matches(q, lowered, n=1, cutoff=0.8), sample)
+
+
+if __name__ == "__main__":
+    main()
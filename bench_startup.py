@@ -0,0 +1,81 @@
+"""
+Startup benchmark
+Starts fresh interpreters and measures importing the app, constructing the
+agent and answering a first query, with and without a warm snapshot. Upstream
+APIs are replaced by stub_upstreams.py with a fixed latency, so the numbers
+reflect round trips saved rather than public API variance
+
+Usage:
+    python bench_startup.py --runs 5 --upstream-latency 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import stub_upstreams
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.get_agent()
+constructed = time.perf_counter()
+response = app.app.test_client().post('/query', json={'query': QUERY})
+answered = time.perf_counter()
+print(json.dumps({
+    'status': response.status_code,
+    'import_ms': (imported - start) * 1000,
+    'agent_ms': (constructed - imported) * 1000,
+    'first_query_ms': (answered - constructed) * 1000,
+}))
+"""
+
+
+def run_child(env: Dict[str, str], query: str) -> Dict[str, float]:
+    code = CHILD.replace("QUERY", json.dumps(query))
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), timeout=120)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"benchmark child failed:\n{completed.stderr[-2000:]}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cold-start time with and without a warm snapshot")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9301)
+    parser.add_argument("--upstream-latency", type=float, default=0.2, help="stub latency per upstream call")
+    parser.add_argument("--query", default="I'm going to Paris, what places can I visit?")
+    args = parser.parse_args(argv)
+
+    server = stub_upstreams.serve(args.port, stub_upstreams.StubBehaviour(latency=args.upstream_latency))
+    base = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ,
+               OVERPASS_ENDPOINTS=f"{base}/api/interpreter",
+               NOMINATIM_URL=f"{base}/search",
+               OPEN_METEO_URL=f"{base}/v1/forecast")
+    os.environ.update(env)
+
+    from warm_snapshot import build_snapshot
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "warm_snapshot.bin")
+        data = build_snapshot(path, with_places=True, workers=8)
+        print(f"Built snapshot for {len(data['geocodes'])} destinations ({os.path.getsize(path)} bytes)")
+
+        for label, snapshot in (("cold (no snapshot)", ""), ("warm snapshot", path)):
+            runs = [run_child(dict(env, WARM_SNAPSHOT_PATH=snapshot), args.query) for _ in range(args.runs)]
+            medians = {key: statistics.median(run[key] for run in runs) for key in ("import_ms", "agent_ms", "first_query_ms")}
+            print(f"{label:<20} import {medians['import_ms']:7.1f} ms   agent {medians['agent_ms']:7.1f} ms   "
+                  f"first query {medians['first_query_ms']:7.1f} ms   (median of {args.runs})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Circuit Breaker - per-upstream health tracking
+Tracks an EWMA of latency and error rate for each upstream API, derives
+adaptive timeouts from observed latency percentiles and fails fast while an
+upstream is known to be down
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import requests
+
+from deadline import Deadline, timeout_for
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker with adaptive timeouts for one upstream"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, base_timeout: float, min_timeout: float = 1.0,
+                 error_threshold: float = 0.5, consecutive_failures: int = 5,
+                 open_seconds: float = 30.0, alpha: float = 0.2, window: int = 200):
+        """
+        Args:
+            name: Upstream name used in logs
+            base_timeout: Timeout used until enough latency samples exist,
+                and the upper bound for adaptive timeouts
+            min_timeout: Lower bound for adaptive timeouts
+            error_threshold: EWMA error rate that opens the circuit
+            consecutive_failures: Failures in a row that open the circuit
+            open_seconds: How long the circuit stays open before a probe
+            alpha: EWMA smoothing factor
+            window: Number of recent latencies kept for percentiles
+        """
+        self.name = name
+        self.base_timeout = base_timeout
+        self.min_timeout = min_timeout
+        self.error_threshold = error_threshold
+        self.consecutive_failures = consecutive_failures
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+
+        self.state = self.CLOSED
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self._failures_in_row = 0
+        self._calls = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (half-open lets one probe through)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected (no probe is due yet)"""
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency percentile in seconds over the recent window"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def timeout(self) -> float:
+        """Adaptive timeout: a multiple of the observed p99, within [min, base]"""
+        if self.sample_count < 20:
+            return self.base_timeout
+        p99 = self.percentile(0.99)
+        return max(self.min_timeout, min(self.base_timeout, p99 * 3))
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._observe(latency, failed=False)
+            self._failures_in_row = 0
+            if self.state != self.CLOSED:
+                print(f"[DEBUG] Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            self._observe(latency, failed=True)
+            self._failures_in_row += 1
+            tripped = (self._failures_in_row >= self.consecutive_failures or
+                       (self._calls >= 10 and self.error_rate >= self.error_threshold))
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and tripped):
+                print(f"[DEBUG] Circuit for {self.name} opened "
+                      f"(error rate {self.error_rate:.2f}, {self._failures_in_row} failures in a row)")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def _observe(self, latency: float, failed: bool) -> None:
+        self._calls += 1
+        self._latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.alpha * (latency - self.latency_ewma)
+        self.error_rate += self.alpha * ((1.0 if failed else 0.0) - self.error_rate)
+
+    def request(self, method: str, url: str, deadline: Optional[Deadline] = None,
+                **kwargs: Any) -> requests.Response:
+        """
+        Make an HTTP request through the breaker with the adaptive timeout,
+        shortened to the remaining budget of an optional request deadline
+        HTTP errors (4xx/5xx) count as failures and are raised like raise_for_status
+
+        Raises:
+            CircuitOpenError: if the circuit is open
+            DeadlineExceeded: if the deadline has already passed
+            requests.exceptions.RequestException: on any request failure
+        """
+        timeout = timeout_for(deadline, self.timeout())
+        if not self.allow():
+            raise CircuitOpenError(f"circuit for {self.name} is open")
+
+        kwargs.setdefault("timeout", timeout)
+        started = time.monotonic()
+        try:
+            response = requests.request(method, url, **kwargs)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            self.record_failure(time.monotonic() - started)
+            raise
+        self.record_success(time.monotonic() - started)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency_ewma": self.latency_ewma,
+            "error_rate": round(self.error_rate, 3),
+            "p95": self.percentile(0.95),
+            "timeout": self.timeout(),
+        }
+
+
+# Default timeouts match the fixed per-upstream timeouts used before breakers
+_DEFAULT_TIMEOUTS = {
+    "open-meteo": 10.0,
+    "nominatim": 5.0,
+    "overpass": 10.0,
+}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for an upstream, shared by all agents"""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, _DEFAULT_TIMEOUTS.get(name, 10.0))
+        return _breakers[name]
+
+
+def all_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
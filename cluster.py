@@ -0,0 +1,153 @@
+"""
+Cluster - consistent-hash routing of places across app nodes
+Every node is given the same membership list and places nodes on a hash ring
+(many virtual points per node). A query is answered by the node owning its
+canonical place key; other nodes forward it there, so each place is geocoded,
+fetched and cached once per cluster instead of once per node. Adding or
+removing a node moves only the places between its ring points and their
+neighbours. If the owner cannot be reached, the query is answered locally.
+
+Environment:
+    CLUSTER_NODES          comma-separated base URLs of all nodes, e.g.
+                           http://10.0.0.1:5000,http://10.0.0.2:5000
+    CLUSTER_SELF           this node's base URL, exactly as listed in CLUSTER_NODES
+    CLUSTER_SECRET         shared secret sent with forwarded queries (required)
+    CLUSTER_VNODES         ring points per node (default 64)
+"""
+import bisect
+import hashlib
+import hmac
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from circuit_breaker import get_breaker
+from deadline import Deadline, timeout_for
+from known_places import PLACE_ALIASES
+
+# Header carrying CLUSTER_SECRET on forwarded queries
+SECRET_HEADER = "X-Cluster-Secret"
+
+# Longest wait for the owner without a request deadline; the owner does the
+# upstream calls, so this covers a whole answer rather than one lookup
+FORWARD_TIMEOUT_SECONDS = 20.0
+
+
+def place_key(name: str) -> str:
+    """Canonical key of a place name: aliases resolved, case and spacing folded"""
+    key = re.sub(r"\s+", " ", name.strip().lower())
+    return PLACE_ALIASES.get(key, key).lower()
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping keys to nodes"""
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 64):
+        """
+        Args:
+            nodes: Node names (base URLs)
+            vnodes: Ring points per node; more points spread keys more evenly
+        """
+        if not nodes:
+            raise ValueError("a hash ring needs at least one node")
+        self.nodes = list(dict.fromkeys(nodes))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> str:
+        """Node owning key: the first ring point at or after the key's hash"""
+        index = bisect.bisect_left(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class Cluster:
+    """This node's view of the cluster: who owns a place, and forwarding to the owner"""
+
+    def __init__(self, self_url: str, nodes: Sequence[str], secret: str, vnodes: int = 64):
+        """
+        Args:
+            self_url: This node's base URL (must be one of nodes)
+            nodes: Base URLs of all nodes
+            secret: Shared secret required on forwarded queries; without it
+                    anyone could have a node answer on another's behalf
+            vnodes: Ring points per node
+        """
+        self.self_url = self_url.rstrip("/")
+        self.ring = HashRing([node.rstrip("/") for node in nodes], vnodes)
+        if self.self_url not in self.ring.nodes:
+            raise ValueError(f"CLUSTER_SELF {self.self_url} is not in CLUSTER_NODES")
+        if not secret:
+            raise ValueError("CLUSTER_SECRET must be set in cluster mode")
+        self.secret = secret
+        self.counts = {"local": 0, "forwarded": 0, "fallback": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["Cluster"]:
+        """
+        Cluster configured from the environment, or None unless CLUSTER_NODES
+        and CLUSTER_SELF are set (then CLUSTER_SECRET is required too)
+        """
+        nodes = [node.strip() for node in os.environ.get("CLUSTER_NODES", "").split(",") if node.strip()]
+        self_url = os.environ.get("CLUSTER_SELF", "").strip()
+        if not nodes or not self_url:
+            return None
+        return cls(self_url, nodes, os.environ.get("CLUSTER_SECRET", ""),
+                   int(os.environ.get("CLUSTER_VNODES", 64)))
+
+    def owner(self, place_name: str) -> Optional[str]:
+        """Base URL of the node owning a place, or None if this node owns it"""
+        node = self.ring.owner(place_key(place_name))
+        if node == self.self_url:
+            self.counts["local"] += 1
+            return None
+        return node
+
+    def authorized(self, headers) -> bool:
+        """Whether a forwarded request carries the cluster secret"""
+        return hmac.compare_digest(headers.get(SECRET_HEADER, "").encode("utf-8"), self.secret.encode("utf-8"))
+
+    def forward(self, node: str, payload: Dict[str, Any],
+                deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ask the owning node to answer a query
+
+        Args:
+            node: Base URL of the owner
+            payload: Body for the owner's /cluster/query endpoint
+            deadline: Optional request deadline; the owner gets the remaining budget
+
+        Returns:
+            The owner's response body, or None if it could not answer in time
+        """
+        breaker = get_breaker(f"cluster {node}")
+        headers = {SECRET_HEADER: self.secret}
+        if deadline is not None:
+            payload = {**payload, "budget": deadline.remaining()}
+        try:
+            response = breaker.request("POST", f"{node}/cluster/query", deadline, json=payload, headers=headers,
+                                       timeout=timeout_for(deadline, FORWARD_TIMEOUT_SECONDS))
+            body = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"[DEBUG] Forwarding to {node} failed, answering locally: {e}")
+            self.counts["fallback"] += 1
+            return None
+        self.counts["forwarded"] += 1
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        return {"self": self.self_url, "nodes": self.ring.nodes, **self.counts}
+
+
+def key_distribution(ring: HashRing, keys: List[str]) -> List[Tuple[str, int]]:
+    """Keys owned by each node of a ring, for checking balance"""
+    owned = {node: 0 for node in ring.nodes}
+    for key in keys:
+        owned[ring.owner(place_key(key))] += 1
+    return sorted(owned.items())
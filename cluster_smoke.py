@@ -0,0 +1,129 @@
+"""
+Cluster smoke test
+Launches several app nodes as local processes in cluster mode against stub
+upstreams, sends each query to a different node every round and checks that
+every place is fetched once per cluster (later rounds make no upstream
+calls), that all nodes give the same answer, and that queries still get
+answered after a node is stopped
+
+Usage:
+    python cluster_smoke.py --nodes 3
+    python cluster_smoke.py --nodes 4 --base-port 9400 --verbose
+"""
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from cluster import HashRing, key_distribution
+from stub_upstreams import StubBehaviour, serve
+
+PLACES = ("Paris", "Tokyo", "Rome", "Lisbon", "Ooty", "Hampi", "Hallstatt", "Sintra", "Colmar", "Bled",
+          "NYC", "Bombay")
+
+
+def launch(nodes: List[str], stub_url: str, verbose: bool) -> List[subprocess.Popen]:
+    """Start one app process per node URL"""
+    secret = secrets.token_hex(8)
+    processes = []
+    for node in nodes:
+        env = dict(os.environ,
+                   PORT=node.rsplit(":", 1)[1],
+                   CLUSTER_NODES=",".join(nodes),
+                   CLUSTER_SELF=node,
+                   CLUSTER_SECRET=secret,
+                   NOMINATIM_URL=f"{stub_url}/search",
+                   OPEN_METEO_URL=f"{stub_url}/v1/forecast",
+                   OVERPASS_ENDPOINTS=f"{stub_url}/api/interpreter",
+                   WARM_SNAPSHOT_PATH="")
+        output = None if verbose else subprocess.DEVNULL
+        processes.append(subprocess.Popen([sys.executable, "app.py"], env=env, stdout=output, stderr=output,
+                                          cwd=os.path.dirname(os.path.abspath(__file__))))
+    return processes
+
+
+def wait_healthy(nodes: List[str], timeout: float = 30.0) -> None:
+    give_up_at = time.monotonic() + timeout
+    for node in nodes:
+        while True:
+            try:
+                if requests.get(f"{node}/health", timeout=1).ok:
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            if time.monotonic() > give_up_at:
+                raise SystemExit(f"{node} did not become healthy")
+            time.sleep(0.2)
+
+
+def ask(node: str, place: str) -> Optional[str]:
+    query = f"What's the weather in {place}? And what are the places I can visit?"
+    response = requests.post(f"{node}/query", json={"query": query}, timeout=30)
+    body = response.json()
+    return body.get("response") if body.get("success") else None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run app nodes in cluster mode and check place routing")
+    parser.add_argument("--nodes", type=int, default=3, help="app processes to launch")
+    parser.add_argument("--base-port", type=int, default=9300, help="port of the first node")
+    parser.add_argument("--stub-port", type=int, default=9390, help="port for the stub upstreams")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the places, each on other nodes")
+    parser.add_argument("--verbose", action="store_true", help="show the nodes' output")
+    args = parser.parse_args(argv)
+
+    behaviour = StubBehaviour()
+    serve(args.stub_port, behaviour)
+    nodes = [f"http://127.0.0.1:{args.base_port + i}" for i in range(args.nodes)]
+    print("Places per node:")
+    for node, owned in key_distribution(HashRing(nodes), list(PLACES)):
+        print(f"  {node}  {owned}")
+
+    failures: List[str] = []
+    processes = launch(nodes, f"http://127.0.0.1:{args.stub_port}", args.verbose)
+    try:
+        wait_healthy(nodes)
+        answers: Dict[str, str] = {}
+        for round_number in range(args.rounds):
+            before = dict(behaviour.paths)
+            for i, place in enumerate(PLACES):
+                node = nodes[(i + round_number) % len(nodes)]
+                answer = ask(node, place)
+                if answer is None:
+                    failures.append(f"round {round_number}: no answer for {place} from {node}")
+                elif answers.setdefault(place, answer) != answer:
+                    failures.append(f"round {round_number}: {node} answered {place} differently")
+            calls = {path: count - before.get(path, 0) for path, count in behaviour.paths.items()
+                     if count != before.get(path, 0)}
+            print(f"Round {round_number + 1}: upstream calls {calls or 'none'}")
+            if round_number > 0 and calls:
+                failures.append(f"round {round_number + 1} repeated upstream calls: {calls}")
+
+        # Stop one node: its places must still be answered (locally, by whoever is asked)
+        processes[-1].terminate()
+        processes[-1].wait()
+        for place in PLACES:
+            if ask(nodes[0], place) is None:
+                failures.append(f"no answer for {place} with {nodes[-1]} down")
+        print(f"With {nodes[-1]} stopped: {len(PLACES)} queries sent to {nodes[0]}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print("\nOK: each place fetched once per cluster, answers consistent across nodes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Deadline - end-to-end time budget for one request
+Created once per request and passed down to every agent call, which sizes
+its own upstream timeout from the remaining budget
+"""
+import time
+from typing import Optional
+
+import requests
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised instead of starting an upstream call once the budget is spent"""
+
+
+class Deadline:
+    """Absolute point in time by which a request must be answered"""
+    
+    __slots__ = ("budget", "expires_at")
+    
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+    
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+    
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout for the next upstream call: the remaining budget, at most cap
+        
+        Raises:
+            DeadlineExceeded: if no budget is left
+        """
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"request deadline of {self.budget:.1f}s exceeded")
+        return remaining if cap is None else min(cap, remaining)
+
+
+def timeout_for(deadline: Optional[Deadline], cap: float) -> float:
+    """Upstream timeout honouring an optional deadline"""
+    return deadline.timeout(cap) if deadline is not None else cap
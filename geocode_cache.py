@@ -0,0 +1,203 @@
+"""
+Geocode Cache - memory-bounded cache with frequency-aware admission
+A small LRU admission window in front of a main LRU region (W-TinyLFU):
+entries leaving the window only enter the main region if a count-min sketch
+says they are requested more often than the main region's eviction victim,
+so one-off junk keys cannot push out popular cities
+"""
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+DEFAULT_MAX_BYTES = int(os.environ.get("GEOCODE_CACHE_MAX_BYTES", 1024 * 1024))
+
+# Rough per-entry overhead of an OrderedDict slot and its linked-list node
+_ODICT_SLOT_BYTES = 104
+
+_ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_MASK_64 = (1 << 64) - 1
+
+
+class FrequencySketch:
+    """Count-min sketch of access frequencies with periodic halving (aging)"""
+
+    __slots__ = ("_width_mask", "_rows", "_additions", "_sample_size", "_doorkeeper")
+
+    def __init__(self, expected_entries: int):
+        width = 1
+        while width < max(16, expected_entries):
+            width <<= 1
+        self._width_mask = width - 1
+        self._rows = [array("B", bytes(width)) for _ in _ROW_SEEDS]
+        self._additions = 0
+        self._sample_size = 10 * width
+        # Bloom filter of keys seen once since the last reset; keeps one-hit
+        # wonders out of the counters (8 bits per sketch column)
+        self._doorkeeper = bytearray(width)
+
+    def _indexes(self, key: Hashable):
+        h = hash(key) & _MASK_64
+        for seed in _ROW_SEEDS:
+            yield (((h ^ seed) * 0x9E3779B97F4A7C15) & _MASK_64) >> 32 & self._width_mask
+
+    def _doorkeeper_bits(self, key: Hashable):
+        h = hash(key) & _MASK_64
+        bits = (self._width_mask + 1) * 8
+        return ((h * 0xC2B2AE3D27D4EB4F) & _MASK_64) % bits, (h >> 17) % bits
+
+    def _in_doorkeeper(self, key: Hashable) -> bool:
+        return all(self._doorkeeper[bit >> 3] & (1 << (bit & 7)) for bit in self._doorkeeper_bits(key))
+
+    def increment(self, key: Hashable) -> None:
+        if not self._in_doorkeeper(key):
+            for bit in self._doorkeeper_bits(key):
+                self._doorkeeper[bit >> 3] |= 1 << (bit & 7)
+        else:
+            for row, index in zip(self._rows, self._indexes(key)):
+                if row[index] < 15:
+                    row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def frequency(self, key: Hashable) -> int:
+        estimate = min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+        return estimate + (1 if self._in_doorkeeper(key) else 0)
+
+    def _reset(self) -> None:
+        """Halve all counters so old popularity fades"""
+        for row in self._rows:
+            for index in range(len(row)):
+                row[index] >>= 1
+        self._doorkeeper = bytearray(len(self._doorkeeper))
+        self._additions //= 2
+
+    def nbytes(self) -> int:
+        return sum(len(row) for row in self._rows) + len(self._doorkeeper)
+
+
+class _Entry:
+    __slots__ = ("key", "value", "size")
+
+    def __init__(self, key: str, value: Any):
+        self.key = key
+        self.value = value
+        self.size = self._estimate_size(key, value)
+
+    def _estimate_size(self, key: str, value: Any) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(key) + _ODICT_SLOT_BYTES
+        if value is not None:
+            size += sys.getsizeof(value)
+            if isinstance(value, tuple):
+                size += sum(sys.getsizeof(item) for item in value)
+        return size
+
+
+class GeocodeCache:
+    """Geocode results (or None for unknown places) bounded by estimated bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, window_fraction: float = 0.01):
+        """
+        Args:
+            max_bytes: Upper bound on the estimated memory held by entries
+            window_fraction: Share of the budget used by the admission window
+        """
+        self.max_bytes = max_bytes
+        # ~250 bytes per entry is typical for a city name and a coordinate pair;
+        # the sketch is 4x wider than that so junk keys add little counter noise
+        self._sketch = FrequencySketch(4 * (max_bytes // 250))
+        self._window_max = max(int(max_bytes * window_fraction), 2048)
+        self._main_max = max(max_bytes - self._window_max - self._sketch.nbytes(), 0)
+        self._window: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._main: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._window_bytes = 0
+        self._main_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejections = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Look up a key, counting the access towards its admission frequency"""
+        with self._lock:
+            self._sketch.increment(key)
+            entry = self._main.get(key)
+            if entry is not None:
+                self._main.move_to_end(key)
+            else:
+                entry = self._window.get(key)
+                if entry is not None:
+                    self._window.move_to_end(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry.value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._main or key in self._window
+
+    def __getitem__(self, key: str) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            for region in (self._main, self._window):
+                old = region.pop(key, None)
+                if old is not None:
+                    if region is self._main:
+                        self._main_bytes -= old.size
+                    else:
+                        self._window_bytes -= old.size
+
+            entry = _Entry(key, value)
+            self._window[key] = entry
+            self._window_bytes += entry.size
+            while self._window_bytes > self._window_max and self._window:
+                _, candidate = self._window.popitem(last=False)
+                self._window_bytes -= candidate.size
+                self._admit(candidate)
+
+    def _admit(self, candidate: _Entry) -> None:
+        """Move a window victim into the main region if it beats the main victims"""
+        while self._main_bytes + candidate.size > self._main_max:
+            if not self._main:
+                self.rejections += 1
+                return
+            victim_key = next(iter(self._main))
+            if self._sketch.frequency(candidate.key) <= self._sketch.frequency(victim_key):
+                self.rejections += 1
+                return
+            victim = self._main.pop(victim_key)
+            self._main_bytes -= victim.size
+        self._main[candidate.key] = candidate
+        self._main_bytes += candidate.size
+
+    def __len__(self) -> int:
+        return len(self._main) + len(self._window)
+
+    def keys(self):
+        with self._lock:
+            return list(self._main.keys()) + list(self._window.keys())
+
+    def size_bytes(self) -> int:
+        """Estimated bytes held by entries plus the frequency sketch"""
+        return self._main_bytes + self._window_bytes + self._sketch.nbytes()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejections": self.rejections,
+        }
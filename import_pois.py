@@ -0,0 +1,147 @@
+"""
+Import tool for the local POI store
+Ingests an OSM extract (PBF, or an Overpass JSON dump) of tourism, historic
+and leisure features into a compact store file read by poi_store.POIStore
+
+Usage:
+    python import_pois.py karnataka.osm.pbf --output pois.bin
+    python import_pois.py paris_dump.json lyon_dump.json --output pois.bin
+
+Overpass dumps should be fetched with `out center;` so ways carry a center
+point. PBF input needs the optional pyosmium package (pip install osmium).
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from places_agent import PlacesAgent, attraction_tag_classes
+from poi_store import write_store
+
+Feature = Tuple[float, float, str, Tuple[str, ...]]
+BoundingBox = Tuple[float, float, float, float]
+
+
+def _tag_classes(tags: Dict[str, str]) -> Tuple[str, ...]:
+    """Every "key=value" tag class of a feature passing the same filters as the Overpass path"""
+    return tuple(tag_class for tag_class in attraction_tag_classes(tags) if not tag_class.endswith("=*"))
+
+
+def _feature(latitude: float, longitude: float, tags: Dict[str, str]) -> Optional[Feature]:
+    tag_classes = _tag_classes(tags)
+    name = PlacesAgent._element_name(tags)
+    if not tag_classes or name is None:
+        return None
+    return (latitude, longitude, name, tag_classes)
+
+
+def _extent(features: List[Feature]) -> Optional[BoundingBox]:
+    if not features:
+        return None
+    lats = [feature[0] for feature in features]
+    lons = [feature[1] for feature in features]
+    return (min(lats), min(lons), max(lats), max(lons))
+
+
+def read_overpass_dump(path: str) -> Tuple[List[Feature], Optional[BoundingBox]]:
+    """Read features from an Overpass JSON dump (`[out:json]` ... `out center;`)"""
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+
+    features: List[Feature] = []
+    for element in data.get("elements", []):
+        if "lat" in element and "lon" in element:
+            latitude, longitude = element["lat"], element["lon"]
+        elif "center" in element:
+            latitude, longitude = element["center"]["lat"], element["center"]["lon"]
+        else:
+            continue
+        feature = _feature(float(latitude), float(longitude), element.get("tags", {}))
+        if feature:
+            features.append(feature)
+
+    return features, _extent(features)
+
+
+def read_pbf(path: str) -> Tuple[List[Feature], Optional[BoundingBox]]:
+    """Read features from an OSM PBF extract (requires pyosmium)"""
+    try:
+        import osmium
+    except ImportError:
+        raise SystemExit("PBF import needs pyosmium: pip install osmium")
+
+    features: List[Feature] = []
+
+    class FeatureHandler(osmium.SimpleHandler):
+        def node(self, node):
+            if node.location.valid():
+                feature = _feature(node.location.lat, node.location.lon, dict(node.tags))
+                if feature:
+                    features.append(feature)
+
+        def way(self, way):
+            tags = dict(way.tags)
+            if not _tag_classes(tags):
+                return
+            points = [(n.location.lat, n.location.lon) for n in way.nodes if n.location.valid()]
+            if points:
+                latitude = sum(point[0] for point in points) / len(points)
+                longitude = sum(point[1] for point in points) / len(points)
+                feature = _feature(latitude, longitude, tags)
+                if feature:
+                    features.append(feature)
+
+    FeatureHandler().apply_file(path, locations=True)
+
+    # Prefer the extract's declared bounding box over the feature extent
+    box = osmium.io.Reader(path, osmium.osm.osm_entity_bits.NOTHING).header().box()
+    if box.valid():
+        return features, (box.bottom_left.lat, box.bottom_left.lon,
+                          box.top_right.lat, box.top_right.lon)
+    return features, _extent(features)
+
+
+def read_extract(path: str) -> Tuple[List[Feature], Optional[BoundingBox]]:
+    if path.endswith(".pbf"):
+        return read_pbf(path)
+    return read_overpass_dump(path)
+
+
+def _parse_bbox(value: str) -> BoundingBox:
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4:
+        raise argparse.ArgumentTypeError("expected min_lat,min_lon,max_lat,max_lon")
+    return (parts[0], parts[1], parts[2], parts[3])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a local POI store from OSM extracts")
+    parser.add_argument("inputs", nargs="+", help="OSM PBF files or Overpass JSON dumps")
+    parser.add_argument("--output", "-o", default="pois.bin", help="store file to write")
+    parser.add_argument("--cell-size", type=float, default=0.05,
+                        help="grid cell size in degrees (default: 0.05)")
+    parser.add_argument("--coverage", type=_parse_bbox, action="append",
+                        help="covered area min_lat,min_lon,max_lat,max_lon (repeatable); "
+                             "defaults to each input's extent")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    features: List[Feature] = []
+    coverage: List[BoundingBox] = list(args.coverage or [])
+
+    for path in args.inputs:
+        extract_features, extent = read_extract(path)
+        print(f"{path}: {len(extract_features)} features")
+        features.extend(extract_features)
+        if not args.coverage and extent:
+            coverage.append(extent)
+
+    count = write_store(args.output, features, coverage, args.cell_size)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {count} features to {args.output} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Job Store - background completion of slow requests
+A request that is still running after ASYNC_AFTER_SECONDS is handed back to
+the client as a job: the work continues on a small worker pool and the client
+polls for the result, so slow lookups (sparse regions, Overpass fallbacks)
+stop holding a request-serving thread or running into proxy timeouts.
+Finished jobs are kept for a while in a bounded store.
+
+Environment:
+    ASYNC_AFTER_SECONDS   seconds a request waits before becoming a job (unset: off)
+    JOB_WORKERS           worker threads running queries (default 8)
+    JOB_MAX               jobs kept, pending or finished (default 1000)
+    JOB_TTL_SECONDS       time a finished job's result is kept (default 600)
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class Job:
+    """One request handed to the worker pool"""
+
+    __slots__ = ("id", "result", "error", "created", "finished", "_done")
+
+    def __init__(self):
+        self.id = secrets.token_urlsafe(12)
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def status(self) -> str:
+        if not self._done.is_set():
+            return "pending"
+        return "failed" if self.error is not None else "done"
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the job to finish; True if it did within timeout"""
+        return self._done.wait(timeout)
+
+
+class JobStore:
+    """Worker pool plus a bounded, expiring store of jobs by id"""
+
+    def __init__(self, async_after: float, workers: int = 8, max_jobs: int = 1000, ttl: float = 600):
+        """
+        Args:
+            async_after: Seconds a request waits for its job before the client
+                         gets the job id instead
+            workers: Jobs run at once; more wait in the pool's queue
+            max_jobs: Jobs kept; once reached, the oldest finished jobs are
+                      dropped and new jobs are refused while all are pending
+            ttl: Seconds a finished job is kept for polling
+        """
+        self.async_after = async_after
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["JobStore"]:
+        """Store configured from the environment, or None unless ASYNC_AFTER_SECONDS is set"""
+        async_after = float(os.environ.get("ASYNC_AFTER_SECONDS", 0) or 0)
+        if async_after <= 0:
+            return None
+        return cls(
+            async_after,
+            workers=int(os.environ.get("JOB_WORKERS", 8)),
+            max_jobs=int(os.environ.get("JOB_MAX", 1000)),
+            ttl=float(os.environ.get("JOB_TTL_SECONDS", 600)),
+        )
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> Optional[Job]:
+        """
+        Run function(*args) as a job
+
+        Returns:
+            The job, or None if the store is full of pending jobs
+        """
+        job = Job()
+        with self._lock:
+            self._evict(time.time())
+            if len(self._jobs) >= self.max_jobs:
+                return None
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, function, args)
+        return job
+
+    @staticmethod
+    def _run(job: Job, function: Callable[..., Any], args: tuple) -> None:
+        try:
+            job.result = function(*args)
+        except BaseException as e:
+            job.error = e
+        finally:
+            job.finished = time.time()
+            job._done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job with this id, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished is not None and time.time() - job.finished >= self.ttl:
+                del self._jobs[job_id]
+                return None
+            return job
+
+    def _evict(self, now: float) -> None:
+        # Jobs are in submission order; drop expired ones, then the oldest
+        # finished ones while over the limit (pending jobs are never dropped)
+        over = len(self._jobs) - self.max_jobs + 1
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is None:
+                continue
+            if over > 0 or now - job.finished >= self.ttl:
+                del self._jobs[job_id]
+                over -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.finished is None)
+            return {"pending": pending, "finished": len(self._jobs) - pending}
@@ -0,0 +1,196 @@
+"""
+Known Places - seed gazetteer of popular destinations
+Names and approximate city-centre coordinates used to seed the local
+place indexes before any traffic has been seen
+"""
+from typing import Dict, Tuple
+
+# (name, latitude, longitude)
+SEED_PLACES: Tuple[Tuple[str, float, float], ...] = (
+    # Asia
+    ("Bangalore", 12.9716, 77.5946),
+    ("Mumbai", 19.0760, 72.8777),
+    ("Delhi", 28.6139, 77.2090),
+    ("New Delhi", 28.6139, 77.2090),
+    ("Chennai", 13.0827, 80.2707),
+    ("Kolkata", 22.5726, 88.3639),
+    ("Hyderabad", 17.3850, 78.4867),
+    ("Pune", 18.5204, 73.8567),
+    ("Jaipur", 26.9124, 75.7873),
+    ("Agra", 27.1767, 78.0081),
+    ("Goa", 15.2993, 74.1240),
+    ("Mysore", 12.2958, 76.6394),
+    ("Kochi", 9.9312, 76.2673),
+    ("Udaipur", 24.5854, 73.7125),
+    ("Varanasi", 25.3176, 82.9739),
+    ("Tokyo", 35.6762, 139.6503),
+    ("Kyoto", 35.0116, 135.7681),
+    ("Osaka", 34.6937, 135.5023),
+    ("Seoul", 37.5665, 126.9780),
+    ("Beijing", 39.9042, 116.4074),
+    ("Shanghai", 31.2304, 121.4737),
+    ("Hong Kong", 22.3193, 114.1694),
+    ("Taipei", 25.0330, 121.5654),
+    ("Singapore", 1.3521, 103.8198),
+    ("Bangkok", 13.7563, 100.5018),
+    ("Chiang Mai", 18.7883, 98.9853),
+    ("Phuket", 7.8804, 98.3923),
+    ("Kuala Lumpur", 3.1390, 101.6869),
+    ("Bali", -8.3405, 115.0920),
+    ("Jakarta", -6.2088, 106.8456),
+    ("Manila", 14.5995, 120.9842),
+    ("Hanoi", 21.0278, 105.8342),
+    ("Ho Chi Minh City", 10.8231, 106.6297),
+    ("Kathmandu", 27.7172, 85.3240),
+    ("Colombo", 6.9271, 79.8612),
+    ("Dubai", 25.2048, 55.2708),
+    ("Abu Dhabi", 24.4539, 54.3773),
+    ("Doha", 25.2854, 51.5310),
+    ("Istanbul", 41.0082, 28.9784),
+    ("Jerusalem", 31.7683, 35.2137),
+    ("Tel Aviv", 32.0853, 34.7818),
+    # Europe
+    ("Paris", 48.8566, 2.3522),
+    ("Nice", 43.7102, 7.2620),
+    ("Lyon", 45.7640, 4.8357),
+    ("Marseille", 43.2965, 5.3698),
+    ("London", 51.5074, -0.1278),
+    ("Edinburgh", 55.9533, -3.1883),
+    ("Manchester", 53.4808, -2.2426),
+    ("Dublin", 53.3498, -6.2603),
+    ("Amsterdam", 52.3676, 4.9041),
+    ("Brussels", 50.8503, 4.3517),
+    ("Bruges", 51.2093, 3.2247),
+    ("Berlin", 52.5200, 13.4050),
+    ("Munich", 48.1351, 11.5820),
+    ("Hamburg", 53.5511, 9.9937),
+    ("Frankfurt", 50.1109, 8.6821),
+    ("Cologne", 50.9375, 6.9603),
+    ("Vienna", 48.2082, 16.3738),
+    ("Salzburg", 47.8095, 13.0550),
+    ("Zurich", 47.3769, 8.5417),
+    ("Geneva", 46.2044, 6.1432),
+    ("Lucerne", 47.0502, 8.3093),
+    ("Rome", 41.9028, 12.4964),
+    ("Milan", 45.4642, 9.1900),
+    ("Venice", 45.4408, 12.3155),
+    ("Florence", 43.7696, 11.2558),
+    ("Naples", 40.8518, 14.2681),
+    ("Madrid", 40.4168, -3.7038),
+    ("Barcelona", 41.3851, 2.1734),
+    ("Seville", 37.3891, -5.9845),
+    ("Valencia", 39.4699, -0.3763),
+    ("Granada", 37.1773, -3.5986),
+    ("Lisbon", 38.7223, -9.1393),
+    ("Porto", 41.1579, -8.6291),
+    ("Prague", 50.0755, 14.4378),
+    ("Budapest", 47.4979, 19.0402),
+    ("Warsaw", 52.2297, 21.0122),
+    ("Krakow", 50.0647, 19.9450),
+    ("Copenhagen", 55.6761, 12.5683),
+    ("Stockholm", 59.3293, 18.0686),
+    ("Oslo", 59.9139, 10.7522),
+    ("Helsinki", 60.1699, 24.9384),
+    ("Reykjavik", 64.1466, -21.9426),
+    ("Athens", 37.9838, 23.7275),
+    ("Santorini", 36.3932, 25.4615),
+    ("Dubrovnik", 42.6507, 18.0944),
+    ("Split", 43.5081, 16.4402),
+    ("Moscow", 55.7558, 37.6173),
+    ("Saint Petersburg", 59.9311, 30.3609),
+    # Africa
+    ("Cairo", 30.0444, 31.2357),
+    ("Marrakech", 31.6295, -7.9811),
+    ("Casablanca", 33.5731, -7.5898),
+    ("Cape Town", -33.9249, 18.4241),
+    ("Johannesburg", -26.2041, 28.0473),
+    ("Nairobi", -1.2921, 36.8219),
+    ("Zanzibar", -6.1659, 39.2026),
+    ("Lagos", 6.5244, 3.3792),
+    # Americas
+    ("New York", 40.7128, -74.0060),
+    ("Los Angeles", 34.0522, -118.2437),
+    ("San Francisco", 37.7749, -122.4194),
+    ("Las Vegas", 36.1699, -115.1398),
+    ("Chicago", 41.8781, -87.6298),
+    ("Miami", 25.7617, -80.1918),
+    ("Orlando", 28.5383, -81.3792),
+    ("Washington", 38.9072, -77.0369),
+    ("Boston", 42.3601, -71.0589),
+    ("Seattle", 47.6062, -122.3321),
+    ("New Orleans", 29.9511, -90.0715),
+    ("Honolulu", 21.3069, -157.8583),
+    ("Toronto", 43.6532, -79.3832),
+    ("Vancouver", 49.2827, -123.1207),
+    ("Montreal", 45.5017, -73.5673),
+    ("Mexico City", 19.4326, -99.1332),
+    ("Cancun", 21.1619, -86.8515),
+    ("Havana", 23.1136, -82.3666),
+    ("Rio de Janeiro", -22.9068, -43.1729),
+    ("Sao Paulo", -23.5505, -46.6333),
+    ("Buenos Aires", -34.6037, -58.3816),
+    ("Lima", -12.0464, -77.0428),
+    ("Cusco", -13.5320, -71.9675),
+    ("Santiago", -33.4489, -70.6693),
+    ("Bogota", 4.7110, -74.0721),
+    # Oceania
+    ("Sydney", -33.8688, 151.2093),
+    ("Melbourne", -37.8136, 144.9631),
+    ("Brisbane", -27.4698, 153.0251),
+    ("Perth", -31.9505, 115.8605),
+    ("Auckland", -36.8485, 174.7633),
+    ("Queenstown", -45.0312, 168.6626),
+)
+
+# Common alternative names (abbreviations, former and local names) mapped to
+# the seed name they refer to; lowercase keys
+PLACE_ALIASES: Dict[str, str] = {
+    "nyc": "New York",
+    "new york city": "New York",
+    "la": "Los Angeles",
+    "sf": "San Francisco",
+    "san fran": "San Francisco",
+    "dc": "Washington",
+    "washington dc": "Washington",
+    "washington d.c.": "Washington",
+    "vegas": "Las Vegas",
+    "nola": "New Orleans",
+    "cdmx": "Mexico City",
+    "rio": "Rio de Janeiro",
+    "bengaluru": "Bangalore",
+    "bombay": "Mumbai",
+    "calcutta": "Kolkata",
+    "madras": "Chennai",
+    "mysuru": "Mysore",
+    "cochin": "Kochi",
+    "benares": "Varanasi",
+    "peking": "Beijing",
+    "saigon": "Ho Chi Minh City",
+    "kl": "Kuala Lumpur",
+    "constantinople": "Istanbul",
+    "st petersburg": "Saint Petersburg",
+    "st. petersburg": "Saint Petersburg",
+    "cracow": "Krakow",
+    "kraków": "Krakow",
+    "praha": "Prague",
+    "wien": "Vienna",
+    "münchen": "Munich",
+    "muenchen": "Munich",
+    "köln": "Cologne",
+    "koeln": "Cologne",
+    "firenze": "Florence",
+    "venezia": "Venice",
+    "roma": "Rome",
+    "milano": "Milan",
+    "napoli": "Naples",
+    "lisboa": "Lisbon",
+    "sevilla": "Seville",
+    "københavn": "Copenhagen",
+    "zürich": "Zurich",
+    "genève": "Geneva",
+    "luzern": "Lucerne",
+    "bruxelles": "Brussels",
+    "brugge": "Bruges",
+    "athina": "Athens",
+    "marrakesh": "Marrakech",
+}
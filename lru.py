@@ -0,0 +1,53 @@
+"""
+LRU - bounded, thread-safe mapping shared by the agents' caches
+Reads refresh an entry and writes evict the least recently used ones once
+max_entries is exceeded. Entries are kept regardless of age; callers store
+their own timestamps and decide what is fresh.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Mapping bounded to max_entries; reads refresh an entry, writes evict the least recently used"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def peek(self, key: Hashable) -> Any:
+        """Value of a key without refreshing it, or None"""
+        return self._entries.get(key)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._trim()
+
+    def setdefault(self, key: Hashable, value: Any) -> Any:
+        """Value already stored for key (refreshed), else store and return value"""
+        with self._lock:
+            existing = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            self._trim()
+            return existing
+
+    def _trim(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -1,11 +1,178 @@
 """
 Main script for the Multi-Agent Tourism System
+
+Usage:
+    python main.py                                  # interactive
+    python main.py --batch queries.txt --workers 16 --output results.jsonl
+    cat queries.jsonl | python main.py --batch -
 """
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Deque, Dict, Iterator, List, Optional, TextIO
+
 from tourism_agent import TourismAgent
+from deadline import Deadline
+from session_store import Session
+
+
+def read_batch(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Yield batch items from plain query lines or JSONL objects
+    
+    Args:
+        stream: Text stream with one query per line; a line starting with
+                '{' is parsed as {"query": ..., "place": ..., "id": ...}
+                
+    Returns:
+        Iterator of dicts with 'line', 'query' and optional 'place'/'id'
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield {"line": number, "query": "", "error": f"invalid JSON: {e}"}
+                continue
+            item["line"] = number
+            yield item
+        else:
+            yield {"line": number, "query": line}
+
+
+def run_batch_item(agent: TourismAgent, item: Dict[str, Any], deadline_seconds: Optional[float]) -> Dict[str, Any]:
+    """Answer one batch item, capturing errors and latency in the output record"""
+    record: Dict[str, Any] = {"line": item["line"]}
+    if "id" in item:
+        record["id"] = item["id"]
+    query, place = item.get("query") or "", item.get("place") or ""
+    start = time.perf_counter()
+    if item.get("error"):
+        error = item["error"]
+    elif not isinstance(query, str) or not isinstance(place, str):
+        error = "query and place must be strings"
+    else:
+        query, place = query.strip(), place.strip() or None
+        error = None if query or place else "empty query"
+    record["query"] = query
+    if error:
+        record["error"] = error
+    else:
+        try:
+            deadline = Deadline(deadline_seconds) if deadline_seconds else None
+            result = agent.process_query(query or place, deadline, place)
+            record.update(result)
+        except Exception as e:
+            record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return record
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
 
 
-def main():
+def run_batch(agent: TourismAgent, source: TextIO, output: TextIO, workers: int = 8,
+              deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Process a batch of queries with bounded parallelism
+    Results are written as JSONL in input order as soon as each one (and
+    everything before it) is done; input is read lazily so memory stays
+    bounded by the number of queries in flight
+    
+    Args:
+        agent: Tourism agent shared by all workers
+        source: Stream of plain query lines or JSONL objects
+        output: Stream receiving one JSON result per line
+        workers: Number of queries processed concurrently
+        deadline_seconds: Optional time budget per query
+        
+    Returns:
+        Summary with counts, throughput and latency percentiles
+    """
+    window = max(1, workers) * 2
+    pending: Deque[Future] = deque()
+    latencies: List[float] = []
+    errors = partial = 0
+    start = time.perf_counter()
+    
+    def write(record: Dict[str, Any]) -> None:
+        nonlocal errors, partial
+        latencies.append(record["elapsed_ms"])
+        errors += 1 if "error" in record else 0
+        partial += 1 if record.get("partial") else 0
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for item in read_batch(source):
+            pending.append(executor.submit(run_batch_item, agent, item, deadline_seconds))
+            while len(pending) >= window or (pending and pending[0].done()):
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "errors": errors,
+        "partial": partial,
+        "seconds": round(elapsed, 2),
+        "queries_per_second": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def batch_main(args: argparse.Namespace) -> None:
+    """Run batch mode; agent debug output goes to stderr so stdout stays valid JSONL"""
+    source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    output = sys.stdout if args.output in (None, "-") else open(args.output, "w", encoding="utf-8")
+    try:
+        with redirect_stdout(sys.stderr):
+            agent = TourismAgent()
+            summary = run_batch(agent, source, output, args.workers, args.deadline)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    latency = summary["latency_ms"]
+    print(f"Processed {summary['queries']} queries in {summary['seconds']}s "
+          f"({summary['queries_per_second']}/s) with {args.workers} workers; "
+          f"{summary['errors']} errors, {summary['partial']} partial", file=sys.stderr)
+    print(f"Latency ms: p50 {latency['p50']}  p95 {latency['p95']}  "
+          f"p99 {latency['p99']}  max {latency['max']}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the tourism system"""
+    parser = argparse.ArgumentParser(description="Multi-Agent Tourism System")
+    parser.add_argument("--batch", metavar="FILE", help="process queries from FILE ('-' for stdin) and exit")
+    parser.add_argument("--workers", type=int, default=8, help="queries processed concurrently in batch mode")
+    parser.add_argument("--output", metavar="FILE", help="JSONL results file for batch mode (default stdout)")
+    parser.add_argument("--deadline", type=float, help="time budget per query in seconds (batch mode)")
+    args = parser.parse_args(argv)
+    
+    if args.batch:
+        batch_main(args)
+        return
+    
     print("=" * 60)
     print("Welcome to the Multi-Agent Tourism System!")
     print("=" * 60)
@@ -14,9 +181,12 @@ def main():
     print("  - 'I'm going to go to Bangalore, let's plan my trip.'")
     print("  - 'I'm going to go to Bangalore, what is the temperature there'")
     print("  - 'I'm going to go to Bangalore, what is the temperature there? And what are the places I can visit?'")
+    print("  - 'What about tomorrow?' (follow-ups refer to the last place)")
     print("\nType 'quit' or 'exit' to stop.\n")
     
     agent = TourismAgent()
+    # Follow-ups like "what about tomorrow?" reuse the last place asked about
+    session = Session()
     
     while True:
         try:
@@ -33,7 +203,7 @@ def main():
             print("Processing your request...")
             print("=" * 60 + "\n")
             
-            response = agent.process_request(user_input)
+            response = agent.process_query(user_input, session=session)['response']
             print(response)
             print()
             
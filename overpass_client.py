@@ -0,0 +1,180 @@
+"""
+Overpass Client - multi-endpoint failover with hedged requests
+Routes Overpass queries across several interpreter endpoints by health score,
+sends a hedged duplicate to the next endpoint once the primary exceeds its
+p95 latency, and returns whichever answer arrives first
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from deadline import Deadline, timeout_for
+from profiling import request_task
+
+DEFAULT_ENDPOINTS = (
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+)
+
+# Hedge delay used until an endpoint has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 2.0
+
+
+class OverpassEndpoint:
+    """One Overpass interpreter with its own breaker and health score"""
+
+    def __init__(self, url: str, base_timeout: float = 10.0):
+        self.url = url
+        self.breaker = CircuitBreaker(f"overpass:{url}", base_timeout)
+
+    def health_score(self) -> float:
+        """Lower is better: EWMA latency plus the error rate priced at a full timeout"""
+        latency = self.breaker.latency_ewma or 0.0
+        return latency + self.breaker.error_rate * self.breaker.base_timeout
+
+    def hedge_delay(self, default: float) -> float:
+        if self.breaker.sample_count < 20:
+            return default
+        return self.breaker.percentile(0.95)
+
+
+class OverpassClient:
+    """Send Overpass queries with health-based routing, hedging and failover"""
+
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="overpass")
+
+    def __init__(self, endpoints: Optional[Sequence[str]] = None, max_hedges: int = 1,
+                 hedge_delay: Optional[float] = None):
+        """
+        Args:
+            endpoints: Interpreter URLs in preference order; defaults to the
+                OVERPASS_ENDPOINTS environment variable (comma-separated) or
+                DEFAULT_ENDPOINTS
+            max_hedges: Duplicate requests sent while the first is outstanding
+            hedge_delay: Fixed hedge delay in seconds (default: endpoint p95,
+                or OVERPASS_HEDGE_DELAY)
+        """
+        if endpoints is None:
+            configured = os.environ.get("OVERPASS_ENDPOINTS", "")
+            endpoints = [url.strip() for url in configured.split(",") if url.strip()] or DEFAULT_ENDPOINTS
+        self.endpoints: List[OverpassEndpoint] = [OverpassEndpoint(url) for url in endpoints]
+        self.max_hedges = max_hedges
+        if hedge_delay is None and os.environ.get("OVERPASS_HEDGE_DELAY"):
+            hedge_delay = float(os.environ["OVERPASS_HEDGE_DELAY"])
+        self.fixed_hedge_delay = hedge_delay
+
+    def ranked_endpoints(self) -> List[OverpassEndpoint]:
+        """Endpoints not known to be down, healthiest first (ties keep configured order)"""
+        available = [endpoint for endpoint in self.endpoints if not endpoint.breaker.is_open()]
+        return sorted(available, key=lambda endpoint: endpoint.health_score())
+
+    def timeout(self) -> float:
+        """Upper bound for one query, including a hedge"""
+        slowest = max(endpoint.breaker.timeout() for endpoint in self.endpoints)
+        return slowest + self._hedge_delay(self.endpoints[0])
+
+    def _hedge_delay(self, endpoint: OverpassEndpoint) -> float:
+        if self.fixed_hedge_delay is not None:
+            return self.fixed_hedge_delay
+        return endpoint.hedge_delay(DEFAULT_HEDGE_DELAY)
+
+    def post(self, query: str, timeout: Optional[float] = None,
+             deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Run an Overpass query and return the parsed JSON of the first answer
+
+        Args:
+            query: Overpass QL query
+            timeout: Overall time budget in seconds (default: self.timeout())
+            deadline: Optional request deadline capping the budget
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            CircuitOpenError: if every endpoint's circuit is open
+            requests.exceptions.RequestException: if every attempt failed or
+                the time budget ran out
+        """
+        budget = timeout_for(deadline, timeout if timeout is not None else self.timeout())
+        candidates = self.ranked_endpoints()
+        if not candidates:
+            raise CircuitOpenError("all Overpass endpoints are unavailable")
+
+        # Attempts share one Deadline covering the whole budget
+        deadline = Deadline(budget)
+        give_up_at = deadline.expires_at
+        results: "queue.Queue" = queue.Queue()
+        cancelled = threading.Event()
+
+        launched = 0
+        failures = 0
+        hedges = 0
+        last_error: Optional[Exception] = None
+
+        def launch(endpoint: OverpassEndpoint) -> None:
+            nonlocal launched
+            launched += 1
+            # Attempts run on a shared pool; request_task keeps them in the request's profile
+            self._executor.submit(request_task(self._attempt), endpoint, query, deadline, results, cancelled)
+
+        launch(candidates[0])
+        next_index = 1
+        hedge_at = time.monotonic() + self._hedge_delay(candidates[0])
+
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= give_up_at:
+                    raise requests.exceptions.Timeout(f"Overpass query exceeded {budget:.1f}s")
+
+                can_hedge = hedges < self.max_hedges and next_index < len(candidates)
+                wait = min(give_up_at, hedge_at) - now if can_hedge else give_up_at - now
+
+                try:
+                    endpoint, data, error = results.get(timeout=max(wait, 0.0))
+                except queue.Empty:
+                    if can_hedge and time.monotonic() >= hedge_at:
+                        print(f"[DEBUG] Hedging Overpass query to {candidates[next_index].url}")
+                        launch(candidates[next_index])
+                        next_index += 1
+                        hedges += 1
+                        hedge_at = time.monotonic() + self._hedge_delay(candidates[next_index - 1])
+                    continue
+
+                if error is None:
+                    print(f"[DEBUG] Overpass answer from {endpoint.url}")
+                    return data
+
+                failures += 1
+                last_error = error
+                # Fail over immediately instead of waiting for the hedge delay
+                if next_index < len(candidates):
+                    launch(candidates[next_index])
+                    next_index += 1
+                elif failures >= launched:
+                    raise last_error
+        finally:
+            cancelled.set()
+
+    @staticmethod
+    def _attempt(endpoint: OverpassEndpoint, query: str, deadline: Optional[Deadline],
+                 results: "queue.Queue", cancelled: threading.Event) -> None:
+        if cancelled.is_set():
+            return
+        try:
+            response = endpoint.breaker.request("POST", endpoint.url, deadline=deadline, data={"data": query})
+            results.put((endpoint, response.json(), None))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Overpass endpoint {endpoint.url} error: {e}")
+            results.put((endpoint, None, e))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [dict(endpoint.breaker.stats(), url=endpoint.url, health_score=endpoint.health_score())
+                for endpoint in self.endpoints]
@@ -0,0 +1,131 @@
+"""
+Place Recognizer - gazetteer scan for place names in free text
+Known names and aliases are stored in a token trie; the input is tokenized
+once and, from each token, the trie is walked to find the longest known name
+starting there (leftmost-longest matching), so lookup cost depends on the
+length of the query, not on the size of the gazetteer
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from known_places import PLACE_ALIASES, SEED_PLACES
+
+_TOKEN = re.compile(r"[^\W_]+(?:['.\-][^\W_]+)*\.?")
+
+# Names that are also everyday words (or tiny abbreviations) only count when
+# written with a capital letter mid-sentence and not followed by another
+# capitalized word: "weather in Nice in May" but not "a nice place",
+# "Nice places to visit" or "La Paz"
+AMBIGUOUS_NAMES = frozenset({"nice", "split", "la", "sf", "dc", "kl", "rio", "bali", "cork", "reading"})
+
+# Trie node key marking the end of a name; the value is the display name
+_END = ""
+
+
+class PlaceMatch(NamedTuple):
+    name: str
+    start: int
+    end: int
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Lowercased word tokens of text with their character spans"""
+    tokens = []
+    for match in _TOKEN.finditer(text):
+        token = match.group().lower().rstrip(".")
+        if token:
+            tokens.append((token, match.start(), match.end()))
+    return tokens
+
+
+class PlaceRecognizer:
+    """Finds known place names and aliases in user input"""
+
+    def __init__(self, seed: bool = True):
+        """
+        Args:
+            seed: Load the seed gazetteer and its aliases
+        """
+        self._root: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._size = 0
+        if seed:
+            for name, _, _ in SEED_PLACES:
+                self.add(name)
+            for alias, name in PLACE_ALIASES.items():
+                self.add(alias, name)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, name: str, canonical: Optional[str] = None) -> None:
+        """
+        Add a name to the gazetteer
+
+        Args:
+            name: Name as it may appear in text
+            canonical: Display name returned for matches (defaults to name)
+        """
+        tokens = [token for token, _, _ in tokenize(name)]
+        if not tokens:
+            return
+        with self._lock:
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if _END not in node:
+                self._size += 1
+            node[_END] = canonical or name.strip()
+
+    def find_all(self, text: str) -> List[PlaceMatch]:
+        """Every known place mentioned in text, in order, without overlaps"""
+        tokens = tokenize(text)
+        matches: List[PlaceMatch] = []
+        i = 0
+        while i < len(tokens):
+            node = self._root
+            longest: Optional[Tuple[int, str]] = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    longest = (j, node[_END])
+            if longest is not None and self._accept(text, tokens, i, longest[0]):
+                end, name = longest
+                matches.append(PlaceMatch(name, tokens[i][1], tokens[end - 1][2]))
+                i = end
+            else:
+                i += 1
+        return matches
+
+    def find(self, text: str) -> Optional[str]:
+        """First known place mentioned in text, or None"""
+        matches = self.find_all(text)
+        return matches[0].name if matches else None
+
+    @staticmethod
+    def _accept(text: str, tokens: List[Tuple[str, int, int]], start: int, end: int) -> bool:
+        if end - start > 1 or tokens[start][0] not in AMBIGUOUS_NAMES:
+            return True
+        if not text[tokens[start][1]].isupper():
+            return False
+        # A capital at the start of a sentence says nothing ("Nice places to visit")
+        if not text[:tokens[start][1]].rstrip() or text[:tokens[start][1]].rstrip()[-1] in ".!?":
+            return False
+        # Nor does one opening a longer proper noun ("La Paz", "Rio Grande")
+        return end >= len(tokens) or not text[tokens[end][1]].isupper()
+
+    def names(self) -> Iterable[str]:
+        """Display names of every entry (aliases give their canonical name)"""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == _END:
+                    yield child
+                else:
+                    stack.append(child)
@@ -0,0 +1,203 @@
+"""
+Place Suggest - prefix autocomplete over known places
+Sorted array of normalized name keys searched with bisect; every word start
+of a name is indexed ("york" finds New York) and matches are ranked by how
+often the place has been asked for. Places resolved by queries are only
+indexed once they look like real destinations, and the index is bounded.
+
+Environment:
+    SUGGEST_MAX_PLACES      places indexed, least requested evicted first (default 20000)
+    SUGGEST_MIN_REQUESTS    requests before an unvetted name is indexed (default 3)
+"""
+import bisect
+import heapq
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from known_places import SEED_PLACES
+
+# Upper bound on index keys scanned for one prefix (single letters match many)
+MAX_SCAN = 2000
+
+# Names waiting for SUGGEST_MIN_REQUESTS requests that are tracked at once
+MAX_PENDING = 10000
+
+
+class PlaceSuggester:
+    """In-memory autocomplete index of places with known coordinates"""
+
+    def __init__(self, seed: bool = True, max_places: Optional[int] = None, min_requests: Optional[int] = None):
+        """
+        Args:
+            seed: Load the seed gazetteer of popular destinations
+            max_places: Places indexed; past that the least requested place
+                        outside the seed list is evicted (default SUGGEST_MAX_PLACES)
+            min_requests: Requests before a name not vetted by the geocoder is
+                          indexed (default SUGGEST_MIN_REQUESTS)
+        """
+        self.max_places = max_places or int(os.environ.get("SUGGEST_MAX_PLACES", 20000))
+        self.min_requests = min_requests or int(os.environ.get("SUGGEST_MIN_REQUESTS", 3))
+        # Parallel sorted arrays: index key -> place id
+        self._keys: List[str] = []
+        self._ids: List[int] = []
+        # Place id -> (display name, latitude, longitude); None for a freed id
+        self._places: List[Optional[Tuple[str, float, float]]] = []
+        self._free: List[int] = []
+        self._by_name: Dict[str, int] = {}
+        self._popularity: List[int] = []
+        # Seed places are never evicted
+        self._pinned: set = set()
+        # (popularity when pushed, place id) of evictable places; popularity only
+        # grows, so an entry found out of date is pushed back with its current value
+        self._eviction_heap: List[Tuple[int, int]] = []
+        # Evicted places whose index keys are still in the arrays (skipped by
+        # suggest) until the next compaction, which frees their ids for reuse
+        self._evicted: List[int] = []
+        self._dead_keys = 0
+        # Normalized name -> requests so far, for names not indexed yet
+        self._pending: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        if seed:
+            for name, latitude, longitude in SEED_PLACES:
+                self._pinned.add(self.add(name, (latitude, longitude)))
+            self._eviction_heap = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def add(self, name: str, coordinates: Tuple[float, float]) -> int:
+        """Index a place under its full name and each later word start, returning its id"""
+        normalized = self.normalize(name)
+        with self._lock:
+            place_id = self._by_name.get(normalized)
+            if place_id is not None:
+                return place_id
+            if len(self._by_name) >= self.max_places:
+                self._evict()
+            entry = (name.strip(), coordinates[0], coordinates[1])
+            if self._free:
+                place_id = self._free.pop()
+                self._places[place_id] = entry
+                self._popularity[place_id] = 0
+            else:
+                place_id = len(self._places)
+                self._places.append(entry)
+                self._popularity.append(0)
+            self._by_name[normalized] = place_id
+            heapq.heappush(self._eviction_heap, (0, place_id))
+            words = normalized.split(" ")
+            for i in range(len(words)):
+                key = " ".join(words[i:])
+                position = bisect.bisect_right(self._keys, key)
+                self._keys.insert(position, key)
+                self._ids.insert(position, place_id)
+            return place_id
+
+    def _evict(self) -> None:
+        """Drop the least requested place outside the seed list (lock held)"""
+        heap = self._eviction_heap
+        while heap:
+            popularity, victim = heap[0]
+            if self._places[victim] is None or victim in self._pinned:
+                heapq.heappop(heap)
+            elif popularity != self._popularity[victim]:
+                heapq.heapreplace(heap, (self._popularity[victim], victim))
+            else:
+                heapq.heappop(heap)
+                break
+        else:
+            return
+        name = self._places[victim][0]
+        del self._by_name[self.normalize(name)]
+        self._places[victim] = None
+        self._evicted.append(victim)
+        self._dead_keys += len(self.normalize(name).split(" "))
+        if self._dead_keys > max(1024, len(self._keys) // 4):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Remove the index keys of evicted places and free their ids (lock held)"""
+        keep = [i for i, place_id in enumerate(self._ids) if self._places[place_id] is not None]
+        self._keys = [self._keys[i] for i in keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._free.extend(self._evicted)
+        self._evicted = []
+        self._dead_keys = 0
+
+    def record(self, name: str, coordinates: Optional[Tuple[float, float]] = None, trusted: bool = False) -> None:
+        """
+        Count a request for a place, indexing it if coordinates are given and
+        the name is trusted or has now been requested min_requests times
+
+        Args:
+            name: Place name as resolved
+            coordinates: Its coordinates, if known
+            trusted: The geocoder vetted the name (it resolved to a town or city)
+        """
+        normalized = self.normalize(name)
+        place_id = self._by_name.get(normalized)
+        if place_id is None:
+            if coordinates is None:
+                return
+            if not trusted:
+                with self._lock:
+                    requests = self._pending.pop(normalized, 0) + 1
+                    if requests < self.min_requests:
+                        self._pending[normalized] = requests
+                        if len(self._pending) > MAX_PENDING:
+                            self._pending.popitem(last=False)
+                        return
+            place_id = self.add(name, coordinates)
+        with self._lock:
+            self._popularity[place_id] += 1
+
+    def resolve(self, name: str) -> Optional[Tuple[str, Tuple[float, float]]]:
+        """
+        Look up an exact (case-insensitive) place name
+
+        Returns:
+            Tuple of (display name, (latitude, longitude)) or None if unknown
+        """
+        place_id = self._by_name.get(self.normalize(name))
+        if place_id is None:
+            return None
+        entry = self._places[place_id]
+        if entry is None:
+            return None
+        display, latitude, longitude = entry
+        return display, (latitude, longitude)
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[Dict[str, object]]:
+        """
+        Places whose name, or a word in it, starts with the prefix
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of {'name', 'lat', 'lon'} dicts, most requested first
+        """
+        key = self.normalize(prefix)
+        if not key:
+            return []
+        with self._lock:
+            start = bisect.bisect_left(self._keys, key)
+            end = bisect.bisect_left(self._keys, key + "\uffff", start, min(start + MAX_SCAN, len(self._keys)))
+            # A place indexed under several word starts can appear more than once;
+            # keys of evicted places wait for compaction and are skipped
+            live = (i for i in range(start, end) if self._places[self._ids[i]] is not None)
+            ranked = heapq.nsmallest(limit * 2, live,
+                                     key=lambda i: (-self._popularity[self._ids[i]], self._keys[i]))
+            place_ids: List[int] = []
+            for i in ranked:
+                if self._ids[i] not in place_ids:
+                    place_ids.append(self._ids[i])
+            places = [self._places[place_id] for place_id in place_ids[:limit]]
+        return [{"name": name, "lat": latitude, "lon": longitude} for name, latitude, longitude in places]
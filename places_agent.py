@@ -3,43 +3,223 @@ Places Agent - Child Agent 2
 Fetches tourist attractions using Overpass API (OpenStreetMap)
 Supports all cities globally
 """
+import os
+import re
 import requests
+import sys
 import time
-from typing import List, Optional, Tuple, Set, Dict
-from difflib import get_close_matches
+from typing import Any, List, Optional, Tuple, Set, Dict
 from functools import lru_cache
 
+from circuit_breaker import get_breaker
+from overpass_client import OverpassClient
+from deadline import Deadline
+from geocode_cache import GeocodeCache
+from known_places import PLACE_ALIASES
+from lru import LRUCache
+from spell_index import SpellIndex
+from tiles import (Feature, Tile, TileCache, features_within, merge_bounds, select_features, tile_for,
+                   tiles_covering)
+
+
+# Tag classes answering each place category. A tag class is "key=value" or
+# "key=*" (any value), matching the tag classes recorded for each feature.
+CATEGORY_TAG_CLASSES: Dict[str, Tuple[str, ...]] = {
+    "museums": ("tourism=museum", "tourism=gallery"),
+    "parks": ("leisure=park", "leisure=garden", "leisure=nature_reserve"),
+    "historic": ("historic=*",),
+    "viewpoints": ("tourism=viewpoint",),
+    "zoos": ("tourism=zoo", "tourism=aquarium"),
+    "theme_parks": ("tourism=theme_park",),
+    "attractions": ("tourism=attraction",),
+}
+
+# Tag keys whose values are recorded as tag classes
+INDEXED_TAG_KEYS = ("tourism", "historic", "leisure")
+
+# Tiles are fetched whole, so leave out tags that are numerous but never an
+# attraction (accommodation, information boards, playgrounds, pitches, ...)
+EXCLUDED_TOURISM_VALUES = "^(hotel|hostel|guest_house|motel|apartment|chalet|camp_site|caravan_site|camp_pitch|information|picnic_site|wilderness_hut|alpine_hut)$"
+INCLUDED_LEISURE_VALUES = "^(park|garden|nature_reserve|water_park|beach_resort|marina)$"
+
+_EXCLUDED_TOURISM = re.compile(EXCLUDED_TOURISM_VALUES)
+_INCLUDED_LEISURE = re.compile(INCLUDED_LEISURE_VALUES)
+
+
+def attraction_tag_classes(tags: Dict[str, str]) -> Tuple[str, ...]:
+    """
+    Tag classes ("tourism=museum" plus "tourism=*") of every indexed tag of a
+    feature that passes the attraction filters, the same ones the tile query
+    applies; empty if the feature is not an attraction
+    """
+    classes: List[str] = []
+    for tag_key in INDEXED_TAG_KEYS:
+        value = tags.get(tag_key)
+        if not value:
+            continue
+        if tag_key == "tourism" and _EXCLUDED_TOURISM.search(value):
+            continue
+        if tag_key == "leisure" and not _INCLUDED_LEISURE.search(value):
+            continue
+        classes.append(sys.intern(f"{tag_key}={value}"))
+        classes.append(sys.intern(f"{tag_key}=*"))
+    return tuple(classes)
+
+
+GENERIC_PLACE_NAMES = {"park", "museum", "gallery", "monument", "attraction", "place"}
+
+PLACES_TTL_SECONDS = 24 * 3600
+PLACES_RADIUS_M = 15000
+# Tiles within this radius are searched first; the full radius only when they hold too few places
+NEAR_RADIUS_M = 5000
+# Overpass elements returned for one tile request; a truncated answer is used but not cached
+MAX_TILE_ELEMENTS = 5000
+
+# Resolved OSM objects remembered for alias matching
+MAX_IDENTITIES = 10000
+
+# Locations whose place lists are kept, least recently used evicted first
+PLACES_CACHE_MAX_ENTRIES = int(os.environ.get("PLACES_CACHE_MAX_ENTRIES", 20000))
+
+# Nominatim result types that name a destination (as opposed to a shop, a road or a word)
+SETTLEMENT_TYPES = ("city", "town", "administrative", "village")
+
+_MISSING = object()
+
+
+class PlaceList(list):
+    """List of place names; stale is set when served from an expired cache entry"""
+    stale = False
+
+
+class PlaceIdentity(tuple):
+    """
+    Canonical (latitude, longitude) of a resolved place, carrying the OSM
+    object Nominatim matched. Unpacks like a coordinate pair; every name that
+    resolves to the same OSM object shares one instance, and so one point and
+    one set of weather and places cache entries.
+    """
+    
+    def __new__(cls, latitude: float, longitude: float, osm_type: Optional[str] = None,
+                osm_id: Optional[int] = None, name: Optional[str] = None, settlement: bool = False,
+                corrected: Optional[str] = None):
+        identity = super().__new__(cls, (latitude, longitude))
+        identity.osm_type = osm_type
+        identity.osm_id = osm_id
+        identity.name = name
+        # Nominatim matched a town, city or administrative area
+        identity.settlement = settlement
+        # Spelling the requested name was corrected to ("Pariss" -> "Paris"); set
+        # only on the copy returned for that request, never on the shared instance
+        identity.corrected = corrected
+        return identity
+    
+    def corrected_to(self, name: str) -> "PlaceIdentity":
+        """Copy of this identity for a request whose place name was corrected to name"""
+        return PlaceIdentity(self[0], self[1], self.osm_type, self.osm_id, self.name, self.settlement, name)
+    
+    @property
+    def key(self) -> Optional[Tuple[str, int]]:
+        """(osm_type, osm_id), or None for places not resolved through Nominatim"""
+        return (self.osm_type, self.osm_id) if self.osm_id is not None else None
+    
+    def __reduce__(self):
+        return (PlaceIdentity, (self[0], self[1], self.osm_type, self.osm_id, self.name, self.settlement,
+                                self.corrected))
+
 
 class PlacesAgent:
     """Agent responsible for fetching tourist attractions and places"""
     
-    def __init__(self):
-        self.overpass_url = "https://overpass-api.de/api/interpreter"
-        self.nominatim_url = "https://nominatim.openstreetmap.org/search"
-        self._coordinate_cache: Dict[str, Optional[Tuple[float, float]]] = {}
+    def __init__(self, poi_store_path: Optional[str] = None, overpass_endpoints: Optional[List[str]] = None):
+        # Overpass endpoints come from OVERPASS_ENDPOINTS unless given explicitly
+        self.overpass = OverpassClient(overpass_endpoints)
+        self.overpass_url = self.overpass.endpoints[0].url
+        self.nominatim_url = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+        # Local POI store built by import_pois.py; Overpass is only used outside its coverage
+        self.poi_store = self._open_poi_store(poi_store_path or os.environ.get("POI_STORE_PATH"))
+        # Bounded by GEOCODE_CACHE_MAX_BYTES; frequency-aware admission keeps popular places
+        self._coordinate_cache = GeocodeCache()
+        # Known place names (seed gazetteer plus every successful geocode) for typo snapping
+        self.spell_index = SpellIndex()
+        # One PlaceIdentity per OSM object, shared by every name resolving to it
+        self._identities = LRUCache(MAX_IDENTITIES)
+        self.nominatim_breaker = get_breaker("nominatim")
+        # location key -> (fetched_at, places), kept past expiry as a stale fallback
+        # until evicted by PLACES_CACHE_MAX_ENTRIES
+        self._places_cache = LRUCache(PLACES_CACHE_MAX_ENTRIES)
+        # Named features per map tile; overlapping searches share tiles
+        self.tiles = TileCache(PLACES_TTL_SECONDS)
     
-    def get_coordinates(self, place_name: str) -> Optional[Tuple[float, float]]:
+    @staticmethod
+    def _open_poi_store(path: Optional[str]):
+        """Open the local POI store, or None when not configured or unreadable"""
+        if not path:
+            return None
+        try:
+            from poi_store import POIStore
+            store = POIStore(path)
+            print(f"[DEBUG] Loaded POI store {path} with {len(store)} features")
+            return store
+        except (OSError, ValueError) as e:
+            print(f"POI store error: {e}")
+            return None
+    
+    def _store_covers(self, latitude: float, longitude: float) -> bool:
+        return self.poi_store is not None and self.poi_store.covers(latitude, longitude)
+    
+    def get_coordinates(self, place_name: str, deadline: Optional[Deadline] = None) -> Optional[PlaceIdentity]:
         """
         Get coordinates for a place using Nominatim API with caching and fuzzy matching
         Supports all cities globally (worldwide coverage)
-        Handles case-insensitive input and spelling mistakes
+        Handles case-insensitive input, spelling mistakes and common aliases
         
         Args:
             place_name: Name of the place (city, country, landmark, etc.)
+            deadline: Optional request deadline bounding the upstream call
             
         Returns:
-            Tuple of (latitude, longitude) or None if not found
+            PlaceIdentity (a (latitude, longitude) tuple) or None if not found;
+            aliases of one place get the same identity. If the name was
+            misspelled, its 'corrected' attribute holds the corrected name.
         """
         # Normalize place name for caching (lowercase, strip)
         normalized_name = place_name.lower().strip()
         
-        # Check cache first
-        if normalized_name in self._coordinate_cache:
-            return self._coordinate_cache[normalized_name]
+        # Known aliases ("nyc", "bombay") share their place's cache entry
+        alias_of = PLACE_ALIASES.get(normalized_name)
+        if alias_of:
+            place_name = alias_of
+            normalized_name = alias_of.lower()
+        
+        # Check cache first (None is a cached "not found")
+        cached = self._coordinate_cache.get(normalized_name, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        # Snap near-miss spellings ("pariss", "bangalor") to a known name first
+        corrected = self.spell_index.correct(normalized_name)
+        if corrected and corrected != normalized_name:
+            print(f"[DEBUG] Corrected place name: {place_name} -> {corrected}")
+            cached = self._coordinate_cache.get(corrected, _MISSING)
+            identity = cached if cached is not _MISSING else self._geocode(corrected, corrected, deadline)
+            if identity is None:
+                return None
+            return identity.corrected_to(" ".join(word.capitalize() for word in corrected.split()))
+        
+        return self._geocode(place_name, normalized_name, deadline)
+    
+    def _geocode(self, place_name: str, normalized_name: str,
+                 deadline: Optional[Deadline] = None) -> Optional[PlaceIdentity]:
+        """Look a place up on Nominatim and cache the answer (a miss too) under normalized_name"""
+        # Fail fast while Nominatim is known to be down (nothing cached to serve)
+        if self.nominatim_breaker.is_open():
+            print(f"[DEBUG] Nominatim circuit open, skipping lookup for {place_name}")
+            return None
         
         try:
-            # Reduced delay for faster processing
-            time.sleep(0.5)
+            # Reduced delay for faster processing (never past the deadline)
+            time.sleep(min(0.5, deadline.remaining()) if deadline else 0.5)
             
             print(f"[DEBUG] Fetching coordinates for: {place_name}")
             
@@ -57,9 +237,9 @@ class PlacesAgent:
             }
             
             print(f"[DEBUG] Making request to Nominatim API...")
-            response = requests.get(self.nominatim_url, params=params, headers=headers, timeout=5)
+            response = self.nominatim_breaker.request("GET", self.nominatim_url, deadline=deadline,
+                                                     params=params, headers=headers)
             print(f"[DEBUG] Nominatim API responded with status: {response.status_code}")
-            response.raise_for_status()
             
             data = response.json()
             print(f"[DEBUG] Received {len(data)} results from Nominatim")
@@ -76,7 +256,7 @@ class PlacesAgent:
                     
                     # Calculate match score
                     score = 0
-                    if place_type in ["city", "town", "administrative", "village"]:
+                    if place_type in SETTLEMENT_TYPES:
                         score += 10
                     if class_type in ["place", "boundary"]:
                         score += 5
@@ -92,9 +272,10 @@ class PlacesAgent:
                 if candidates:
                     candidates.sort(key=lambda x: x[0], reverse=True)
                     best_match = candidates[0]
-                    result = (best_match[1], best_match[2])
+                    result = self._identity(best_match[1], best_match[2], best_match[3], place_name)
                     self._coordinate_cache[normalized_name] = result
-                    print(f"[DEBUG] Found coordinates: {result}")
+                    self._learn_spelling(normalized_name, result)
+                    print(f"[DEBUG] Found coordinates: {result} ({result.osm_type} {result.osm_id})")
                     return result
                 
                 # Fallback: use first result
@@ -102,8 +283,9 @@ class PlacesAgent:
                 lat = float(location.get("lat", 0))
                 lon = float(location.get("lon", 0))
                 if lat != 0 and lon != 0:
-                    result = (lat, lon)
+                    result = self._identity(lat, lon, location, place_name)
                     self._coordinate_cache[normalized_name] = result
+                    self._learn_spelling(normalized_name, result)
                     print(f"[DEBUG] Found coordinates (fallback): {result}")
                     return result
             
@@ -113,222 +295,377 @@ class PlacesAgent:
             return None
             
         except requests.exceptions.RequestException as e:
+            # Transient upstream failure: don't cache, the place may well exist
             print(f"Geocoding API error: {e}")
-            self._coordinate_cache[normalized_name] = None
             return None
         except (ValueError, KeyError, TypeError) as e:
             print(f"Error parsing geocoding response: {e}")
             self._coordinate_cache[normalized_name] = None
             return None
     
-    def get_tourist_places(self, latitude: float, longitude: float, limit: int = 5) -> List[str]:
+    def _learn_spelling(self, normalized_name: str, identity: PlaceIdentity) -> None:
+        """
+        Let later misspellings snap to a geocoded name, if it names a town or
+        city; anything else Nominatim matches (streets, shops, plain words
+        like "weather") would otherwise become a correction target
+        """
+        if identity.settlement:
+            self.spell_index.add(normalized_name)
+    
+    def _identity(self, latitude: float, longitude: float, location: Dict[str, Any],
+                  place_name: str) -> PlaceIdentity:
+        """Identity of a Nominatim result, reusing the instance of an OSM object already resolved"""
+        osm_type, osm_id = location.get("osm_type"), location.get("osm_id")
+        settlement = (location.get("class") in ("place", "boundary") and
+                      location.get("type") in SETTLEMENT_TYPES)
+        identity = PlaceIdentity(latitude, longitude, osm_type, int(osm_id) if osm_id else None,
+                                 location.get("name") or place_name, settlement)
+        if identity.key is None:
+            return identity
+        canonical = self._identities.setdefault(identity.key, identity)
+        if canonical is not identity:
+            print(f"[DEBUG] {place_name} is an alias of {canonical.name}")
+        return canonical
+    
+    def has_cached_coordinates(self, place_name: str) -> bool:
+        """Whether get_coordinates would answer from the cache (including a cached "not found")"""
+        normalized_name = place_name.lower().strip()
+        normalized_name = PLACE_ALIASES.get(normalized_name, normalized_name).lower()
+        if normalized_name in self._coordinate_cache:
+            return True
+        corrected = self.spell_index.correct(normalized_name)
+        return bool(corrected) and corrected in self._coordinate_cache
+    
+    def has_cached_places(self, latitude: float, longitude: float, limit: int = 5,
+                          category: Optional[str] = None) -> bool:
+        """Whether a places request for a location can be answered without calling Overpass"""
+        if self._store_covers(latitude, longitude):
+            return True
+        if category is None:
+            cached = self._cached_places(self._location_key(latitude, longitude))
+            if cached and time.time() - cached[0] < PLACES_TTL_SECONDS and len(cached[1]) >= limit:
+                return True
+        # Same near-then-far search as _nearest_names: enough names within
+        # NEAR_RADIUS_M means the outer tiles are never needed
+        now = time.time()
+        near = tiles_covering(latitude, longitude, NEAR_RADIUS_M)
+        if not self.tiles.missing(near, now):
+            tag_classes = CATEGORY_TAG_CLASSES.get(category) if category else None
+            hits = features_within(self.tiles.features(near, tag_classes), latitude, longitude, NEAR_RADIUS_M)
+            if len({feature[2] for _, feature in hits}) >= limit:
+                return True
+        return not self.tiles.missing(tiles_covering(latitude, longitude, PLACES_RADIUS_M), now)
+    
+    def seed_coordinates(self, place_name: str, coordinates: Tuple[float, float]) -> None:
+        """Pre-load a known geocode (e.g. from a warm snapshot) without a network call"""
+        normalized_name = place_name.lower().strip()
+        self._coordinate_cache[normalized_name] = PlaceIdentity(coordinates[0], coordinates[1], name=place_name)
+        self.spell_index.add(normalized_name)
+    
+    def seed_places(self, latitude: float, longitude: float, places: List[str], fetched_at: float) -> None:
+        """Pre-load the places for a location, as if fetched at fetched_at"""
+        self._store_places(self._location_key(latitude, longitude), list(places), fetched_at)
+    
+    def seed_tile(self, tile: Tile, features: List[Feature], fetched_at: float) -> None:
+        """Pre-load the features of a map tile, as if fetched at fetched_at"""
+        self.tiles.put(tile, features, fetched_at)
+    
+    def export_places(self, latitude: float,
+                      longitude: float) -> Optional[Tuple[List[str], List[Tuple[Tile, Tuple[Feature, ...]]]]]:
+        """Cached places and the cached tiles around a location, or None if nothing is cached"""
+        cached = self._cached_places(self._location_key(latitude, longitude))
+        if not cached:
+            return None
+        tiles = []
+        for tile in tiles_covering(latitude, longitude, PLACES_RADIUS_M):
+            entry = self.tiles.get(tile)
+            if entry is not None:
+                tiles.append((tile, entry[1]))
+        return list(cached[1]), tiles
+    
+    def get_tourist_places(self, latitude: float, longitude: float, limit: int = 5,
+                           deadline: Optional[Deadline] = None) -> List[str]:
         """
         Get tourist attractions near given coordinates using Overpass API
-        Works for all cities globally with optimized parallel search
+        Works for all cities globally; the search area is split into map tiles
+        and only tiles not cached yet are fetched
         
         Args:
             latitude: Latitude of the location
             longitude: Longitude of the location
             limit: Maximum number of places to return (default: 5)
+            deadline: Optional request deadline bounding the upstream call
             
         Returns:
-            List of place names
-        """
-        places: List[str] = []
-        seen_names: Set[str] = set()
-        
-        # Optimized: Combined query for faster results (most common types)
-        combined_query = f"""
-        [out:json][timeout:20];
-        (
-          node["tourism"](around:15000,{latitude},{longitude});
-          way["tourism"](around:15000,{latitude},{longitude});
-          node["historic"](around:15000,{latitude},{longitude});
-          way["historic"](around:15000,{latitude},{longitude});
-          node["leisure"](around:15000,{latitude},{longitude});
-          way["leisure"](around:15000,{latitude},{longitude});
-        );
-        out center;
-        limit {limit * 3};
+            List of place names, nearest first
         """
+        # Covered regions are answered from the local store without any network call
+        if self._store_covers(latitude, longitude):
+            print(f"[DEBUG] Answering places from local POI store")
+            return self.poi_store.nearby(latitude, longitude, PLACES_RADIUS_M, limit)
         
-        try:
-            places.extend(self._execute_overpass_query(combined_query, limit * 3, seen_names))
-        except Exception as e:
-            print(f"Combined query error: {e}")
+        key = self._location_key(latitude, longitude)
+        cached = self._cached_places(key)
+        if cached and time.time() - cached[0] < PLACES_TTL_SECONDS and len(cached[1]) >= limit:
+            return PlaceList(cached[1][:limit])
         
-        # If we have enough, return early
-        if len(places) >= limit:
-            return places[:limit]
+        places = self._fetch_tourist_places(latitude, longitude, limit, deadline)
+        if places:
+            self._store_places(key, places, time.time())
+            return PlaceList(places)
         
-        # Fallback: Search museums specifically
-        if len(places) < limit:
-            places.extend(self._search_museums_galleries(latitude, longitude, limit - len(places), seen_names))
-        
-        # Final fallback: Broader search
-        if len(places) < limit:
-            places.extend(self._search_named_places(latitude, longitude, limit - len(places), seen_names))
-        
-        return places[:limit]
+        # Overpass failed or is down: serve the last known places, marked stale
+        if cached:
+            print(f"[DEBUG] Serving stale places for {key}")
+            stale = PlaceList(cached[1][:limit])
+            stale.stale = True
+            return stale
+        return PlaceList()
     
-    def _search_tourism_attractions(self, latitude: float, longitude: float, limit: int, seen_names: Set[str]) -> List[str]:
-        """Search for tourism attractions"""
-        try:
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["tourism"](around:15000,{latitude},{longitude});
-              way["tourism"](around:15000,{latitude},{longitude});
-              relation["tourism"](around:15000,{latitude},{longitude});
-            );
-            out center;
-            """
-            
-            return self._execute_overpass_query(query, limit, seen_names)
-        except Exception as e:
-            print(f"Tourism attractions search error: {e}")
-            return []
+    def _cached_places(self, key: Tuple[float, float]) -> Optional[Tuple[float, List[str]]]:
+        """(fetched_at, places) cached for a location key, fresh or not"""
+        return self._places_cache.get(key)
     
-    def _search_historic_sites(self, latitude: float, longitude: float, limit: int, seen_names: Set[str]) -> List[str]:
-        """Search for historic sites"""
-        try:
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["historic"](around:15000,{latitude},{longitude});
-              way["historic"](around:15000,{latitude},{longitude});
-              relation["historic"](around:15000,{latitude},{longitude});
-            );
-            out center;
-            """
-            
-            return self._execute_overpass_query(query, limit, seen_names)
-        except Exception as e:
-            print(f"Historic sites search error: {e}")
-            return []
+    def _store_places(self, key: Tuple[float, float], places: List[str], fetched_at: float) -> None:
+        self._places_cache[key] = (fetched_at, places)
     
-    def _search_parks_leisure(self, latitude: float, longitude: float, limit: int, seen_names: Set[str]) -> List[str]:
-        """Search for parks and leisure areas"""
-        try:
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["leisure"](around:15000,{latitude},{longitude});
-              way["leisure"](around:15000,{latitude},{longitude});
-              relation["leisure"](around:15000,{latitude},{longitude});
-            );
-            out center;
-            """
-            
-            return self._execute_overpass_query(query, limit, seen_names)
-        except Exception as e:
-            print(f"Parks/leisure search error: {e}")
-            return []
+    def places_expire_in(self, latitude: float, longitude: float) -> Optional[float]:
+        """
+        Seconds until get_tourist_places would have to query Overpass for a location
+        
+        Returns:
+            Remaining freshness (0 once expired, infinite inside the POI store),
+            or None if places were never fetched
+        """
+        if self._store_covers(latitude, longitude):
+            return float("inf")
+        cached = self._cached_places(self._location_key(latitude, longitude))
+        if not cached:
+            return None
+        return max(0.0, PLACES_TTL_SECONDS - (time.time() - cached[0]))
     
-    def _search_museums_galleries(self, latitude: float, longitude: float, limit: int, seen_names: Set[str]) -> List[str]:
-        """Search for museums and galleries"""
-        try:
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["tourism"="museum"](around:15000,{latitude},{longitude});
-              way["tourism"="museum"](around:15000,{latitude},{longitude});
-              node["tourism"="gallery"](around:15000,{latitude},{longitude});
-              way["tourism"="gallery"](around:15000,{latitude},{longitude});
-            );
-            out center;
-            """
-            
-            return self._execute_overpass_query(query, limit, seen_names)
-        except Exception as e:
-            print(f"Museums/galleries search error: {e}")
-            return []
+    def refresh_places(self, latitude: float, longitude: float, limit: int = 5) -> bool:
+        """Refetch places for a location ahead of expiry; keeps the old entry if the fetch fails"""
+        places = self._fetch_tourist_places(latitude, longitude, limit, refresh=True)
+        if not places:
+            return False
+        self._store_places(self._location_key(latitude, longitude), places, time.time())
+        return True
     
-    def _search_named_places(self, latitude: float, longitude: float, limit: int, seen_names: Set[str]) -> List[str]:
-        """Broader search for any named places of interest"""
-        try:
-            query = f"""
-            [out:json][timeout:25];
-            (
-              node["name"](around:20000,{latitude},{longitude})["tourism"];
-              way["name"](around:20000,{latitude},{longitude})["tourism"];
-              node["name"](around:20000,{latitude},{longitude})["historic"];
-              way["name"](around:20000,{latitude},{longitude})["historic"];
-              node["name"](around:20000,{latitude},{longitude})["leisure"];
-              way["name"](around:20000,{latitude},{longitude})["leisure"];
-            );
-            out center;
-            """
+    def _fetch_tourist_places(self, latitude: float, longitude: float, limit: int,
+                              deadline: Optional[Deadline] = None, refresh: bool = False) -> List[str]:
+        """Nearest named attractions, read from the map tiles around the location"""
+        return self._nearest_names(latitude, longitude, limit, deadline, refresh) or []
+    
+    def _nearest_names(self, latitude: float, longitude: float, limit: int, deadline: Optional[Deadline] = None,
+                       refresh: bool = False, tag_classes: Optional[Tuple[str, ...]] = None) -> Optional[List[str]]:
+        """
+        Distinct names of the nearest features (of some tag classes), searching
+        the tiles within NEAR_RADIUS_M first and all of PLACES_RADIUS_M only
+        when those hold fewer than limit
+        
+        Returns:
+            Up to limit names, nearest first, or None if tiles could not be fetched
+        """
+        names: List[str] = []
+        for radius_m in (NEAR_RADIUS_M, PLACES_RADIUS_M):
+            features = self._nearby_features(latitude, longitude, deadline, refresh, radius_m, tag_classes)
+            if features is None:
+                return None
+            names = []
+            seen: Set[str] = set()
+            for _, _, name, _ in features:
+                if name in seen:
+                    continue
+                names.append(name)
+                seen.add(name)
+                if len(names) >= limit:
+                    return names
+            # Tiles of the near search were just fetched
+            refresh = False
+        return names
+    
+    def _nearby_features(self, latitude: float, longitude: float, deadline: Optional[Deadline] = None,
+                         refresh: bool = False, radius_m: float = PLACES_RADIUS_M,
+                         tag_classes: Optional[Tuple[str, ...]] = None) -> Optional[List[Feature]]:
+        """
+        Features within radius of a location, nearest first
+        Tiles not cached (or expired) are fetched together in one Overpass
+        request; every other tile is answered from the tile cache, through
+        its category index when tag classes are given
+        
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            deadline: Optional request deadline bounding the upstream call
+            refresh: Refetch every covering tile, even fresh ones
+            radius_m: Search radius in metres
+            tag_classes: Optional tag classes; only features having one are returned
             
-            return self._execute_overpass_query(query, limit, seen_names)
-        except Exception as e:
-            print(f"Named places search error: {e}")
-            return []
+        Returns:
+            List of (latitude, longitude, name, tag classes) features, or None
+            if missing tiles could not be fetched
+        """
+        covering = tiles_covering(latitude, longitude, radius_m)
+        missing = covering if refresh else self.tiles.missing(covering, time.time())
+        uncached: Dict[Tile, List[Feature]] = {}
+        if missing:
+            print(f"[DEBUG] Fetching {len(missing)} of {len(covering)} tiles from Overpass")
+            answer = self._fetch_tiles(missing, deadline)
+            if answer is None:
+                return None
+            fetched, cached = answer
+            # Cached tiles are read back through the cache's index below
+            if not cached:
+                uncached = fetched
+        else:
+            print(f"[DEBUG] Answering from {len(covering)} cached tiles")
+        tiles_features = [select_features(features, tag_classes) for features in uncached.values()]
+        tiles_features += self.tiles.features([tile for tile in covering if tile not in uncached], tag_classes)
+        hits = features_within(tiles_features, latitude, longitude, radius_m)
+        return [feature for _, feature in hits]
     
-    def _execute_overpass_query(self, query: str, limit: int, seen_names: Set[str]) -> List[str]:
-        """Execute Overpass query and extract place names"""
+    def _fetch_tiles(self, tiles: List[Tile],
+                     deadline: Optional[Deadline] = None) -> Optional[Tuple[Dict[Tile, List[Feature]], bool]]:
+        """
+        Fetch the named features of some tiles in one Overpass request and
+        cache them per tile (unless the answer hit MAX_TILE_ELEMENTS)
+        
+        Returns:
+            (features per requested tile, whether they were cached), or None
+            if the request failed
+        """
+        clauses = []
+        for south, west, north, east in merge_bounds(tiles):
+            bbox = f"{south:.7f},{west:.7f},{north:.7f},{east:.7f}"
+            # Unnamed elements are dropped anyway, so they are not transferred
+            clauses.append(f'nwr["tourism"]["tourism"!~"{EXCLUDED_TOURISM_VALUES}"]["name"]({bbox});')
+            clauses.append(f'nwr["historic"]["name"]({bbox});')
+            clauses.append(f'nwr["leisure"~"{INCLUDED_LEISURE_VALUES}"]["name"]({bbox});')
+        query = ("[out:json][timeout:25];\n(\n  " + "\n  ".join(clauses) +
+                 f"\n);\nout center {MAX_TILE_ELEMENTS};")
+        
         try:
-            print(f"[DEBUG] Executing Overpass query...")
-            response = requests.post(
-                self.overpass_url,
-                data={"data": query},
-                timeout=10
-            )
-            print(f"[DEBUG] Overpass API responded with status: {response.status_code}")
-            response.raise_for_status()
-            
-            data = response.json()
-            places: List[str] = []
-            
-            if "elements" in data:
-                print(f"[DEBUG] Found {len(data['elements'])} elements from Overpass")
-                for element in data["elements"]:
-                    if len(places) >= limit:
-                        break
-                    
-                    tags = element.get("tags", {})
-                    # Try multiple name fields for international support
-                    name = (tags.get("name:en") or 
-                           tags.get("name:en-GB") or
-                           tags.get("name:en-US") or
-                           tags.get("name") or
-                           tags.get("official_name") or
-                           tags.get("alt_name") or
-                           tags.get("short_name"))
-                    
-                    if name and name not in seen_names and len(name.strip()) > 2:
-                        # Filter out generic names
-                        name_lower = name.lower().strip()
-                        if name_lower not in ["park", "museum", "gallery", "monument", "attraction", "place"]:
-                            places.append(name.strip())
-                            seen_names.add(name.strip())
-            
-            print(f"[DEBUG] Extracted {len(places)} places from Overpass")
-            return places
-            
+            data = self.overpass.post(query, deadline=deadline)
+            elements = data["elements"]
         except requests.exceptions.RequestException as e:
             print(f"Overpass API error: {e}")
-            return []
+            return None
         except (KeyError, ValueError, TypeError) as e:
             print(f"Error parsing Overpass response: {e}")
-            return []
+            return None
+        
+        # Elements are filed under the tile holding their point (ways by their
+        # center); one outside the requested tiles belongs to a tile of its own
+        by_tile: Dict[Tile, List[Feature]] = {tile: [] for tile in tiles}
+        zoom = tiles[0][0]
+        for element in elements:
+            feature = self._element_feature(element)
+            if feature is not None:
+                features = by_tile.get(tile_for(feature[0], feature[1], zoom))
+                if features is not None:
+                    features.append(feature)
+        if len(elements) >= MAX_TILE_ELEMENTS:
+            # Some tiles may be incomplete: answer from them this once
+            print(f"[DEBUG] Overpass answer truncated at {MAX_TILE_ELEMENTS} elements, not caching tiles")
+            return by_tile, False
+        fetched_at = time.time()
+        for tile, features in by_tile.items():
+            self.tiles.put(tile, features, fetched_at)
+        print(f"[DEBUG] Cached {sum(len(features) for features in by_tile.values())} features "
+              f"from {len(elements)} Overpass elements in {len(tiles)} tiles")
+        return by_tile, True
+    
+    def get_places_by_category(self, latitude: float, longitude: float, category: str, limit: int = 5,
+                               deadline: Optional[Deadline] = None) -> List[str]:
+        """
+        Get places of one category (museums, parks, ...) near given coordinates
+        Filters the same map tiles as get_tourist_places, so a location that
+        was already searched is answered without any upstream call
+        
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            category: Category name, one of CATEGORY_TAG_CLASSES
+            limit: Maximum number of places to return (default: 5)
+            deadline: Optional request deadline bounding the upstream call
+            
+        Returns:
+            List of place names
+        """
+        if category not in CATEGORY_TAG_CLASSES:
+            return self.get_tourist_places(latitude, longitude, limit, deadline)
+        
+        tag_classes = CATEGORY_TAG_CLASSES[category]
+        if self._store_covers(latitude, longitude):
+            return self.poi_store.nearby(latitude, longitude, PLACES_RADIUS_M, limit, tag_classes)
+        
+        return self._nearest_names(latitude, longitude, limit, deadline, tag_classes=tag_classes) or []
+    
+    @staticmethod
+    def _location_key(latitude: float, longitude: float) -> Tuple[float, float]:
+        """Cache key for a location (rounded to ~100 m)"""
+        return (round(latitude, 3), round(longitude, 3))
+    
+    @staticmethod
+    def _element_name(tags: Dict[str, str]) -> Optional[str]:
+        """Pick a display name from element tags, preferring English names"""
+        # Try multiple name fields for international support
+        name = (tags.get("name:en") or 
+               tags.get("name:en-GB") or
+               tags.get("name:en-US") or
+               tags.get("name") or
+               tags.get("official_name") or
+               tags.get("alt_name") or
+               tags.get("short_name"))
+        if not name or len(name.strip()) <= 2:
+            return None
+        # Filter out generic names
+        if name.lower().strip() in GENERIC_PLACE_NAMES:
+            return None
+        return name.strip()
+    
+    @classmethod
+    def _element_feature(cls, element: Dict[str, Any]) -> Optional[Feature]:
+        """Compact (latitude, longitude, name, tag classes) record of a named Overpass element"""
+        if "lat" in element and "lon" in element:
+            latitude, longitude = element["lat"], element["lon"]
+        elif "center" in element:
+            latitude, longitude = element["center"]["lat"], element["center"]["lon"]
+        else:
+            return None
+        tags = element.get("tags", {})
+        name = cls._element_name(tags)
+        if not name:
+            return None
+        classes = attraction_tag_classes(tags)
+        if not classes:
+            return None
+        return (float(latitude), float(longitude), name, classes)
     
     
-    def format_places_response(self, place_name: str, places: List[str]) -> str:
+    def format_places_response(self, place_name: str, places: List[str], category: Optional[str] = None) -> str:
         """
         Format places list into user-friendly response
         
         Args:
             place_name: Name of the place
             places: List of tourist attraction names
+            category: Optional category the places were filtered by
             
         Returns:
             Formatted string response
         """
+        label = category.replace("_", " ") if category else None
         if not places:
+            if label:
+                return f"Sorry, I couldn't find any {label} in {place_name}."
             return f"Sorry, I couldn't find tourist attractions for {place_name}."
         
-        response = f"In {place_name} these are the places you can go,\n\n"
+        if label:
+            response = f"In {place_name} these are the {label} you can visit,\n\n"
+        else:
+            response = f"In {place_name} these are the places you can go,\n\n"
         for place in places:
             response += f"{place}\n"
         
@@ -0,0 +1,237 @@
+"""
+POI Store - local columnar store of tourist features
+Memory-mapped, array-backed copy of tourism/historic/leisure features from an
+OSM extract, with a spatial grid index for millisecond radius lookups
+"""
+import bisect
+import json
+import math
+import mmap
+import struct
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from geo import EARTH_RADIUS_M, haversine_m
+
+MAGIC = b"POIS"
+# Version 2 records every tag class of a feature (version 1 kept only the first)
+VERSION = 2
+
+# magic, version, count, cell count, names length, metadata length, cell size
+_HEADER = struct.Struct("<4sHIIIId")
+
+
+def _cell_of(latitude: float, longitude: float, cell_size: float) -> Tuple[int, int]:
+    """Grid row/column of a point"""
+    return int((latitude + 90.0) // cell_size), int((longitude + 180.0) // cell_size)
+
+
+def _cell_key(row: int, col: int) -> int:
+    return (row << 32) | col
+
+
+def _pad(length: int) -> int:
+    """Bytes of padding needed to keep the next section 8-byte aligned"""
+    return (-length) % 8
+
+
+def write_store(path: str, features: Iterable[Tuple[float, float, str, Sequence[str]]],
+                coverage: Sequence[Tuple[float, float, float, float]],
+                cell_size: float = 0.05) -> int:
+    """
+    Write features to a store file
+
+    Args:
+        path: Output file path
+        features: Iterable of (latitude, longitude, name, tag_classes) tuples,
+            where each tag class looks like "tourism=museum"
+        coverage: Bounding boxes (min_lat, min_lon, max_lat, max_lon) the
+            extract fully covers; lookups outside them fall back to Overpass
+        cell_size: Grid cell size in degrees
+
+    Returns:
+        Number of features written
+    """
+    # A code stands for one distinct set of tag classes, so a feature tagged
+    # both tourism=museum and historic=castle is found by either category
+    tag_sets: List[List[str]] = []
+    tag_codes: Dict[Tuple[str, ...], int] = {}
+    rows: List[Tuple[int, float, float, int, bytes]] = []
+
+    for latitude, longitude, name, tag_classes in features:
+        tag_set = tuple(sorted(set(tag_classes)))
+        if tag_set not in tag_codes:
+            tag_codes[tag_set] = len(tag_sets)
+            tag_sets.append(list(tag_set))
+        key = _cell_key(*_cell_of(latitude, longitude, cell_size))
+        rows.append((key, latitude, longitude, tag_codes[tag_set], name.encode("utf-8")))
+
+    # Sorting by cell makes every cell a contiguous run of rows
+    rows.sort(key=lambda row: row[0])
+
+    lats = array("f")
+    lons = array("f")
+    codes = array("H")
+    name_offsets = array("I", [0])
+    cell_keys = array("q")
+    cell_starts = array("I")
+    names = bytearray()
+
+    for position, (key, latitude, longitude, code, name) in enumerate(rows):
+        if not cell_keys or cell_keys[-1] != key:
+            cell_keys.append(key)
+            cell_starts.append(position)
+        lats.append(latitude)
+        lons.append(longitude)
+        codes.append(code)
+        names.extend(name)
+        name_offsets.append(len(names))
+    cell_starts.append(len(rows))
+
+    metadata = json.dumps({
+        "tag_sets": tag_sets,
+        "coverage": [list(box) for box in coverage],
+    }).encode("utf-8")
+
+    with open(path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, len(rows), len(cell_keys),
+                                  len(names), len(metadata), cell_size))
+        handle.write(b"\0" * _pad(_HEADER.size))
+        for section in (lats, lons, codes, name_offsets, cell_keys, cell_starts):
+            data = section.tobytes()
+            handle.write(data)
+            handle.write(b"\0" * _pad(len(data)))
+        handle.write(names)
+        handle.write(metadata)
+
+    return len(rows)
+
+
+class POIStore:
+    """Read-only, memory-mapped view over a store file written by write_store"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+
+        magic, version, count, n_cells, names_length, metadata_length, cell_size = \
+            _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} POI store (rebuild it with import_pois.py)")
+
+        self.count = count
+        self.cell_size = cell_size
+        offset = _HEADER.size + _pad(_HEADER.size)
+
+        def section(fmt: str, length: int) -> memoryview:
+            nonlocal offset
+            size = struct.calcsize(fmt) * length
+            data = view[offset:offset + size].cast(fmt)
+            offset += size + _pad(size)
+            return data
+
+        self._lats = section("f", count)
+        self._lons = section("f", count)
+        self._codes = section("H", count)
+        self._name_offsets = section("I", count + 1)
+        self._cell_keys = section("q", n_cells)
+        self._cell_starts = section("I", n_cells + 1)
+        self._names = view[offset:offset + names_length]
+        offset += names_length
+
+        metadata = json.loads(bytes(view[offset:offset + metadata_length]).decode("utf-8"))
+        self.tag_sets: List[List[str]] = metadata["tag_sets"]
+        self.coverage: List[Tuple[float, float, float, float]] = [tuple(box) for box in metadata["coverage"]]
+
+    def covers(self, latitude: float, longitude: float) -> bool:
+        """Whether the point lies inside an area the extract fully covers"""
+        return any(min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
+                   for min_lat, min_lon, max_lat, max_lon in self.coverage)
+
+    def name(self, position: int) -> str:
+        start = self._name_offsets[position]
+        end = self._name_offsets[position + 1]
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def nearby(self, latitude: float, longitude: float, radius_m: float = 15000,
+               limit: int = 5, tag_classes: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Get feature names within radius of a point, nearest first
+
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            radius_m: Search radius in metres
+            limit: Maximum number of names to return
+            tag_classes: Optional tag classes to keep ("tourism=museum",
+                or "historic=*" for any value of a key)
+
+        Returns:
+            List of place names
+        """
+        codes = self._matching_codes(tag_classes)
+        if codes is not None and not codes:
+            return []
+
+        # Cells overlapping the bounding box of the search circle
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        dlon = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+        min_row, min_col = _cell_of(latitude - dlat, longitude - dlon, self.cell_size)
+        max_row, max_col = _cell_of(latitude + dlat, longitude + dlon, self.cell_size)
+
+        hits: List[Tuple[float, int]] = []
+        for row in range(min_row, max_row + 1):
+            # Keys of one row are contiguous, so one bisect covers all its columns
+            low = bisect.bisect_left(self._cell_keys, _cell_key(row, min_col))
+            high = bisect.bisect_right(self._cell_keys, _cell_key(row, max_col))
+            if low >= high:
+                continue
+            for position in range(self._cell_starts[low], self._cell_starts[high]):
+                if codes is not None and self._codes[position] not in codes:
+                    continue
+                distance = haversine_m(latitude, longitude, self._lats[position], self._lons[position])
+                if distance <= radius_m:
+                    hits.append((distance, position))
+
+        hits.sort()
+        places: List[str] = []
+        seen = set()
+        for _, position in hits:
+            name = self.name(position)
+            if name not in seen:
+                places.append(name)
+                seen.add(name)
+                if len(places) >= limit:
+                    break
+        return places
+
+    def _matching_codes(self, tag_classes: Optional[Sequence[str]]) -> Optional[set]:
+        """Tag codes with any class matching the requested classes (None keeps everything)"""
+        if tag_classes is None:
+            return None
+        wildcard_keys = {tag_class[:-2] for tag_class in tag_classes if tag_class.endswith("=*")}
+        exact = set(tag_classes)
+        return {code for code, tag_set in enumerate(self.tag_sets)
+                if any(tag_class in exact or tag_class.split("=", 1)[0] in wildcard_keys
+                       for tag_class in tag_set)}
+
+    def close(self) -> None:
+        for view in (self._lats, self._lons, self._codes, self._name_offsets,
+                     self._cell_keys, self._cell_starts, self._names, self._view):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "features": self.count,
+            "cells": len(self._cell_keys),
+            "tag_sets": len(self.tag_sets),
+            "coverage": self.coverage,
+        }
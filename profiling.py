@@ -0,0 +1,261 @@
+"""
+Request Profiling - opt-in sampling profiler for live requests
+A profiled request gets a sampler thread that records the Python stacks of
+the request's thread and its worker threads every few milliseconds and writes
+them in collapsed-stack format (one "frame;frame;frame count" line per
+distinct stack, readable by flamegraph.pl and speedscope). Worker threads
+join a profile through request_worker() (pool initializer) or request_task()
+(one task on a shared pool); samples of workers idling in their pool are
+dropped. Optionally a tracemalloc snapshot is dumped too.
+
+Nothing is installed unless profiling is configured, so the disabled cost is
+one attribute check per request.
+
+Environment:
+    PROFILE_SAMPLE_RATE   fraction of requests profiled (default 0)
+    PROFILE_TOKEN         requests whose X-Profile header equals this token are
+                          always profiled (header ignored when unset)
+    PROFILE_DIR           output directory (default profiles)
+    PROFILE_PATHS         comma-separated paths eligible for profiling (default /query)
+    PROFILE_INTERVAL_MS   sampling interval (default 2)
+    PROFILE_TRACEMALLOC   set to 1 to also dump tracemalloc snapshots
+"""
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional
+
+PROFILE_HEADER = "X-Profile"
+
+# Innermost frames of a worker thread waiting for work: (file name, function)
+IDLE_FRAMES = frozenset({
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+})
+
+# Thread id (a request's or one of its workers') -> sampler profiling that request
+_samplers: Dict[int, "StackSampler"] = {}
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def join_request(request_thread: int) -> None:
+    """Sample the calling thread with a request's profile, if that request is profiled"""
+    sampler = _samplers.get(request_thread)
+    if sampler is not None:
+        sampler.follow(threading.get_ident())
+
+
+def request_worker() -> Callable[[], None]:
+    """
+    ThreadPoolExecutor initializer for a pool created by the current request:
+    its worker threads are sampled with the request's profile
+    """
+    return functools.partial(join_request, threading.get_ident())
+
+
+def request_task(function: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a task for a shared pool so its thread is sampled with the current request while it runs"""
+    request_thread = threading.get_ident()
+
+    def run(*args: Any) -> Any:
+        sampler = _samplers.get(request_thread)
+        if sampler is None:
+            return function(*args)
+        thread_id = threading.get_ident()
+        sampler.follow(thread_id)
+        try:
+            return function(*args)
+        finally:
+            sampler.unfollow(thread_id)
+    return run
+
+
+class StackSampler:
+    """Background thread counting the stacks of one request's threads"""
+
+    def __init__(self, interval: float, request_thread: Optional[int] = None):
+        """
+        Args:
+            interval: Seconds between samples
+            request_thread: Thread serving the request (default: the caller)
+        """
+        self.interval = interval
+        self.request_thread = request_thread or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads = {self.request_thread}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def follow(self, thread_id: int) -> None:
+        """Also sample a worker thread of the request (and whatever it hands work to)"""
+        # Replaced rather than mutated, so the sampler can iterate without a lock
+        self._threads = self._threads | {thread_id}
+        _samplers[thread_id] = self
+
+    def unfollow(self, thread_id: int) -> None:
+        self._threads = self._threads - {thread_id}
+        if _samplers.get(thread_id) is self:
+            del _samplers[thread_id]
+
+    def start(self) -> None:
+        _samplers[self.request_thread] = self
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        for thread_id in self._threads:
+            if _samplers.get(thread_id) is self:
+                del _samplers[thread_id]
+
+    def _run(self) -> None:
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self._threads:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                if thread_id != self.request_thread and _is_idle(frame):
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> Iterable[str]:
+        for stack, count in self.stacks.most_common():
+            yield f"{stack} {count}\n"
+
+
+class RequestProfile:
+    """State of one profiled request"""
+
+    def __init__(self, name: str, sampler: StackSampler, tracing: bool):
+        self.name = name
+        self.sampler = sampler
+        self.tracing = tracing
+        self.started = time.perf_counter()
+        self.finished = False
+
+
+class Profiler:
+    """Decides which requests to profile and writes their profiles"""
+
+    def __init__(self, directory: str = "profiles", sample_rate: float = 0.0, token: Optional[str] = None,
+                 paths: Iterable[str] = ("/query",), interval_ms: float = 2.0, trace_memory: bool = False):
+        """
+        Args:
+            directory: Where profiles are written
+            sample_rate: Fraction of eligible requests profiled at random
+            token: Value of the X-Profile header that forces profiling
+            paths: Request paths eligible for profiling
+            interval_ms: Stack sampling interval in milliseconds
+            trace_memory: Also dump a tracemalloc snapshot per profile
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        self.paths = frozenset(paths)
+        self.interval = interval_ms / 1000
+        self.trace_memory = trace_memory
+        self._tracing_requests = 0
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["Profiler"]:
+        """Profiler configured from the environment, or None when profiling is off"""
+        sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+        token = os.environ.get("PROFILE_TOKEN") or None
+        if sample_rate <= 0 and token is None:
+            return None
+        return cls(
+            directory=os.environ.get("PROFILE_DIR", "profiles"),
+            sample_rate=sample_rate,
+            token=token,
+            paths=[path.strip() for path in os.environ.get("PROFILE_PATHS", "/query").split(",") if path.strip()],
+            interval_ms=float(os.environ.get("PROFILE_INTERVAL_MS", 2)),
+            trace_memory=os.environ.get("PROFILE_TRACEMALLOC") == "1",
+        )
+
+    def wants(self, path: str, headers: Dict[str, str]) -> bool:
+        """Whether a request should be profiled"""
+        if path not in self.paths:
+            return False
+        if self.token is not None and headers.get(PROFILE_HEADER) == self.token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, path: str) -> RequestProfile:
+        with self._lock:
+            self._counter += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._counter}{path.replace('/', '_')}"
+            tracing = self.trace_memory
+            if tracing:
+                # Concurrent profiled requests share one tracemalloc session
+                if self._tracing_requests == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(25)
+                    self._started_tracemalloc = True
+                self._tracing_requests += 1
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        return RequestProfile(name, sampler, tracing)
+
+    def finish(self, profile: RequestProfile) -> Optional[str]:
+        """
+        Stop profiling a request and write its files
+
+        Returns:
+            Name of the profile (file stem) or None if already finished
+        """
+        if profile.finished:
+            return None
+        profile.finished = True
+        profile.sampler.stop()
+        elapsed_ms = (time.perf_counter() - profile.started) * 1000
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stem = os.path.join(self.directory, profile.name)
+            with open(stem + ".collapsed", "w", encoding="utf-8") as out:
+                out.writelines(profile.sampler.collapsed())
+            if profile.tracing:
+                snapshot = tracemalloc.take_snapshot()
+                snapshot.dump(stem + ".tracemalloc")
+                with open(stem + ".memory.txt", "w", encoding="utf-8") as out:
+                    current, peak = tracemalloc.get_traced_memory()
+                    out.write(f"traced memory: current {current} bytes, peak {peak} bytes\n\n")
+                    for stat in snapshot.statistics("lineno")[:30]:
+                        out.write(f"{stat}\n")
+            print(f"[DEBUG] Wrote profile {stem} ({profile.sampler.samples} samples over {elapsed_ms:.0f} ms)")
+        except OSError as e:
+            print(f"Profile write error: {e}")
+        finally:
+            if profile.tracing:
+                with self._lock:
+                    self._tracing_requests -= 1
+                    if self._tracing_requests == 0 and self._started_tracemalloc:
+                        tracemalloc.stop()
+                        self._started_tracemalloc = False
+        return profile.name
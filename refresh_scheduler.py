@@ -0,0 +1,176 @@
+"""
+Refresh Scheduler - refresh-ahead for popular destinations
+Counts queries per resolved place with exponential decay and, in a background
+thread, refreshes the weather, forecast and places cache entries of the top
+places shortly before they expire. Upstream calls are paced by a token bucket and
+skipped while an upstream's circuit is open
+
+Environment:
+    REFRESH_AHEAD              set to 1 to enable (off by default)
+    REFRESH_TOP_N              places kept warm (default 20)
+    REFRESH_RATE_PER_MINUTE    upstream calls the scheduler may make (default 30)
+    REFRESH_INTERVAL_SECONDS   how often entries are checked (default 30)
+"""
+import heapq
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from token_bucket import TokenBucket
+from weather_agent import FORECAST_TTL_SECONDS, WEATHER_TTL_SECONDS
+
+# Query counts halve every hour, so yesterday's spike stops dominating
+POPULARITY_HALF_LIFE_SECONDS = 3600
+
+
+class _Tracked:
+    __slots__ = ("name", "coordinates", "score", "updated")
+
+    def __init__(self, name: str, coordinates: Tuple[float, float], now: float):
+        self.name = name
+        self.coordinates = coordinates
+        self.score = 0.0
+        self.updated = now
+
+    def decayed(self, now: float) -> float:
+        return self.score * math.pow(0.5, (now - self.updated) / POPULARITY_HALF_LIFE_SECONDS)
+
+
+class RefreshScheduler:
+    """Keeps the caches of the most requested places warm"""
+
+    def __init__(self, agent, top_n: int = 20, rate_per_minute: float = 30, interval: float = 30):
+        """
+        Args:
+            agent: TourismAgent whose weather and places agents are refreshed
+            top_n: Number of most popular places kept warm
+            rate_per_minute: Upstream calls allowed per minute (bursts up to a tenth of that)
+            interval: Seconds between checks; entries expiring within two
+                      intervals are refreshed
+        """
+        self.agent = agent
+        self.top_n = top_n
+        self.interval = interval
+        self.bucket = TokenBucket(rate_per_minute / 60, max(1.0, rate_per_minute / 10))
+        self.refreshed = {"weather": 0, "forecast": 0, "places": 0}
+        self.skipped = 0
+        self._tracked: Dict[Tuple[float, float], _Tracked] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, agent) -> Optional["RefreshScheduler"]:
+        """Scheduler configured from the environment, or None unless REFRESH_AHEAD=1"""
+        if os.environ.get("REFRESH_AHEAD") != "1":
+            return None
+        return cls(
+            agent,
+            top_n=int(os.environ.get("REFRESH_TOP_N", 20)),
+            rate_per_minute=float(os.environ.get("REFRESH_RATE_PER_MINUTE", 30)),
+            interval=float(os.environ.get("REFRESH_INTERVAL_SECONDS", 30)),
+        )
+
+    def record(self, place_name: str, coordinates: Tuple[float, float]) -> None:
+        """Count a query for a resolved place; starts the background thread on first use"""
+        now = time.time()
+        key = (round(coordinates[0], 3), round(coordinates[1], 3))
+        with self._lock:
+            tracked = self._tracked.get(key)
+            if tracked is None:
+                tracked = self._tracked[key] = _Tracked(place_name, coordinates, now)
+            tracked.score = tracked.decayed(now) + 1
+            tracked.updated = now
+            # Forget the long tail so tracking stays bounded
+            if len(self._tracked) > self.top_n * 20:
+                keep = heapq.nlargest(self.top_n * 10, self._tracked.items(), key=lambda item: item[1].decayed(now))
+                self._tracked = dict(keep)
+        if self._thread is None:
+            self.start()
+
+    def top_places(self) -> List[Tuple[str, Tuple[float, float], float]]:
+        """Most popular places as (name, coordinates, decayed query count)"""
+        now = time.time()
+        with self._lock:
+            ranked = heapq.nlargest(self.top_n, self._tracked.values(), key=lambda tracked: tracked.decayed(now))
+            return [(tracked.name, tracked.coordinates, tracked.decayed(now)) for tracked in ranked]
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="refresh-ahead", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh_due()
+            except Exception as e:
+                # Never let one bad refresh kill the thread
+                print(f"Refresh-ahead error: {e}")
+
+    def refresh_due(self) -> None:
+        """
+        Refresh every top place whose weather, forecast or places entry
+        expires within two intervals; only entries a query has already
+        fetched are refreshed
+        """
+        horizon = 2 * self.interval
+        weather_horizon = min(horizon, WEATHER_TTL_SECONDS / 2)
+        forecast_horizon = min(horizon, FORECAST_TTL_SECONDS / 2)
+        weather_agent = self.agent.weather_agent
+        places_agent = self.agent.places_agent
+        top = self.top_places()
+
+        # Current weather for all due places goes out as one bulk request
+        due_weather = []
+        for _, coordinates, _ in top:
+            remaining = weather_agent.expires_in(*coordinates)
+            if remaining is not None and remaining < weather_horizon:
+                due_weather.append(coordinates)
+        if due_weather:
+            if weather_agent.breaker.is_open() or not self.bucket.try_acquire():
+                self.skipped += len(due_weather)
+            else:
+                weather_agent.get_weather_many(due_weather, refresh=True)
+                self.refreshed["weather"] += len(due_weather)
+
+        # Forecast series are fetched one location per request
+        for name, (latitude, longitude), _ in top:
+            remaining = weather_agent.forecast_expires_in(latitude, longitude)
+            if remaining is None or remaining >= forecast_horizon:
+                continue
+            if weather_agent.breaker.is_open() or not self.bucket.try_acquire():
+                self.skipped += 1
+                continue
+            # A failed fetch hands back the old series, which stays due
+            weather_agent.get_forecast(latitude, longitude, refresh=True)
+            if weather_agent.forecast_expires_in(latitude, longitude) >= forecast_horizon:
+                self.refreshed["forecast"] += 1
+                print(f"[DEBUG] Refreshed forecast ahead of expiry for {name}")
+
+        for name, (latitude, longitude), _ in top:
+            remaining = places_agent.places_expire_in(latitude, longitude)
+            if remaining is None or remaining >= horizon:
+                continue
+            if not places_agent.overpass.ranked_endpoints() or not self.bucket.try_acquire():
+                self.skipped += 1
+                continue
+            if places_agent.refresh_places(latitude, longitude):
+                self.refreshed["places"] += 1
+                print(f"[DEBUG] Refreshed places ahead of expiry for {name}")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "tracked": len(self._tracked),
+            "top": [(name, round(score, 2)) for name, _, score in self.top_places()],
+            "refreshed": dict(self.refreshed),
+            "skipped": self.skipped,
+            "tokens": round(self.bucket.available(), 2),
+        }
@@ -0,0 +1,163 @@
+"""
+Replay captured /query traffic against a running app
+Reads JSONL files written by traffic_capture.py and re-sends each request
+at its original relative time (scaled by --speed, or as fast as possible),
+then reports the latency distribution
+
+Usage:
+    python replay_traffic.py captures/traffic.jsonl --target http://127.0.0.1:5000
+    python replay_traffic.py captures/traffic.jsonl.1 captures/traffic.jsonl --speed 10 --concurrency 32
+    python replay_traffic.py captures/traffic.jsonl --speed 0 --concurrency 64    # max speed
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+# Upper edges of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000)
+
+
+def load_capture(paths: List[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Captured requests from the given files, ordered by timestamp"""
+    entries: List[Dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as capture_file:
+            for line in capture_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("query") or entry.get("place"):
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry.get("ts", 0))
+    return entries[:limit] if limit else entries
+
+
+def schedule(entries: List[Dict[str, Any]], speed: float) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """Yield (offset in seconds from replay start, entry); speed 0 sends everything at once"""
+    if not entries:
+        return
+    first = entries[0].get("ts", 0)
+    for entry in entries:
+        offset = (entry.get("ts", first) - first) / speed if speed > 0 else 0.0
+        yield offset, entry
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Replayer:
+    """Send captured requests on a bounded worker pool and collect latencies"""
+
+    def __init__(self, target: str, concurrency: int, timeout: float):
+        self.url = target.rstrip("/") + "/query"
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.latencies: List[float] = []
+        self.lags: List[float] = []
+        self.statuses: Counter = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, entry: Dict[str, Any], due: float) -> None:
+        payload = {"query": entry.get("query") or entry.get("place")}
+        if entry.get("place"):
+            payload["place"] = entry["place"]
+        start = time.perf_counter()
+        try:
+            response = self._session().post(self.url, json=payload, timeout=self.timeout)
+            status = str(response.status_code)
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.latencies.append(elapsed)
+            # How late the request left compared with its scheduled time
+            self.lags.append(max(0.0, (start - due) * 1000))
+            self.statuses[status] += 1
+
+    def run(self, entries: List[Dict[str, Any]], speed: float) -> float:
+        """Replay entries and return the wall time taken"""
+        start = time.perf_counter()
+        for offset, entry in schedule(entries, speed):
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.executor.submit(self._send, entry, due)
+        self.executor.shutdown(wait=True)
+        return time.perf_counter() - start
+
+
+def report(replayer: Replayer, elapsed: float, out=sys.stdout) -> None:
+    latencies = sorted(replayer.latencies)
+    lags = sorted(replayer.lags)
+    count = len(latencies)
+    print(f"Sent {count} requests in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f}/s)", file=out)
+    print("Status: " + ", ".join(f"{status} x{n}" for status, n in sorted(replayer.statuses.items())), file=out)
+    if not latencies:
+        return
+    print("Latency ms: " + "  ".join(
+        f"{label} {percentile(latencies, fraction):.1f}"
+        for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99))
+    ) + f"  max {latencies[-1]:.1f}", file=out)
+    print(f"Schedule lag ms: p50 {percentile(lags, 0.5):.1f}  p99 {percentile(lags, 0.99):.1f} "
+          f"(high lag means --concurrency is too low for the replay rate)", file=out)
+
+    counts = Counter()
+    for latency in latencies:
+        bucket = next((edge for edge in HISTOGRAM_BUCKETS_MS if latency <= edge), None)
+        counts[bucket] += 1
+    widest = max(counts.values())
+    for edge in list(HISTOGRAM_BUCKETS_MS) + [None]:
+        if counts[edge]:
+            label = f"<= {edge} ms" if edge is not None else f"> {HISTOGRAM_BUCKETS_MS[-1]} ms"
+            bar = "#" * max(1, round(40 * counts[edge] / widest))
+            print(f"  {label:>12} {counts[edge]:6d} {bar}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay captured /query traffic")
+    parser.add_argument("captures", nargs="+", help="capture JSONL files (rotated files may be listed too)")
+    parser.add_argument("--target", default="http://127.0.0.1:5000", help="base URL of the app")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="time scale: 1 = original pace, 10 = ten times faster, 0 = as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=16, help="maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--limit", type=int, help="replay only the first N requests")
+    args = parser.parse_args(argv)
+
+    entries = load_capture(args.captures, args.limit)
+    if not entries:
+        print("No captured requests found", file=sys.stderr)
+        sys.exit(1)
+    span = entries[-1].get("ts", 0) - entries[0].get("ts", 0)
+    print(f"Replaying {len(entries)} requests captured over {span:.0f}s at "
+          f"{'max speed' if args.speed <= 0 else f'{args.speed:g}x'} against {args.target}")
+
+    replayer = Replayer(args.target, args.concurrency, args.timeout)
+    elapsed = replayer.run(entries, args.speed)
+    report(replayer, elapsed)
+
+
+if __name__ == "__main__":
+    main()
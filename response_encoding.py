@@ -0,0 +1,169 @@
+"""
+Response Encoding - negotiated serialization and compression for API responses
+jsonify output is serialized with orjson when it is installed, or as
+MessagePack for clients whose Accept header prefers it (needs msgpack).
+Bodies above a size threshold are compressed with zstd (needs zstandard)
+or gzip, whichever the client's Accept-Encoding ranks higher.
+
+Environment:
+    RESPONSE_COMPRESSION   set to 0 to disable compression (on by default)
+    COMPRESS_MIN_BYTES     smaller bodies are sent uncompressed (default 1024)
+    GZIP_LEVEL             gzip compression level (default 6)
+    ZSTD_LEVEL             zstd compression level (default 3)
+"""
+import gzip
+import importlib
+import os
+import threading
+from typing import Any, Optional, Tuple
+
+from flask.json.provider import DefaultJSONProvider
+
+
+def _optional_module(name: str):
+    """Import an optional dependency, or None when it is not installed"""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+orjson = _optional_module("orjson")
+msgpack = _optional_module("msgpack")
+zstandard = _optional_module("zstandard")
+
+JSON_MIMETYPE = "application/json"
+# Names clients use for MessagePack; the response echoes the one asked for
+MSGPACK_MIMETYPES = ("application/msgpack", "application/vnd.msgpack", "application/x-msgpack")
+
+COMPRESSIBLE_MIMETYPES = frozenset((JSON_MIMETYPE, *MSGPACK_MIMETYPES, "text/html", "text/plain",
+                                    "text/css", "text/javascript", "application/javascript"))
+
+
+def response_mimetypes() -> Tuple[str, ...]:
+    """Response types this server can produce, JSON first (the default for */*)"""
+    return (JSON_MIMETYPE, *MSGPACK_MIMETYPES) if msgpack is not None else (JSON_MIMETYPE,)
+
+
+def dumps_json(obj: Any, default=None, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, with orjson when available"""
+    if orjson is not None:
+        fallback = default
+
+        def default(value: Any) -> Any:
+            # orjson only handles exact tuples; subclasses (e.g. PlaceIdentity) go through here
+            if isinstance(value, tuple):
+                return list(value)
+            if fallback is None:
+                raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+            return fallback(value)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    import json
+    if indent:
+        return json.dumps(obj, default=default, sort_keys=sort_keys, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, default=default, sort_keys=sort_keys, separators=(",", ":"),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def dumps_msgpack(obj: Any, default=None) -> bytes:
+    """Serialize to MessagePack (requires msgpack)"""
+    return msgpack.packb(obj, default=default, use_bin_type=True)
+
+
+class NegotiatingJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson and answers jsonify with
+    MessagePack when the request's Accept header prefers it
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_json(obj, self.default, self.sort_keys).decode("utf-8")
+
+    def response(self, *args: Any, **kwargs: Any):
+        from flask import has_request_context, request
+        obj = self._prepare_response_obj(args, kwargs)
+        mimetype = JSON_MIMETYPE
+        if has_request_context() and msgpack is not None:
+            mimetype = request.accept_mimetypes.best_match(response_mimetypes(), JSON_MIMETYPE)
+        if mimetype == JSON_MIMETYPE:
+            mimetype = self.mimetype
+            indent = self.compact is False or (self.compact is None and self._app.debug)
+            body = dumps_json(obj, self.default, self.sort_keys, indent)
+        else:
+            body = dumps_msgpack(obj, self.default)
+        response = self._app.response_class(body, mimetype=mimetype)
+        if msgpack is not None:
+            response.vary.add("Accept")
+        return response
+
+
+class Compressor:
+    """Compresses response bodies according to the request's Accept-Encoding"""
+
+    def __init__(self, min_bytes: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        """
+        Args:
+            min_bytes: Bodies smaller than this are sent as they are
+            gzip_level: gzip compression level (1-9)
+            zstd_level: zstd compression level (1-22)
+        """
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.encodings = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+        # zstandard compressors must not be shared between threads
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> Optional["Compressor"]:
+        """Compressor configured from the environment, or None when RESPONSE_COMPRESSION=0"""
+        if os.environ.get("RESPONSE_COMPRESSION", "1") == "0":
+            return None
+        return cls(
+            min_bytes=int(os.environ.get("COMPRESS_MIN_BYTES", 1024)),
+            gzip_level=int(os.environ.get("GZIP_LEVEL", 6)),
+            zstd_level=int(os.environ.get("ZSTD_LEVEL", 3)),
+        )
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "zstd":
+            compressor = getattr(self._local, "zstd", None)
+            if compressor is None:
+                compressor = self._local.zstd = zstandard.ZstdCompressor(level=self.zstd_level)
+            return compressor.compress(data)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def apply(self, response, request):
+        """
+        Compress a Flask response in place if the client accepts it
+
+        Args:
+            response: Response about to be sent
+            request: The request it answers
+
+        Returns:
+            The same response object
+        """
+        if (response.direct_passthrough or response.is_streamed or
+                response.status_code < 200 or response.status_code in (204, 206, 304) or
+                "Content-Encoding" in response.headers or
+                response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_bytes:
+            return response
+        response.set_data(self.compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,70 @@
+"""
+Route Planner
+Orders multi-city itineraries with a nearest-neighbour + 2-opt TSP heuristic
+over the haversine distance matrix
+"""
+from typing import List, Sequence, Tuple
+
+from geo import haversine_m
+
+
+def distance_matrix(points: Sequence[Tuple[float, float]]) -> List[List[float]]:
+    """Pairwise great-circle distances in kilometres"""
+    n = len(points)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            distance = haversine_m(points[i][0], points[i][1], points[j][0], points[j][1]) / 1000.0
+            matrix[i][j] = matrix[j][i] = distance
+    return matrix
+
+
+def route_length(order: Sequence[int], matrix: List[List[float]]) -> float:
+    """Length in kilometres of an open route visiting stops in order"""
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def plan_route(points: Sequence[Tuple[float, float]], start: int = 0) -> Tuple[List[int], float]:
+    """
+    Order stops into a short open route beginning at start
+    
+    Args:
+        points: List of (latitude, longitude) tuples
+        start: Index of the stop the trip begins at
+        
+    Returns:
+        Tuple of (visiting order as indices into points, route length in km)
+    """
+    n = len(points)
+    if n <= 2:
+        order = [start] + [i for i in range(n) if i != start]
+        matrix = distance_matrix(points)
+        return order, route_length(order, matrix)
+    
+    matrix = distance_matrix(points)
+    
+    # Nearest neighbour construction
+    order = [start]
+    remaining = set(range(n)) - {start}
+    while remaining:
+        last = order[-1]
+        nearest = min(remaining, key=lambda j: matrix[last][j])
+        order.append(nearest)
+        remaining.remove(nearest)
+    
+    # 2-opt: reverse segments while that shortens the route (start stays fixed)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b = order[i - 1], order[i]
+                c = order[j]
+                d = order[j + 1] if j + 1 < n else None
+                before = matrix[a][b] + (matrix[c][d] if d is not None else 0.0)
+                after = matrix[a][c] + (matrix[b][d] if d is not None else 0.0)
+                if after < before - 1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+    
+    return order, route_length(order, matrix)
@@ -0,0 +1,107 @@
+"""
+Session Store - conversational context for follow-up questions
+A session remembers the place the last query resolved (name, coordinates
+and what was asked), so "what about the weather there?" is answered for
+the same place without extraction or geocoding. Sessions are bounded in
+number and expire after a period of inactivity.
+
+Environment:
+    SESSION_TTL_SECONDS   idle time after which a session is forgotten (default 1800)
+    SESSION_MAX           sessions kept, least recently used evicted first (default 10000)
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class Session:
+    """Context of one conversation"""
+
+    __slots__ = ("id", "place", "coordinates", "intent", "updated")
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.id = session_id or secrets.token_urlsafe(16)
+        self.place: Optional[str] = None
+        self.coordinates: Optional[Tuple[float, float]] = None
+        # What the last query asked for, reused when a follow-up does not say
+        self.intent: Optional[Dict[str, Any]] = None
+        self.updated = time.time()
+
+    def remember(self, place: str, coordinates: Tuple[float, float], intent: Dict[str, Any]) -> None:
+        """Record the place and request a query resolved"""
+        self.place = place
+        self.coordinates = coordinates
+        self.intent = intent
+        self.updated = time.time()
+
+    def context(self) -> Optional[Dict[str, Any]]:
+        """The remembered place and request as plain data, or None before the first answer"""
+        if self.place is None:
+            return None
+        return {"place": self.place, "coordinates": list(self.coordinates), "intent": self.intent}
+
+    def restore(self, context: Optional[Dict[str, Any]]) -> None:
+        """Adopt a context produced by context(), e.g. by another node"""
+        if context and context.get("place") and context.get("coordinates"):
+            self.remember(context["place"], tuple(context["coordinates"]), context.get("intent"))
+
+
+class SessionStore:
+    """Sessions by id, bounded LRU with an idle timeout"""
+
+    def __init__(self, ttl: float = 1800, max_sessions: int = 10000):
+        """
+        Args:
+            ttl: Seconds of inactivity after which a session expires
+            max_sessions: Sessions kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            ttl=float(os.environ.get("SESSION_TTL_SECONDS", 1800)),
+            max_sessions=int(os.environ.get("SESSION_MAX", 10000)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: Optional[str]) -> Optional[Session]:
+        """Live session with this id, or None if unknown or expired"""
+        if not session_id:
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            now = time.time()
+            if now - session.updated >= self.ttl:
+                del self._sessions[session_id]
+                return None
+            session.updated = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: Optional[str] = None) -> Session:
+        """The live session with this id, or a new session (with a fresh id)"""
+        session = self.get(session_id)
+        if session is not None:
+            return session
+        session = Session()
+        with self._lock:
+            self._sessions[session.id] = session
+            # Expired sessions sit at the front once untouched for long enough
+            now = time.time()
+            while self._sessions:
+                oldest = next(iter(self._sessions.values()))
+                if len(self._sessions) <= self.max_sessions and now - oldest.updated < self.ttl:
+                    break
+                self._sessions.popitem(last=False)
+        return session
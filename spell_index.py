@@ -0,0 +1,181 @@
+"""
+Spell Index - local spelling correction for place names
+SymSpell-style index: every known name is stored under all of its
+deletion variants, so a misspelling is matched by looking up its own
+deletions instead of scanning the whole vocabulary. Every name costs dozens
+of variants, so the vocabulary is bounded.
+
+Environment:
+    SPELL_INDEX_MAX_TERMS   names indexed, least popular evicted first (default 50000)
+"""
+import heapq
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from known_places import SEED_PLACES
+
+MAX_EDIT_DISTANCE = 2
+
+
+def max_distance_for(term: str) -> int:
+    """Edit distance tolerated for a term: none for short names, where a
+    single edit usually means a different place (Nice/Nile, Rome/Home)"""
+    if len(term) <= 4:
+        return 0
+    if len(term) <= 8:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    """All strings reachable from term by deleting up to distance characters"""
+    results = {term}
+    frontier = {term}
+    for _ in range(distance):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def damerau_levenshtein(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1 and
+                    a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellIndex:
+    """Snap misspelled place names to known ones"""
+
+    def __init__(self, names: Optional[Iterable[str]] = None, max_terms: Optional[int] = None):
+        """
+        Args:
+            names: Initial vocabulary (defaults to the seed gazetteer), never evicted
+            max_terms: Names indexed; past that the least popular name added
+                       later is evicted (default SPELL_INDEX_MAX_TERMS)
+        """
+        self.max_terms = max_terms or int(os.environ.get("SPELL_INDEX_MAX_TERMS", 50000))
+        self._terms: Dict[str, int] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._pinned: Set[str] = set()
+        # (popularity when pushed, term) of evictable names; popularity only
+        # grows, so an entry found out of date is pushed back with its current value
+        self._eviction_heap: List[Tuple[int, str]] = []
+        for name in names if names is not None else (place[0] for place in SEED_PLACES):
+            self.add(name)
+        self._pinned = set(self._terms)
+        self._eviction_heap = []
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def add(self, name: str, count: int = 1) -> None:
+        """Add a known name, or bump its popularity if already known"""
+        term = self.normalize(name)
+        if not term:
+            return
+        with self._lock:
+            if term in self._terms:
+                self._terms[term] += count
+                return
+            if len(self._terms) >= self.max_terms:
+                self._evict()
+            self._terms[term] = count
+            heapq.heappush(self._eviction_heap, (count, term))
+            for variant in _deletes(term, MAX_EDIT_DISTANCE):
+                self._deletes.setdefault(variant, set()).add(term)
+
+    def _evict(self) -> None:
+        """Drop the least popular name outside the initial vocabulary (lock held)"""
+        heap = self._eviction_heap
+        while heap:
+            popularity, victim = heap[0]
+            current = self._terms.get(victim)
+            if current is None or victim in self._pinned:
+                heapq.heappop(heap)
+            elif popularity != current:
+                heapq.heapreplace(heap, (current, victim))
+            else:
+                heapq.heappop(heap)
+                break
+        else:
+            return
+        del self._terms[victim]
+        for variant in _deletes(victim, MAX_EDIT_DISTANCE):
+            terms = self._deletes.get(variant)
+            if terms is not None:
+                terms.discard(victim)
+                if not terms:
+                    del self._deletes[variant]
+
+    def __contains__(self, name: str) -> bool:
+        return self.normalize(name) in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def correct(self, name: str) -> Optional[str]:
+        """
+        Find the known name closest to a possibly misspelled input
+
+        Args:
+            name: Place name as typed
+
+        Returns:
+            The known (normalized) name within the input's edit-distance
+            threshold, preferring the smallest distance and then popularity,
+            or None when nothing is close enough. A hit counts towards the
+            name's popularity, so names in use outlive one-off additions.
+        """
+        term = self.normalize(name)
+        if term in self._terms:
+            self._bump(term)
+            return term
+        limit = max_distance_for(term)
+        if limit == 0:
+            return None
+
+        candidates: Set[str] = set()
+        with self._lock:
+            for variant in _deletes(term, limit):
+                candidates |= self._deletes.get(variant, set())
+
+        best: Optional[str] = None
+        best_key = None
+        for candidate in candidates:
+            distance = damerau_levenshtein(term, candidate, limit)
+            if distance > limit or distance > max_distance_for(candidate):
+                continue
+            key = (distance, -self._terms.get(candidate, 0))
+            if best_key is None or key < best_key:
+                best, best_key = candidate, key
+        if best is not None:
+            self._bump(best)
+        return best
+
+    def _bump(self, term: str) -> None:
+        with self._lock:
+            if term in self._terms:
+                self._terms[term] += 1
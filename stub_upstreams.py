@@ -0,0 +1,217 @@
+"""
+Stub upstreams for local testing
+Serves fake Overpass, Nominatim and Open-Meteo APIs with injected latency
+and errors, so failover, hedging and load replays can be exercised without
+touching public instances
+
+Usage:
+    python stub_upstreams.py --port 9001 --latency 0.05
+    python stub_upstreams.py --port 9002 --latency 3 --jitter 1 --error-rate 0.2
+    OVERPASS_ENDPOINTS=http://127.0.0.1:9002/api/interpreter,http://127.0.0.1:9001/api/interpreter \
+    NOMINATIM_URL=http://127.0.0.1:9001/search \
+    OPEN_METEO_URL=http://127.0.0.1:9001/v1/forecast python app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from known_places import SEED_PLACES
+
+_SEED_COORDINATES = {name.lower(): (latitude, longitude) for name, latitude, longitude in SEED_PLACES}
+
+# A handful of named features spread around the query point
+STUB_FEATURES = (
+    ("Stub Museum", "tourism", "museum"),
+    ("Stub Gallery", "tourism", "gallery"),
+    ("Stub Castle", "historic", "castle"),
+    ("Stub Monument Square", "historic", "monument"),
+    ("Stub City Park", "leisure", "park"),
+    ("Stub Botanical Garden", "leisure", "garden"),
+    ("Stub Viewpoint", "tourism", "viewpoint"),
+    ("Stub Zoo", "tourism", "zoo"),
+)
+
+
+class StubBehaviour:
+    """Latency and failure injection shared by all handlers of one server"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        # Requests per API path, e.g. {"/search": 3}
+        self.paths: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def delay(self, path: str = "") -> None:
+        with self._lock:
+            self.requests += 1
+            self.paths[path] = self.paths.get(path, 0) + 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def overpass_elements(latitude: float, longitude: float, first_id: int = 900000) -> List[Dict[str, Any]]:
+    return [
+        {
+            "type": "node",
+            "id": first_id + i,
+            "lat": latitude + 0.01 * (i % 3 - 1),
+            "lon": longitude + 0.01 * (i // 3 - 1),
+            "tags": {"name": name, key: value},
+        }
+        for i, (name, key, value) in enumerate(STUB_FEATURES)
+    ]
+
+
+def nominatim_results(query: str) -> List[Dict[str, Any]]:
+    """One city result: seed coordinates when known, else a stable made-up point
+    (names sharing a point share an OSM id, like aliases of one place)"""
+    name = query.split(",")[0].strip()
+    point = _SEED_COORDINATES.get(name.lower())
+    if point is None:
+        h = zlib.crc32(name.lower().encode("utf-8"))
+        point = ((h % 12000) / 100 - 60, ((h >> 14) % 36000) / 100 - 180)
+    return [{
+        "type": "city",
+        "class": "place",
+        "osm_type": "relation",
+        "osm_id": zlib.crc32(f"{point[0]:.4f},{point[1]:.4f}".encode("ascii")) % 10000000,
+        "name": name,
+        "display_name": f"{name}, Stubland",
+        "lat": str(point[0]),
+        "lon": str(point[1]),
+    }]
+
+
+def open_meteo_response(params: Dict[str, str]) -> Any:
+    """Current conditions (one object per location) or a unixtime forecast series"""
+    latitudes = params.get("latitude", "0").split(",")
+    if "current" in params:
+        results = [{
+            "latitude": float(latitude),
+            "current": {
+                "temperature_2m": round(25 - abs(float(latitude)) / 3, 1),
+                "precipitation_probability": int(abs(float(latitude))) % 100,
+            },
+        } for latitude in latitudes]
+        return results if len(results) > 1 else results[0]
+
+    days = int(params.get("forecast_days", 16))
+    midnight = int(time.time()) // 86400 * 86400
+    base = 25 - abs(float(latitudes[0])) / 3
+    hours = range(days * 24)
+    return {
+        "utc_offset_seconds": 0,
+        "hourly": {
+            "time": [midnight + hour * 3600 for hour in hours],
+            "temperature_2m": [round(base + 2 - 4 * ((hour % 24) / 12 - 1) ** 2, 1) for hour in hours],
+            "precipitation_probability": [(hour * 7) % 100 for hour in hours],
+        },
+        "daily": {
+            "time": [midnight + day * 86400 for day in range(days)],
+            "temperature_2m_max": [round(base + 3, 1)] * days,
+            "temperature_2m_min": [round(base - 4, 1)] * days,
+            "precipitation_probability_max": [(day * 13) % 100 for day in range(days)],
+            "precipitation_sum": [round((day * 13) % 100 / 20, 1) for day in range(days)],
+        },
+    }
+
+
+def _query_points(query: str) -> List[Tuple[float, float]]:
+    """Best-effort centres of an Overpass query: its around: filter, or each distinct bbox"""
+    import re
+    match = re.search(r"around:\d+,(-?[\d.]+),(-?[\d.]+)", query)
+    if match:
+        return [(float(match.group(1)), float(match.group(2)))]
+    points = []
+    for box in dict.fromkeys(re.findall(r"\((-?[\d.]+),(-?[\d.]+),(-?[\d.]+),(-?[\d.]+)\)", query)):
+        south, west, north, east = (float(value) for value in box)
+        points.append(((south + north) / 2, (west + east) / 2))
+    return points or [(0.0, 0.0)]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    behaviour: StubBehaviour = StubBehaviour()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.behaviour.delay(url.path)
+        if self.behaviour.should_fail():
+            self._send_json(503, {"error": "injected failure"})
+            return
+        if url.path == "/search":
+            self._send_json(200, nominatim_results(params.get("q", "")))
+        elif url.path == "/v1/forecast":
+            self._send_json(200, open_meteo_response(params))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode("utf-8")
+        self.behaviour.delay(urlsplit(self.path).path)
+        if self.behaviour.should_fail():
+            self._send_json(504, {"error": "injected failure"})
+            return
+        if not self.path.startswith("/api/interpreter"):
+            self._send_json(404, {"error": "not found"})
+            return
+
+        query = parse_qs(raw).get("data", [""])[0]
+        elements = []
+        for i, (latitude, longitude) in enumerate(_query_points(query)):
+            elements.extend(overpass_elements(latitude, longitude, 900000 + i * len(STUB_FEATURES)))
+        self._send_json(200, {"elements": elements})
+
+
+def serve(port: int, behaviour: StubBehaviour, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start a stub server in a background thread and return it"""
+    handler = type("BoundStubHandler", (StubHandler,), {"behaviour": behaviour})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run stub upstream APIs for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 504")
+    args = parser.parse_args(argv)
+
+    behaviour = StubBehaviour(args.latency, args.jitter, args.error_rate)
+    server = serve(args.port, behaviour, args.host)
+    print(f"Stub upstreams on http://{args.host}:{args.port} "
+          f"(latency {args.latency}s, jitter {args.jitter}s, error rate {args.error_rate})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
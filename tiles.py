@@ -0,0 +1,224 @@
+"""
+Map Tiles - slippy-map tile decomposition and a per-tile feature cache
+Search areas are split into fixed Web Mercator tiles (the z/x/y scheme of
+OpenStreetMap tile servers), so overlapping searches around nearby points
+share tiles and only tiles not yet cached have to be fetched
+
+Environment:
+    TILE_ZOOM             zoom level of cached tiles (default 12, ~10 km tiles
+                          at the equator, ~6 km at 50 degrees latitude)
+    TILE_CACHE_MAX_TILES  tiles kept in memory, least recently used evicted
+                          first (default 4000)
+"""
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from geo import EARTH_RADIUS_M, haversine_m
+from lru import LRUCache
+
+TILE_ZOOM = int(os.environ.get("TILE_ZOOM", 12))
+DEFAULT_MAX_TILES = int(os.environ.get("TILE_CACHE_MAX_TILES", 4000))
+
+# Web Mercator stops at about 85.05 degrees
+_MAX_LATITUDE = 85.0511287798
+
+# (zoom, x, y)
+Tile = Tuple[int, int, int]
+# (south, west, north, east)
+BoundingBox = Tuple[float, float, float, float]
+# (latitude, longitude, name, tag classes)
+Feature = Tuple[float, float, str, Tuple[str, ...]]
+
+
+def tile_for(latitude: float, longitude: float, zoom: int = TILE_ZOOM) -> Tile:
+    """Tile containing a point"""
+    n = 1 << zoom
+    latitude = max(-_MAX_LATITUDE, min(_MAX_LATITUDE, latitude))
+    x = int((longitude + 180.0) / 360.0 * n)
+    phi = math.radians(latitude)
+    y = int((1.0 - math.asinh(math.tan(phi)) / math.pi) / 2.0 * n)
+    return zoom, min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(tile: Tile) -> BoundingBox:
+    """Bounding box of a tile"""
+    zoom, x, y = tile
+    n = 1 << zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def tiles_covering(latitude: float, longitude: float, radius_m: float, zoom: int = TILE_ZOOM) -> List[Tile]:
+    """
+    Tiles intersecting a circle, nearest first
+
+    Args:
+        latitude: Latitude of the centre
+        longitude: Longitude of the centre
+        radius_m: Radius in metres
+        zoom: Tile zoom level
+
+    Returns:
+        List of (zoom, x, y) tiles
+    """
+    n = 1 << zoom
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    dlon = dlat / max(math.cos(math.radians(latitude)), 0.01)
+    _, _, north_y = tile_for(min(latitude + dlat, _MAX_LATITUDE), longitude, zoom)
+    _, _, south_y = tile_for(max(latitude - dlat, -_MAX_LATITUDE), longitude, zoom)
+    if dlon >= 180.0:
+        columns: Sequence[int] = range(n)
+    else:
+        # Longitudes are wrapped, so a circle crossing the antimeridian walks its columns modulo n
+        west_x = tile_for(latitude, (longitude - dlon + 180.0) % 360.0 - 180.0, zoom)[1]
+        east_x = tile_for(latitude, (longitude + dlon + 180.0) % 360.0 - 180.0, zoom)[1]
+        columns = range(west_x, east_x + 1) if west_x <= east_x else [*range(west_x, n), *range(east_x + 1)]
+
+    covering: List[Tuple[float, Tile]] = []
+    for y in range(north_y, south_y + 1):
+        for x in columns:
+            tile = (zoom, x, y)
+            distance = _distance_to_tile(latitude, longitude, tile)
+            if distance <= radius_m:
+                covering.append((distance, tile))
+    covering.sort()
+    return [tile for _, tile in covering]
+
+
+def _distance_to_tile(latitude: float, longitude: float, tile: Tile) -> float:
+    """Distance in metres from a point to the nearest point of a tile"""
+    south, west, north, east = tile_bounds(tile)
+    nearest_lat = min(max(latitude, south), north)
+    if west <= longitude <= east:
+        nearest_lon = longitude
+    else:
+        # Nearest edge, measured around the antimeridian as well
+        nearest_lon = min((west, east), key=lambda edge: abs((longitude - edge + 180.0) % 360.0 - 180.0))
+    return haversine_m(latitude, longitude, nearest_lat, nearest_lon)
+
+
+def merge_bounds(tiles: Iterable[Tile]) -> List[BoundingBox]:
+    """Bounding boxes covering tiles, merging horizontally adjacent tiles of a row"""
+    rows: Dict[Tuple[int, int], List[int]] = {}
+    for zoom, x, y in tiles:
+        rows.setdefault((zoom, y), []).append(x)
+
+    boxes: List[BoundingBox] = []
+    for (zoom, y), columns in sorted(rows.items()):
+        columns.sort()
+        start = previous = columns[0]
+        for x in columns[1:] + [None]:
+            if x is not None and x == previous + 1:
+                previous = x
+                continue
+            south, west, _, _ = tile_bounds((zoom, start, y))
+            _, _, north, east = tile_bounds((zoom, previous, y))
+            boxes.append((south, west, north, east))
+            if x is not None:
+                start = previous = x
+    return boxes
+
+
+def features_within(tiles_features: Iterable[Sequence[Feature]], latitude: float, longitude: float,
+                    radius_m: float) -> List[Tuple[float, Feature]]:
+    """Features of some tiles within radius of a point, as (distance, feature) nearest first"""
+    hits: List[Tuple[float, Feature]] = []
+    for features in tiles_features:
+        for feature in features:
+            distance = haversine_m(latitude, longitude, feature[0], feature[1])
+            if distance <= radius_m:
+                hits.append((distance, feature))
+    hits.sort(key=lambda hit: hit[0])
+    return hits
+
+
+def category_index(features: Sequence[Feature]) -> Dict[str, Tuple[int, ...]]:
+    """Positions of a tile's features under each of their tag classes"""
+    index: Dict[str, List[int]] = {}
+    for position, feature in enumerate(features):
+        for tag_class in feature[3]:
+            index.setdefault(tag_class, []).append(position)
+    return {tag_class: tuple(positions) for tag_class, positions in index.items()}
+
+
+def select_features(features: Sequence[Feature], tag_classes: Optional[Sequence[str]]) -> Sequence[Feature]:
+    """Features having any of some tag classes (all of them when tag_classes is None)"""
+    if tag_classes is None:
+        return features
+    return [feature for feature in features if any(tag_class in feature[3] for tag_class in tag_classes)]
+
+
+class TileCache:
+    """
+    Features per tile, bounded LRU with a freshness TTL; each tile also keeps
+    an inverted index by tag class, so category searches only visit features
+    of the requested categories
+    """
+
+    def __init__(self, ttl: float, max_tiles: int = DEFAULT_MAX_TILES):
+        """
+        Args:
+            ttl: Seconds a fetched tile stays fresh
+            max_tiles: Tiles kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_tiles = max_tiles
+        # tile -> (fetched_at, features, category index); empty tiles are cached too
+        self._tiles = LRUCache(max_tiles)
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def get(self, tile: Tile) -> Optional[Tuple[float, Tuple[Feature, ...]]]:
+        """(fetched_at, features) of a tile, fresh or not, or None if not cached"""
+        entry = self._tiles.get(tile)
+        if entry is None:
+            return None
+        return entry[0], entry[1]
+
+    def put(self, tile: Tile, features: Iterable[Feature], fetched_at: float) -> None:
+        features = tuple(features)
+        index = category_index(features)
+        self._tiles[tile] = (fetched_at, features, index)
+
+    def missing(self, tiles: Iterable[Tile], now: float) -> List[Tile]:
+        """Tiles that are not cached or have expired"""
+        missing = []
+        for tile in tiles:
+            entry = self._tiles.peek(tile)
+            if entry is None or now - entry[0] >= self.ttl:
+                missing.append(tile)
+        return missing
+
+    def features(self, tiles: Iterable[Tile],
+                 tag_classes: Optional[Sequence[str]] = None) -> List[Sequence[Feature]]:
+        """
+        Cached features of each tile (tiles not cached are skipped)
+
+        Args:
+            tiles: Tiles to read
+            tag_classes: Optional tag classes ("tourism=museum", "historic=*");
+                only features having one of them are returned, looked up in
+                each tile's category index
+
+        Returns:
+            One sequence of features per cached tile
+        """
+        found: List[Sequence[Feature]] = []
+        for tile in tiles:
+            entry = self._tiles.get(tile)
+            if entry is None:
+                continue
+            _, features, index = entry
+            if tag_classes is None:
+                found.append(features)
+                continue
+            positions = set()
+            for tag_class in tag_classes:
+                positions.update(index.get(tag_class, ()))
+            found.append([features[position] for position in sorted(positions)])
+        return found
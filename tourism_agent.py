@@ -3,10 +3,80 @@ Tourism AI Agent - Parent Agent
 Orchestrates the multi-agent system and coordinates Weather and Places agents
 """
 import re
-from typing import Dict, Optional, Tuple, Any, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from weather_agent import WeatherAgent
-from places_agent import PlacesAgent
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from profiling import request_worker
+from weather_agent import WeatherAgent, WEEKDAYS, MAX_FORECAST_DAYS
+from places_agent import PlacesAgent, PLACES_TTL_SECONDS
+from place_suggest import PlaceSuggester
+from place_recognizer import PlaceRecognizer
+from route_planner import plan_route
+from circuit_breaker import get_breaker
+from deadline import Deadline
+from warm_snapshot import load_default_snapshot
+from refresh_scheduler import RefreshScheduler
+from session_store import Session, SessionStore
+from cluster import Cluster
+
+
+# Keywords that narrow a places request to one category of the category index
+# (checked in order, so more specific categories come first)
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    'theme_parks': ('theme park', 'amusement park'),
+    'zoos': ('zoo', 'aquarium'),
+    'museums': ('museum', 'gallery', 'galleries', 'exhibition'),
+    'parks': ('park', 'garden', 'nature reserve'),
+    'historic': ('historic', 'history', 'monument', 'castle', 'ruins', 'heritage'),
+    'viewpoints': ('viewpoint', 'view point', 'scenic view', 'lookout'),
+}
+
+# Any category keyword or its plural ("museums", "parks")
+CATEGORY_WORDS_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(keyword) for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords) +
+    r")(?:s|es)?\b", re.IGNORECASE
+)
+
+# Phrases asking for the weather
+WEATHER_KEYWORDS = (
+    'temperature', 'temp', 'weather', 'rain', 'forecast', 'climate',
+    'how hot', 'how cold', 'what is the temperature', 'what\'s the temperature'
+)
+
+# Phrases asking for places (more specific to avoid false positives)
+PLACES_KEYWORDS = (
+    'places', 'attractions', 'tourist', 'sightseeing',
+    'where to go', 'what to see', 'what can i visit', 'where can i go',
+    'plan my trip', 'let\'s plan', 'places i can', 'places to visit'
+)
+
+# Words that mark a list item as something other than a destination
+NON_PLACE_WORDS = {'see', 'do', 'visit', 'go', 'what', 'where', 'how', 'plan', 'know',
+                   'show', 'tell', 'find', 'check', 'places', 'weather', 'temperature',
+                   'forecast', 'rain', 'attractions', 'things', 'me', 'there', 'it'}
+
+# Words a follow-up question ("what about the weather there tomorrow?") may
+# consist of; any other word could be a new place, so the session is not used
+FOLLOW_UP_WORDS = NON_PLACE_WORDS | set(WEEKDAYS) | {
+    word for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords for word in keyword.split()
+} | {
+    'a', 'about', 'also', 'and', 'any', 'at', 'be', 'but', 'cold', 'day', 'days', 'does', 'evening',
+    'for', 'going', 'here', 'hot', 'how', 'i', 'in', 'is', "it's", 'like', 'look', 'morning', 'museums',
+    'next', 'now', 'of', 'on', 'or', 'over', 'parks', 'place', 'same', 'should', 'that', 'the', 'this',
+    'today', 'tomorrow', 'tonight', 'week', 'weekend', "what's", 'when', 'which', 'will', 'with',
+    'city', 'climate', 'sightseeing', 'tourist', 'can', 'to', 'after', 'again', 'please', 'us', 'we',
+}
+
+# Time phrases trailing a place name ("Bled tomorrow", "Oslo this weekend")
+TRAILING_TIME_WORDS = re.compile(
+    r"\s+(?:tomorrow|today|tonight|right now|now|this (?:week|weekend|evening)|next week|please|"
+    r"on (?:mon|tues|wednes|thurs|fri|satur|sun)day)\b.*$",
+    re.IGNORECASE
+)
+
+# Upper bound on destinations handled in one multi-city request
+MAX_DESTINATIONS = 8
 
 
 class TourismAgent:
@@ -15,11 +85,40 @@ class TourismAgent:
     def __init__(self):
         self.weather_agent = WeatherAgent()
         self.places_agent = PlacesAgent()
+        # Autocomplete index of known places, ranked by how often they are asked for
+        self.place_suggester = PlaceSuggester()
+        # Gazetteer of known place names and aliases for entity recognition
+        self.place_recognizer = PlaceRecognizer()
+        # Conversations whose follow-ups reuse the last resolved place
+        self.sessions = SessionStore.from_env()
+        # Precomputed geocodes and places for top destinations (see warm_snapshot.py)
+        load_default_snapshot(self)
+        # Refresh-ahead of popular places' caches (off unless REFRESH_AHEAD=1)
+        self.refresh_scheduler = RefreshScheduler.from_env(self)
+        # Routing of places to the node that owns them (off unless CLUSTER_NODES and CLUSTER_SELF are set)
+        self.cluster = Cluster.from_env()
     
     def extract_place_name(self, user_input: str) -> Optional[str]:
         """
         Extract place name from user input - case-insensitive, handles spelling mistakes
-        Supports all cities globally
+        Supports all cities globally: known places and aliases are found by a
+        gazetteer scan, anything else by the pattern cascade
+        
+        Args:
+            user_input: User's input text
+            
+        Returns:
+            Place name or None if not found
+        """
+        known = self.place_recognizer.find(user_input)
+        if known:
+            return known
+        return self.extract_place_name_by_patterns(user_input)
+    
+    def extract_place_name_by_patterns(self, user_input: str) -> Optional[str]:
+        """
+        Extract an unknown place name with regex patterns ("trip to X", "in X"),
+        falling back to the first significant words of the input
         
         Args:
             user_input: User's input text
@@ -32,13 +131,14 @@ class TourismAgent:
         
         # Common patterns for place extraction - case-insensitive
         patterns = [
-            r"going to go to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"going to (?:go to |visit )?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"visit (?:to )?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"trip to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"in ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
-            r"plan.*?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|let|what|and)",
+            r"going to go to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"going to (?:go to |visit )?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"visit (?:to )?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"trip to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"in ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"to ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"(?:what|how) about ([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
+            r"plan.*?([a-zA-Z\s\-']+?)(?:,|\.|$|\?|\blet\b|\bwhat\b|\band\b)",
         ]
         
         for pattern in patterns:
@@ -47,6 +147,8 @@ class TourismAgent:
                 place = match.group(1).strip()
                 # Clean up common words and trailing punctuation
                 place = re.sub(r'\b(?:the|a|an|my|our|trip|visit|going|go)\b', '', place, flags=re.IGNORECASE).strip()
+                place = re.sub(r'^in\s+', '', place, flags=re.IGNORECASE)
+                place = TRAILING_TIME_WORDS.sub('', place)
                 place = re.sub(r'[,\\.!?]+$', '', place).strip()
                 if place and len(place) > 2:
                     # Capitalize first letter of each word for better matching
@@ -62,6 +164,9 @@ class TourismAgent:
         
         for word in words:
             word_clean = word.strip('.,!?').lower()
+            # Contractions ("what's") are never part of a place name
+            if "'" in word_clean or word_clean in NON_PLACE_WORDS:
+                continue
             if word_clean not in skip_words and len(word_clean) > 2:
                 significant_words.append(word.strip('.,!?'))
         
@@ -72,6 +177,39 @@ class TourismAgent:
         
         return None
     
+    def extract_place_names(self, user_input: str) -> List[str]:
+        """
+        Extract every destination from user input, e.g. "trip to Paris, Lyon and Nice"
+        
+        Args:
+            user_input: User's input text
+            
+        Returns:
+            List of place names in the order mentioned (empty if none found)
+        """
+        match = re.search(
+            r"(?:trip to|going to(?: go to| visit)?|visit(?:ing)?|travel(?:ling)? to|tour of|to)\s+(?:go to\s+|visit\s+)?"
+            r"([a-zA-Z\s\-',&]+?)(?:\.|$|\?|!|\blet\b|\bwhat\b)",
+            user_input, re.IGNORECASE
+        )
+        if not match:
+            return []
+        
+        places: List[str] = []
+        for item in re.split(r",|&|\band\b|\bthen\b", match.group(1), flags=re.IGNORECASE):
+            # "parks in Paris" is a category of one place, not a destination of its own
+            item = re.sub(r"\b(?:in|at|near|around)\b.*", '', item, flags=re.IGNORECASE)
+            item = CATEGORY_WORDS_PATTERN.sub('', item)
+            place = re.sub(r'\b(?:the|a|an|my|our|trip|finally|also)\b', '', item, flags=re.IGNORECASE).strip()
+            words = place.lower().split()
+            if len(place) <= 2 or len(words) > 3 or NON_PLACE_WORDS.intersection(words):
+                continue
+            place = ' '.join(word.capitalize() for word in place.split())
+            if place not in places:
+                places.append(place)
+        
+        return places[:MAX_DESTINATIONS]
+    
     def determine_user_intent(self, user_input: str) -> Dict[str, Any]:
         """
         Determine what the user wants: weather, places, or both
@@ -81,126 +219,596 @@ class TourismAgent:
             user_input: User's input text
             
         Returns:
-            Dictionary with 'weather' and 'places' boolean flags
+            Dictionary with 'weather' and 'places' boolean flags and an
+            optional 'category' narrowing the places request
         """
         user_lower = user_input.lower()
+        category = self.detect_place_category(user_input)
         
         # Check for explicit weather keywords
-        wants_weather = any(keyword in user_lower for keyword in [
-            'temperature', 'temp', 'weather', 'rain', 'forecast', 'climate', 
-            'how hot', 'how cold', 'what is the temperature', 'what\'s the temperature'
-        ])
+        wants_weather = any(keyword in user_lower for keyword in WEATHER_KEYWORDS)
         
         # Check for explicit places keywords (more specific to avoid false positives)
-        wants_places = any(keyword in user_lower for keyword in [
-            'places', 'attractions', 'tourist', 'sightseeing', 
-            'where to go', 'what to see', 'what can i visit', 'where can i go',
-            'plan my trip', 'let\'s plan', 'places i can', 'places to visit'
-        ])
+        wants_places = any(keyword in user_lower for keyword in PLACES_KEYWORDS) or category is not None
         
         # If user asks for weather but NOT places, show only weather
         if wants_weather and not wants_places:
             return {
                 'weather': True,
-                'places': False
+                'places': False,
+                'category': None
             }
         
         # If user asks for places but NOT weather, show only places
         if wants_places and not wants_weather:
             return {
                 'weather': False,
-                'places': True
+                'places': True,
+                'category': category
             }
         
         # If user asks for both, show both
         if wants_weather and wants_places:
             return {
                 'weather': True,
-                'places': True
+                'places': True,
+                'category': category
             }
         
         # Default: if neither is explicitly mentioned, show places only
         return {
             'weather': False,
-            'places': True
+            'places': True,
+            'category': None
         }
     
-    def get_coordinates(self, place_name: str) -> Optional[Tuple[float, float]]:
+    def is_follow_up(self, user_input: str) -> bool:
+        """
+        Whether input is a follow-up about the previous place, like "what about
+        the weather there?": no known place is named and every word is filler
+        
+        Args:
+            user_input: User's input text
+            
+        Returns:
+            True if the input refers back to the conversation's place
+        """
+        if self.place_recognizer.find(user_input):
+            return False
+        words = re.findall(r"[a-z']+", user_input.lower())
+        return bool(words) and all(word in FOLLOW_UP_WORDS for word in words)
+    
+    def _session_follow_up(self, user_input: str, place: Optional[str], session: Optional[Session]) -> bool:
+        """Whether to answer user_input for the session's last place"""
+        return (session is not None and session.place is not None and not place
+                and self.is_follow_up(user_input))
+    
+    def _names_intent(self, user_input: str) -> bool:
+        """Whether input says what it wants (weather, places or a category)"""
+        user_lower = user_input.lower()
+        return (any(keyword in user_lower for keyword in WEATHER_KEYWORDS + PLACES_KEYWORDS) or
+                self.detect_place_category(user_input) is not None)
+    
+    def _freshness(self, lat: float, lon: float, intent: Dict[str, Any]) -> int:
+        """Seconds until an answer with this intent could change: the earliest expiry of the data it uses"""
+        remaining = []
+        if intent['weather']:
+            remaining.append(self.weather_agent.expires_in(lat, lon) or 0.0)
+        if intent['places']:
+            expires = self.places_agent.places_expire_in(lat, lon)
+            # Category answers come from map tiles fetched with (or after) the area's places
+            remaining.append(PLACES_TTL_SECONDS if expires is None else min(expires, PLACES_TTL_SECONDS))
+        return int(min(remaining)) if remaining else 0
+    
+    def _follow_up_intent(self, user_input: str, session: Session) -> Dict[str, Any]:
+        """Intent of a query within a conversation; one naming neither weather nor places repeats the previous request"""
+        if session.intent is None or self._names_intent(user_input):
+            return self.determine_user_intent(user_input)
+        intent = dict(session.intent)
+        if self.extract_forecast_day(user_input):
+            # "what about tomorrow?" asks for that day's weather
+            intent.update(weather=True, places=False, category=None)
+        return intent
+    
+    def detect_place_category(self, user_input: str) -> Optional[str]:
+        """
+        Detect a category-specific places request like "museums in Paris"
+        
+        Args:
+            user_input: User's input text
+            
+        Returns:
+            Category name (e.g. 'museums', 'parks') or None for general requests
+        """
+        user_lower = user_input.lower()
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if any(re.search(rf"\b{re.escape(keyword)}", user_lower) for keyword in keywords):
+                return category
+        return None
+    
+    def extract_forecast_day(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract which day of the trip a weather question is about
+        
+        Args:
+            user_input: User's input text
+            
+        Returns:
+            Dictionary with a 'label' and either an 'offset' in days from today
+            or a 'weekday' (0 = Monday), or None for current weather
+        """
+        user_lower = user_input.lower()
+        
+        if 'day after tomorrow' in user_lower:
+            return {'label': 'the day after tomorrow', 'offset': 2}
+        if re.search(r"\btomorrow\b", user_lower):
+            return {'label': 'tomorrow', 'offset': 1}
+        
+        match = re.search(r"\bin (\d{1,2}) days?\b", user_lower)
+        if match:
+            offset = int(match.group(1))
+            return {'label': f"in {offset} days", 'offset': offset}
+        
+        for weekday, name in enumerate(WEEKDAYS):
+            if re.search(rf"\b{name}\b", user_lower):
+                return {'label': f"on {name.capitalize()}", 'weekday': weekday}
+        
+        if 'next week' in user_lower:
+            return {'label': 'next week', 'offset': 7}
+        
+        return None
+    
+    def _get_forecast_day(self, lat: float, lon: float, when: Dict[str, Any],
+                          deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """Slice one day of the trip out of the cached forecast series"""
+        series = self.weather_agent.get_forecast(lat, lon, deadline=deadline)
+        if not series:
+            return None
+        offset = when['offset'] if 'offset' in when else series.weekday_offset(when['weekday'])
+        return series.day(offset)
+    
+    def _stage_timeout(self, key: str) -> float:
+        """Wait budget for a parallel stage, derived from the upstream breakers' adaptive timeouts"""
+        if key == 'places':
+            # One tile query, with room for the client's retries and hedging
+            return 3 * self.places_agent.overpass.timeout() + 1
+        return get_breaker('open-meteo').timeout() + 1
+    
+    def _collect(self, futures: Dict[Any, Future], deadline: Optional[Deadline]) -> Tuple[Dict[Any, Any], List[Any]]:
+        """
+        Wait for parallel stage futures within their stage timeouts and the deadline
+        
+        Returns:
+            Tuple of (results by key, keys that did not finish in time)
+        """
+        results: Dict[Any, Any] = {}
+        missing: List[Any] = []
+        for key, future in futures.items():
+            stage = key[0] if isinstance(key, tuple) else key
+            wait = self._stage_timeout(stage)
+            if deadline is not None:
+                wait = min(wait, deadline.remaining())
+            try:
+                results[key] = future.result(timeout=wait)
+            except FutureTimeout:
+                print(f"[DEBUG] {key} did not finish within the time budget")
+                missing.append(key)
+            except Exception as e:
+                print(f"Error fetching {key}: {e}")
+        return results, missing
+    
+    @staticmethod
+    def _result(response: str, place: Optional[str] = None,
+                coordinates: Optional[Tuple[float, float]] = None,
+                missing: Optional[List[str]] = None, max_age: int = 0) -> Dict[str, Any]:
+        """Structured answer returned by process_query"""
+        missing = missing or []
+        if missing:
+            parts = " and ".join(missing)
+            response += f"\n\n(Partial answer: {parts} took too long and could not be included.)"
+        return {
+            'response': response,
+            'place': place,
+            'coordinates': coordinates,
+            'partial': bool(missing),
+            'missing': missing,
+            'max_age': 0 if missing else max_age
+        }
+    
+    def get_coordinates(self, place_name: str, deadline: Optional[Deadline] = None) -> Optional[Tuple[float, float]]:
         """
         Get coordinates for a place (delegates to Places Agent)
         
         Args:
             place_name: Name of the place
+            deadline: Optional request deadline
             
         Returns:
             Tuple of (latitude, longitude) or None if place doesn't exist
         """
-        return self.places_agent.get_coordinates(place_name)
+        return self.places_agent.get_coordinates(place_name, deadline)
+    
+    def plan_multi_city(self, user_input: str, place_names: List[str],
+                        deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """
+        Plan a multi-destination trip: resolve all places concurrently, fetch
+        their weather and attractions in parallel and order the visits
+        
+        Args:
+            user_input: User's input text
+            place_names: Destinations extracted from the input
+            deadline: Optional request deadline
+            
+        Returns:
+            Result dictionary (see process_query), or None when fewer than two places resolve
+        """
+        intent = self.determine_user_intent(user_input)
+        
+        with ThreadPoolExecutor(max_workers=len(place_names), initializer=request_worker()) as executor:
+            resolved = list(executor.map(lambda name: self.get_coordinates(name, deadline), place_names))
+        
+        stops = [(getattr(coords, 'corrected', None) or name, coords)
+                 for name, coords in zip(place_names, resolved) if coords]
+        unknown = [name for name, coords in zip(place_names, resolved) if not coords]
+        if len(stops) < 2:
+            return None
+        
+        points = [coords for _, coords in stops]
+        order, total_km = plan_route(points)
+        
+        weather: List[Optional[Dict[str, Any]]] = [None] * len(stops)
+        places: List[Optional[List[str]]] = [None] * len(stops)
+        
+        executor = ThreadPoolExecutor(max_workers=len(stops) + 1, initializer=request_worker())
+        try:
+            futures: Dict[Any, Future] = {}
+            
+            # All destinations share one bulk weather request
+            if intent['weather']:
+                futures['weather'] = executor.submit(self.weather_agent.get_weather_many, points, False, deadline)
+            
+            if intent['places']:
+                for i, (lat, lon) in enumerate(points):
+                    if intent['category']:
+                        futures[('places', i)] = executor.submit(
+                            self.places_agent.get_places_by_category, lat, lon, intent['category'], 3, deadline
+                        )
+                    else:
+                        futures[('places', i)] = executor.submit(
+                            self.places_agent.get_tourist_places, lat, lon, 3, deadline
+                        )
+            
+            results, late = self._collect(futures, deadline)
+        finally:
+            # Don't wait for stragglers past the deadline
+            executor.shutdown(wait=False)
+        
+        if results.get('weather'):
+            weather = results['weather']
+        for key, result in results.items():
+            if isinstance(key, tuple):
+                places[key[1]] = result
+        
+        lines = [f"Suggested route for your trip ({int(total_km)} km in total):", ""]
+        for step, i in enumerate(order, start=1):
+            name = stops[i][0]
+            line = f"{step}. {name}"
+            data = weather[i]
+            if data and data.get("success"):
+                temp = data.get("temperature", "N/A")
+                temp_str = f"{int(temp)}" if isinstance(temp, (int, float)) else str(temp)
+                line += f" - currently {temp_str}°C, {data.get('precipitation_probability', 0)}% chance of rain"
+            lines.append(line)
+            if places[i]:
+                lines.append(f"   Places: {', '.join(places[i])}")
+        
+        if unknown:
+            lines.append("")
+            lines.append(f"I couldn't find: {', '.join(unknown)}")
+        
+        missing = ['weather' if key == 'weather' else f"attractions for {stops[key[1]][0]}" for key in late]
+        return self._result("\n".join(lines), ', '.join(name for name, _ in stops), None, missing)
     
-    def process_request(self, user_input: str) -> str:
+    def process_request(self, user_input: str, deadline: Optional[Deadline] = None) -> str:
         """
         Main method to process user request - optimized for speed with parallel processing
         
         Args:
             user_input: User's input text
+            deadline: Optional overall time budget for the request
             
         Returns:
             Formatted response string
         """
-        # Extract place name (case-insensitive)
-        place_name = self.extract_place_name(user_input)
+        return self.process_query(user_input, deadline)['response']
+    
+    def process_query(self, user_input: str, deadline: Optional[Deadline] = None,
+                      place: Optional[str] = None, session: Optional[Session] = None,
+                      forwarded: bool = False) -> Dict[str, Any]:
+        """
+        Process a user request within an optional deadline
+        Every agent call sizes its timeout from the remaining budget; when the
+        budget runs out the answer contains whatever has completed
+        
+        Args:
+            user_input: User's input text
+            deadline: Optional overall time budget for the request
+            place: Place already chosen by the user (e.g. an autocomplete
+                   suggestion); skips place extraction, and geocoding too
+                   when the place is known to the suggestion index
+            session: Optional conversation context; follow-ups like "what
+                     about tomorrow?" reuse its place without extraction or
+                     geocoding, and answered places are remembered in it
+            forwarded: The query was forwarded by another cluster node, so it
+                       is answered here whoever owns the place
+            
+        Returns:
+            Dictionary with 'response' text, resolved 'place' and 'coordinates',
+            a 'partial' flag, the 'missing' parts of a partial answer, the
+            seconds the same query would get the same answer ('max_age', 0
+            when the answer depends on the session or is partial) and
+            per-stage 'timings' in milliseconds
+        """
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        result = self._answer_query(user_input, deadline, place, session, forwarded, timings)
+        timings['total'] = round((time.perf_counter() - start) * 1000, 1)
+        # Copy: stages still running past the deadline may record late
+        result['timings'] = dict(timings)
+        return result
+    
+    def answerable_from_cache(self, user_input: str, place: Optional[str] = None,
+                              session: Optional[Session] = None) -> bool:
+        """
+        Predict whether process_query can answer from local caches alone
+        Only runs the cheap local steps (extraction and cache lookups), so
+        admission control can send the request to the fast lane
         
-        if not place_name:
-            return "I couldn't identify the place you want to visit. Please specify a place name."
+        Args:
+            user_input: User's input text
+            place: Place already chosen by the user, as for process_query
+            session: Conversation context, as for process_query
+            
+        Returns:
+            True if no upstream call should be needed
+        """
+        follow_up = self._session_follow_up(user_input, place, session)
+        known = self.place_suggester.resolve(place) if place else None
+        if follow_up:
+            coordinates = session.coordinates
+        elif known:
+            coordinates = known[1]
+        else:
+            if place:
+                place_name = place.strip()
+            elif len(self.extract_place_names(user_input)) >= 2:
+                # Multi-city plans fan out to several upstream calls
+                return False
+            else:
+                place_name = self.extract_place_name(user_input)
+            if not place_name:
+                return True
+            if not self.places_agent.has_cached_coordinates(place_name):
+                return False
+            coordinates = self.places_agent.get_coordinates(place_name)
+            if not coordinates:
+                # Cached "not found"
+                return True
+        
+        lat, lon = coordinates
+        if session is not None and session.intent is not None:
+            intent = self._follow_up_intent(user_input, session)
+        else:
+            intent = self.determine_user_intent(user_input)
+        if intent['weather']:
+            forecast = self.extract_forecast_day(user_input) is not None
+            if not self.weather_agent.has_cached(lat, lon, forecast):
+                return False
+        if intent['places'] and not self.places_agent.has_cached_places(lat, lon, 5, intent['category']):
+            return False
+        return True
+    
+    @staticmethod
+    @contextmanager
+    def _stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+        """Add the wall time of a block to timings[name] (milliseconds)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            timings[name] = round(timings.get(name, 0.0) + elapsed, 1)
+    
+    def _timed(self, timings: Dict[str, float], name: str, function: Callable, *args: Any) -> Any:
+        """Call function(*args) on a worker thread, recording its wall time"""
+        with self._stage(timings, name):
+            return function(*args)
+    
+    def _forward(self, node: str, user_input: str, place: Optional[str], session: Optional[Session],
+                 deadline: Optional[Deadline]) -> Optional[Dict[str, Any]]:
+        """
+        Answer a query on the cluster node owning its place
+        
+        Args:
+            node: Base URL of the owning node
+            user_input: User's input text
+            place: Place chosen by the user, as for process_query
+            session: Conversation context; sent along, and updated from the owner's answer
+            deadline: Optional overall time budget for the request
+            
+        Returns:
+            The owner's process_query result, or None to answer locally
+        """
+        body = self.cluster.forward(node, {
+            'query': user_input,
+            'place': place,
+            'session': session is not None,
+            'context': session.context() if session is not None else None,
+        }, deadline)
+        if body is None:
+            return None
+        result = body['result']
+        if session is not None:
+            session.restore(body.get('context'))
+        if result.get('place') and result.get('coordinates'):
+            # Keep autocomplete aware of places answered elsewhere
+            self.place_suggester.record(result['place'], tuple(result['coordinates']))
+        return result
+    
+    def _answer_query(self, user_input: str, deadline: Optional[Deadline], place: Optional[str],
+                      session: Optional[Session], forwarded: bool, timings: Dict[str, float]) -> Dict[str, Any]:
+        """Body of process_query; fills timings as stages complete"""
+        follow_up = self._session_follow_up(user_input, place, session)
+        if follow_up:
+            known = (session.place, session.coordinates)
+        else:
+            known = self.place_suggester.resolve(place) if place else None
+        if known:
+            place_name, coordinates = known
+        else:
+            if place:
+                place_name = place.strip()
+            else:
+                # Several destinations switch to multi-city planning
+                with self._stage(timings, 'extract'):
+                    place_names = self.extract_place_names(user_input)
+                if len(place_names) >= 2:
+                    with self._stage(timings, 'multi_city'):
+                        itinerary = self.plan_multi_city(user_input, place_names, deadline)
+                    if itinerary:
+                        return itinerary
+                
+                # Extract place name (case-insensitive)
+                with self._stage(timings, 'extract'):
+                    place_name = self.extract_place_name(user_input)
+            
+            if not place_name:
+                return self._result("I couldn't identify the place you want to visit. Please specify a place name.")
+            coordinates = None
         
-        # Get coordinates to verify place exists
-        coordinates = self.get_coordinates(place_name)
+        # In a cluster, the node owning the place answers (and caches) it
+        if self.cluster is not None and not forwarded:
+            owner = self.cluster.owner(place_name)
+            if owner is not None:
+                with self._stage(timings, 'forward'):
+                    result = self._forward(owner, user_input, place, session, deadline)
+                if result is not None:
+                    return result
         
-        if not coordinates:
-            return f"I don't know this place exists. Could you please check the spelling or provide more details about the location?"
+        if coordinates is None:
+            # Get coordinates to verify place exists
+            with self._stage(timings, 'geocode'):
+                coordinates = self.get_coordinates(place_name, deadline)
+            
+            if not coordinates:
+                if deadline is not None and deadline.expired():
+                    return self._result(f"I couldn't look up {place_name} in time.", place_name,
+                                        missing=['the place lookup'])
+                return self._result(f"I don't know this place exists. Could you please check the spelling or provide more details about the location?", place_name)
+        
+        # Answer and record a misspelled place by its corrected spelling, so the
+        # typo never becomes an autocomplete entry
+        place_name = getattr(coordinates, 'corrected', None) or place_name
         
+        # Extracted names the geocoder matched to a town or city join autocomplete
+        # at once; anything else, including free text sent as 'place', only
+        # once it has been asked for repeatedly
+        trusted = not place and getattr(coordinates, 'settlement', False)
+        self.place_suggester.record(place_name, coordinates, trusted)
+        if place and known and not follow_up:
+            # A suggestion the user picked is a trusted name for later queries; free
+            # text sent as 'place' is not, since the gazetteer is shared by all clients
+            self.place_recognizer.add(place_name)
+        if self.refresh_scheduler is not None:
+            self.refresh_scheduler.record(place_name, coordinates)
         lat, lon = coordinates
         
-        # Determine user intent
-        intent = self.determine_user_intent(user_input)
+        # Determine user intent; within a conversation, a question naming
+        # neither weather nor places ("what about Rome?") repeats the last request
+        if session is not None and session.intent is not None:
+            intent = self._follow_up_intent(user_input, session)
+        else:
+            intent = self.determine_user_intent(user_input)
+        forecast_day = self.extract_forecast_day(user_input) if intent['weather'] else None
         
         # Use parallel processing for faster results
         weather_response = None
         places = None
+        # Days past the forecast horizon are answered without asking upstream
+        beyond_horizon = bool(forecast_day) and forecast_day.get('offset', 0) >= MAX_FORECAST_DAYS
+        if beyond_horizon:
+            weather_response = self.weather_agent.format_beyond_horizon_response(place_name, forecast_day['label'])
         
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {}
+        executor = ThreadPoolExecutor(max_workers=2, initializer=request_worker())
+        try:
+            futures: Dict[Any, Future] = {}
             
             # Submit weather request if needed
-            if intent['weather']:
-                futures['weather'] = executor.submit(self.weather_agent.get_weather, lat, lon)
+            if forecast_day and not beyond_horizon:
+                futures['forecast'] = executor.submit(self._timed, timings, 'weather',
+                                                      self._get_forecast_day, lat, lon, forecast_day, deadline)
+            elif intent['weather'] and not forecast_day:
+                futures['weather'] = executor.submit(self._timed, timings, 'weather',
+                                                     self.weather_agent.get_weather, lat, lon, deadline)
             
             # Submit places request if needed
-            if intent['places']:
-                futures['places'] = executor.submit(self.places_agent.get_tourist_places, lat, lon, 5)
-            
-            # Collect results as they complete
-            for key, future in futures.items():
-                try:
-                    result = future.result(timeout=30)
-                    if key == 'weather' and result:
-                        weather_response = self.weather_agent.format_weather_response(place_name, result)
-                    elif key == 'places' and result:
-                        places = result
-                except Exception as e:
-                    print(f"Error fetching {key}: {e}")
+            if intent['places'] and intent['category']:
+                futures['places'] = executor.submit(
+                    self._timed, timings, 'places',
+                    self.places_agent.get_places_by_category, lat, lon, intent['category'], 5, deadline
+                )
+            elif intent['places']:
+                futures['places'] = executor.submit(self._timed, timings, 'places',
+                                                    self.places_agent.get_tourist_places, lat, lon, 5, deadline)
+            
+            # Collect results as they complete, up to the deadline
+            results, late = self._collect(futures, deadline)
+        finally:
+            # Don't wait for stragglers past the deadline
+            executor.shutdown(wait=False)
+        
+        if results.get('weather'):
+            weather_response = self.weather_agent.format_weather_response(place_name, results['weather'])
+        elif 'forecast' in results:
+            weather_response = self.weather_agent.format_forecast_response(
+                place_name, results['forecast'], forecast_day['label']
+            )
+        if results.get('places'):
+            places = results['places']
+        
+        missing = ['attractions' if key == 'places' else 'weather' for key in late]
+        
+        stale_note = ""
+        if places is not None and getattr(places, 'stale', False):
+            stale_note = "\n\n(Attractions are from an earlier lookup; live data is temporarily unavailable.)"
         
         # Format response based on what was requested
         if weather_response and places:
             # Both weather and places
             places_list = "\n".join(places)
-            return f"{weather_response}. And these are the places you can go:\n\n{places_list}"
+            response = f"{weather_response}. And these are the places you can go:\n\n{places_list}{stale_note}"
         elif weather_response:
             # Only weather
-            return weather_response
+            response = weather_response
         elif places:
             # Only places
-            return self.places_agent.format_places_response(place_name, places)
+            response = self.places_agent.format_places_response(place_name, places, intent['category']) + stale_note
+        elif missing:
+            response = f"I couldn't fetch information for {place_name} in time."
         else:
-            return f"I couldn't fetch information for {place_name}. Please try again."
-
+            response = f"I couldn't fetch information for {place_name}. Please try again."
+        
+        # Answers that depend on the conversation, on fallback data or on a
+        # failed lookup are not reusable
+        contextual = follow_up or (session is not None and session.intent is not None
+                                   and not self._names_intent(user_input))
+        weather = results.get('weather') or results.get('forecast')
+        weather_ok = beyond_horizon or bool(weather and weather.get('success') and not weather.get('stale'))
+        complete = (weather_ok or not intent['weather']) and (bool(places) or not intent['places'])
+        max_age = 0
+        if not contextual and not stale_note and complete:
+            max_age = self._freshness(lat, lon, intent)
+        
+        if session is not None:
+            session.remember(place_name, coordinates, intent)
+        return self._result(response, place_name, coordinates, missing, max_age)
@@ -0,0 +1,91 @@
+"""
+Traffic Capture - sampled JSONL log of /query requests
+Each captured request is one JSON line with its timestamp, query, resolved
+place and per-stage latency; replay_traffic.py drives the same traffic
+against a running app. Disabled unless CAPTURE_PATH is set
+
+Environment:
+    CAPTURE_PATH         capture file (e.g. captures/traffic.jsonl); "{pid}" is
+                         replaced by the process id so each gunicorn worker
+                         rotates its own file
+    CAPTURE_SAMPLE_RATE  fraction of requests captured (default 1.0)
+    CAPTURE_MAX_BYTES    rotate the file at this size (default 50 MB)
+    CAPTURE_BACKUPS      rotated files kept (default 5)
+"""
+import json
+import logging
+import os
+import random
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional
+
+
+class TrafficCapture:
+    """Append sampled request records to a size-rotated JSONL file"""
+
+    def __init__(self, path: str, sample_rate: float = 1.0,
+                 max_bytes: int = 50 * 1024 * 1024, backups: int = 5):
+        """
+        Args:
+            path: Capture file; rotated copies get .1, .2, ... suffixes
+            sample_rate: Fraction of requests written (0 to 1)
+            max_bytes: Size at which the file is rotated
+            backups: Number of rotated files kept
+        """
+        self.path = path
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # RotatingFileHandler serialises writes and handles rotation
+        self._logger = logging.getLogger(f"traffic_capture.{path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    @classmethod
+    def from_env(cls) -> Optional["TrafficCapture"]:
+        """Capture configured from the environment, or None when disabled"""
+        path = os.environ.get("CAPTURE_PATH")
+        if not path:
+            return None
+        return cls(
+            path.replace("{pid}", str(os.getpid())),
+            sample_rate=float(os.environ.get("CAPTURE_SAMPLE_RATE", 1.0)),
+            max_bytes=int(os.environ.get("CAPTURE_MAX_BYTES", 50 * 1024 * 1024)),
+            backups=int(os.environ.get("CAPTURE_BACKUPS", 5)),
+        )
+
+    def sampled(self) -> bool:
+        """Decide whether the current request is captured"""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, query: str, place: Optional[str], result: Optional[Dict[str, Any]],
+               status: int, started_at: float, latency_ms: float) -> None:
+        """
+        Write one request record
+
+        Args:
+            query: Query text as received
+            place: Place chosen by the client, if any
+            result: process_query result (None when the request failed)
+            status: HTTP status returned
+            started_at: Unix time the request arrived
+            latency_ms: Total handler latency in milliseconds
+        """
+        entry: Dict[str, Any] = {
+            "ts": round(started_at, 3),
+            "query": query,
+            "place": place,
+            "status": status,
+            "latency_ms": round(latency_ms, 1),
+        }
+        if result is not None:
+            entry["resolved_place"] = result.get("place")
+            entry["coordinates"] = result.get("coordinates")
+            entry["partial"] = result.get("partial", False)
+            entry["stages"] = result.get("timings", {})
+        self._logger.info(json.dumps(entry, ensure_ascii=False))
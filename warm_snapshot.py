@@ -0,0 +1,169 @@
+"""
+Warm Snapshot - precomputed caches for fast cold starts
+A marshal-encoded file holding geocodes, attractions and the map tiles
+around top destinations, built once at deploy time and loaded when the
+agent is constructed, so the first users of a fresh instance skip the
+geocoding delay and the Overpass round trips
+
+Usage:
+    python warm_snapshot.py build --with-places    # at build time
+    python warm_snapshot.py info warm_snapshot.bin
+
+Environment:
+    WARM_SNAPSHOT_PATH          snapshot to load (default warm_snapshot.bin next
+                                to this module, if present; empty disables)
+    WARM_SNAPSHOT_MAX_AGE_DAYS  places in a younger snapshot count as freshly
+                                fetched; older ones only serve as stale fallback
+                                (default 7)
+"""
+import argparse
+import marshal
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from known_places import SEED_PLACES
+
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_snapshot.bin")
+
+
+def snapshot_path() -> Optional[str]:
+    """Snapshot file to load at startup, or None when there is none"""
+    path = os.environ.get("WARM_SNAPSHOT_PATH")
+    if path is None:
+        return DEFAULT_SNAPSHOT_PATH if os.path.exists(DEFAULT_SNAPSHOT_PATH) else None
+    return path or None
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """Decode a snapshot file, or None if it is missing, corrupt or from another version"""
+    try:
+        with open(path, "rb") as snapshot_file:
+            data = marshal.load(snapshot_file)
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        print(f"Warm snapshot error: {e}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        print(f"Warm snapshot {path} has an unsupported format, ignoring it")
+        return None
+    return data
+
+
+def apply_snapshot(agent, data: Dict[str, Any]) -> None:
+    """
+    Seed a TourismAgent's caches from decoded snapshot data
+
+    Args:
+        agent: TourismAgent whose places agent and suggester are seeded
+        data: Snapshot dictionary as returned by read_snapshot
+    """
+    created = data.get("created", 0.0)
+    max_age = float(os.environ.get("WARM_SNAPSHOT_MAX_AGE_DAYS", 7)) * 86400
+    fetched_at = time.time() if time.time() - created < max_age else created
+
+    for name, latitude, longitude in data.get("geocodes", ()):
+        agent.places_agent.seed_coordinates(name, (latitude, longitude))
+        agent.place_suggester.add(name, (latitude, longitude))
+    for latitude, longitude, places in data.get("places", ()):
+        agent.places_agent.seed_places(latitude, longitude, places, fetched_at)
+    for zoom, x, y, features in data.get("tiles", ()):
+        agent.places_agent.seed_tile((zoom, x, y), features, fetched_at)
+
+
+def load_default_snapshot(agent) -> None:
+    """Load the configured snapshot into a freshly constructed agent, if there is one"""
+    path = snapshot_path()
+    if not path:
+        return
+    start = time.perf_counter()
+    data = read_snapshot(path)
+    if data is None:
+        return
+    apply_snapshot(agent, data)
+    print(f"[DEBUG] Loaded warm snapshot {path}: {len(data.get('geocodes', ()))} geocodes, "
+          f"{len(data.get('places', ()))} place lists, {len(data.get('tiles', ()))} tiles in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def build_snapshot(path: str, top: Optional[int] = None, with_places: bool = False,
+                   workers: int = 2) -> Dict[str, Any]:
+    """
+    Build a snapshot for the seed destinations and write it to path
+
+    Args:
+        path: Output file
+        top: Only include the first top seed destinations (default: all)
+        with_places: Fetch attractions for each destination (needs Overpass)
+        workers: Concurrent Overpass fetches when with_places is set
+
+    Returns:
+        The snapshot dictionary that was written
+    """
+    destinations = list(SEED_PLACES[:top])
+    places: List[Any] = []
+    tiles: Dict[Any, Any] = {}
+    if with_places:
+        from concurrent.futures import ThreadPoolExecutor
+        from places_agent import PlacesAgent
+        places_agent = PlacesAgent()
+
+        def fetch(destination):
+            name, latitude, longitude = destination
+            places_agent.get_tourist_places(latitude, longitude, 10)
+            return destination, places_agent.export_places(latitude, longitude)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for (name, latitude, longitude), exported in executor.map(fetch, destinations):
+                if exported:
+                    names, covering = exported
+                    places.append((latitude, longitude, names))
+                    # Neighbouring destinations can share tiles
+                    for tile, features in covering:
+                        tiles[tile] = features
+                else:
+                    print(f"No places fetched for {name}", file=sys.stderr)
+
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        "geocodes": [(name, latitude, longitude) for name, latitude, longitude in destinations],
+        "places": places,
+        "tiles": [(*tile, features) for tile, features in tiles.items()],
+    }
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as snapshot_file:
+        marshal.dump(data, snapshot_file)
+    os.replace(temporary, path)
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the warm cache snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a snapshot for the top seed destinations")
+    build.add_argument("--out", default=DEFAULT_SNAPSHOT_PATH)
+    build.add_argument("--top", type=int, help="only the first N seed destinations (default: all)")
+    build.add_argument("--with-places", action="store_true", help="also fetch attractions from Overpass")
+    build.add_argument("--workers", type=int, default=2, help="concurrent Overpass fetches")
+    info = commands.add_parser("info", help="describe a snapshot file")
+    info.add_argument("path", nargs="?", default=DEFAULT_SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        data = build_snapshot(args.out, args.top, args.with_places, args.workers)
+        print(f"Wrote {args.out}: {len(data['geocodes'])} geocodes, {len(data['places'])} place lists, "
+              f"{len(data['tiles'])} tiles, {os.path.getsize(args.out)} bytes")
+    else:
+        start = time.perf_counter()
+        data = read_snapshot(args.path)
+        if data is None:
+            sys.exit(1)
+        age_hours = (time.time() - data["created"]) / 3600
+        print(f"{args.path}: version {data['version']}, {age_hours:.1f} hours old, "
+              f"{len(data['geocodes'])} geocodes, {len(data['places'])} place lists, "
+              f"{len(data.get('tiles', ()))} tiles, decoded in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,72 +2,411 @@
 Weather Agent - Child Agent 1
 Fetches current weather and forecast using Open-Meteo API
 """
+import math
+import os
+import time
 import requests
-from typing import Dict, Optional, Tuple, Any
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Any
+
+from circuit_breaker import get_breaker
+from deadline import Deadline
+from lru import LRUCache
+
+# Open-Meteo serves at most 16 forecast days
+MAX_FORECAST_DAYS = 16
+FORECAST_TTL_SECONDS = 3600
+WEATHER_TTL_SECONDS = 600
+# Locations whose forecast series are kept (a 16-day series is a few KB)
+FORECAST_CACHE_MAX_ENTRIES = int(os.environ.get("FORECAST_CACHE_MAX_ENTRIES", 5000))
+# Locations whose current weather readings are kept
+WEATHER_CACHE_MAX_ENTRIES = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES", 20000))
+# Locations per bulk request; Open-Meteo accepts comma-separated coordinate lists
+BULK_CHUNK_SIZE = 100
+
+CURRENT_VARIABLES = "temperature_2m,precipitation_probability"
+
+HOURLY_VARIABLES = ("temperature_2m", "precipitation_probability")
+DAILY_VARIABLES = ("temperature_2m_max", "temperature_2m_min",
+                   "precipitation_probability_max", "precipitation_sum")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def _float_array(values: Optional[List[Any]]) -> array:
+    """Pack a JSON series into a float32 array, with NaN for missing values"""
+    return array("f", (math.nan if value is None else value for value in values or ()))
+
+
+def _value(series: array, index: int) -> Optional[float]:
+    """Read one value back, rounded to the API's single decimal"""
+    value = series[index]
+    return None if math.isnan(value) else round(value, 1)
+
+
+class ForecastSeries:
+    """Hourly and daily forecast for one location, stored as typed arrays"""
+    
+    __slots__ = ("utc_offset", "hourly_time", "hourly", "daily_time", "daily", "fetched_at")
+    
+    def __init__(self, data: Dict[str, Any]):
+        self.utc_offset = int(data.get("utc_offset_seconds", 0))
+        hourly = data.get("hourly", {})
+        daily = data.get("daily", {})
+        # Times are unix seconds (timeformat=unixtime); daily times are local midnights
+        self.hourly_time = array("q", hourly.get("time", ()))
+        self.hourly = {name: _float_array(hourly.get(name)) for name in HOURLY_VARIABLES}
+        self.daily_time = array("q", daily.get("time", ()))
+        self.daily = {name: _float_array(daily.get(name)) for name in DAILY_VARIABLES}
+        self.fetched_at = time.time()
+    
+    @property
+    def days(self) -> int:
+        return len(self.daily_time)
+    
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at >= FORECAST_TTL_SECONDS
+    
+    def local_today(self) -> datetime:
+        """Current date at the location (first forecast day)"""
+        return datetime.fromtimestamp(self.daily_time[0] + self.utc_offset, tz=timezone.utc)
+    
+    def day(self, offset: int) -> Optional[Dict[str, Any]]:
+        """
+        Daily summary for the day offset days after today at the location
+        
+        Args:
+            offset: 0 for today, 1 for tomorrow, ...
+            
+        Returns:
+            Dictionary with the day's forecast or None if outside the series
+        """
+        if not 0 <= offset < self.days:
+            return None
+        date = datetime.fromtimestamp(self.daily_time[offset] + self.utc_offset, tz=timezone.utc).date()
+        return {
+            "date": date.isoformat(),
+            "weekday": WEEKDAYS[date.weekday()],
+            "temperature_max": _value(self.daily["temperature_2m_max"], offset),
+            "temperature_min": _value(self.daily["temperature_2m_min"], offset),
+            "precipitation_probability": _value(self.daily["precipitation_probability_max"], offset),
+            "precipitation_sum": _value(self.daily["precipitation_sum"], offset),
+            "stale": self.is_stale(),
+            "success": True
+        }
+    
+    def weekday_offset(self, weekday: int) -> int:
+        """Offset of the next given weekday (0 = Monday), today included"""
+        return (weekday - self.local_today().weekday()) % 7
+    
+    def days_between(self, start: int, end: int) -> List[Dict[str, Any]]:
+        """Daily summaries for offsets start..end-1 (clipped to the series)"""
+        return [self.day(offset) for offset in range(max(start, 0), min(end, self.days))]
+    
+    def hour(self, when: float) -> Optional[Dict[str, Any]]:
+        """
+        Hourly values for the hour containing a unix timestamp
+        
+        Args:
+            when: Unix timestamp
+            
+        Returns:
+            Dictionary with the hour's forecast or None if outside the series
+        """
+        if not self.hourly_time:
+            return None
+        # Hourly steps are uniform, so the slot is computed rather than searched
+        index = int((when - self.hourly_time[0]) // 3600)
+        if not 0 <= index < len(self.hourly_time):
+            return None
+        temperature = _value(self.hourly["temperature_2m"], index)
+        precipitation = _value(self.hourly["precipitation_probability"], index)
+        return {
+            "time": self.hourly_time[index],
+            "temperature": temperature if temperature is not None else "N/A",
+            "precipitation_probability": int(precipitation) if precipitation is not None else 0,
+            "success": True
+        }
+    
+    def nbytes(self) -> int:
+        """Bytes held by the series arrays"""
+        arrays = [self.hourly_time, self.daily_time, *self.hourly.values(), *self.daily.values()]
+        return sum(series.itemsize * len(series) for series in arrays)
 
 
 class WeatherAgent:
     """Agent responsible for fetching weather information"""
     
     def __init__(self):
-        self.base_url = "https://api.open-meteo.com/v1/forecast"
+        self.base_url = os.environ.get("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+        self.breaker = get_breaker("open-meteo")
+        # location key -> ForecastSeries, kept past expiry as a stale fallback
+        self._forecast_cache = LRUCache(FORECAST_CACHE_MAX_ENTRIES)
+        # location key -> (fetched_at, current weather), kept past expiry as a stale fallback
+        self._weather_cache = LRUCache(WEATHER_CACHE_MAX_ENTRIES)
+    
+    @staticmethod
+    def _location_key(latitude: float, longitude: float) -> Tuple[float, float]:
+        """Cache key for a location (rounded to ~1 km, finer than forecast grids)"""
+        return (round(latitude, 2), round(longitude, 2))
     
-    def get_weather(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+    def expires_in(self, latitude: float, longitude: float) -> Optional[float]:
         """
-        Get current weather and forecast for given coordinates
+        Seconds until get_weather would have to call upstream for a location
+        
+        Returns:
+            Remaining freshness (0 once expired), or None if nothing was ever fetched
+        """
+        key = self._location_key(latitude, longitude)
+        series = self._forecast_cache.get(key)
+        cached = self._weather_cache.get(key)
+        if not series and not cached:
+            return None
+        now = time.time()
+        remaining = 0.0
+        if series:
+            remaining = max(remaining, FORECAST_TTL_SECONDS - (now - series.fetched_at))
+        if cached:
+            remaining = max(remaining, WEATHER_TTL_SECONDS - (now - cached[0]))
+        return remaining
+    
+    def forecast_expires_in(self, latitude: float, longitude: float) -> Optional[float]:
+        """Seconds until the cached forecast series expires (0 once expired), or None if never fetched"""
+        series = self._forecast_cache.get(self._location_key(latitude, longitude))
+        if not series:
+            return None
+        return max(0.0, FORECAST_TTL_SECONDS - (time.time() - series.fetched_at))
+    
+    def has_cached(self, latitude: float, longitude: float, forecast: bool = False) -> bool:
+        """Whether current weather (or with forecast=True, the forecast series) is cached and fresh"""
+        key = self._location_key(latitude, longitude)
+        series = self._forecast_cache.get(key)
+        if series and not series.is_stale():
+            return True
+        if forecast:
+            return False
+        cached = self._weather_cache.get(key)
+        return bool(cached) and time.time() - cached[0] < WEATHER_TTL_SECONDS
+    
+    def get_forecast(self, latitude: float, longitude: float, days: int = MAX_FORECAST_DAYS,
+                     deadline: Optional[Deadline] = None, refresh: bool = False) -> Optional[ForecastSeries]:
+        """
+        Get the hourly and daily forecast series for given coordinates
+        The whole series is fetched in one request and cached, so any day or
+        hour of a trip is answered by slicing the cached arrays
         
         Args:
             latitude: Latitude of the location
             longitude: Longitude of the location
+            days: Number of forecast days needed (1-16)
+            deadline: Optional request deadline bounding the upstream call
+            refresh: Refetch even if a fresh series is cached
             
         Returns:
-            Dictionary with weather information or None if error
+            ForecastSeries or None if error
         """
+        days = max(1, min(days, MAX_FORECAST_DAYS))
+        key = self._location_key(latitude, longitude)
+        cached = self._forecast_cache.get(key)
+        if cached and cached.days >= days and not cached.is_stale() and not refresh:
+            return cached
+        
         try:
+            # Always fetch the full range so later questions hit the cache
             params = {
                 "latitude": latitude,
                 "longitude": longitude,
-                "current": "temperature_2m,precipitation_probability",
-                "forecast_days": 1
+                "hourly": ",".join(HOURLY_VARIABLES),
+                "daily": ",".join(DAILY_VARIABLES),
+                "forecast_days": MAX_FORECAST_DAYS,
+                "timezone": "auto",
+                "timeformat": "unixtime"
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
+            response = self.breaker.request("GET", self.base_url, deadline=deadline, params=params)
             
             data = response.json()
+            if "hourly" not in data or "daily" not in data:
+                return None
             
-            if "current" in data:
-                current = data["current"]
-                temperature = current.get("temperature_2m")
-                precipitation_prob = current.get("precipitation_probability", 0)
-                
-                # Handle None temperature values
-                if temperature is None:
-                    temperature = "N/A"
-                else:
-                    # Ensure temperature is a number
-                    try:
-                        temperature = float(temperature)
-                    except (ValueError, TypeError):
-                        temperature = "N/A"
-                
-                # Ensure precipitation_probability is a number
-                try:
-                    precipitation_prob = int(precipitation_prob) if precipitation_prob is not None else 0
-                except (ValueError, TypeError):
-                    precipitation_prob = 0
-                
-                return {
-                    "temperature": temperature,
-                    "precipitation_probability": precipitation_prob,
-                    "success": True
-                }
+            series = ForecastSeries(data)
+            self._forecast_cache[key] = series
+            print(f"[DEBUG] Cached {series.days}-day forecast ({series.nbytes()} bytes)")
+            return series
             
+        except requests.exceptions.RequestException as e:
+            print(f"Weather API error: {e}")
+            # Serve the last known series (day() marks it stale)
+            return cached
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Error parsing forecast response: {e}")
             return None
+    
+    def get_forecast_day(self, latitude: float, longitude: float, offset: int,
+                         deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the daily forecast for a day of the trip
+        
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            offset: Days after today at the location (0 = today)
+            deadline: Optional request deadline bounding the upstream call
+            
+        Returns:
+            Dictionary with the day's forecast or None if unavailable
+        """
+        series = self.get_forecast(latitude, longitude, offset + 1, deadline)
+        return series.day(offset) if series else None
+    
+    def get_weather(self, latitude: float, longitude: float,
+                    deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get current weather and forecast for given coordinates
+        
+        Args:
+            latitude: Latitude of the location
+            longitude: Longitude of the location
+            deadline: Optional request deadline bounding the upstream call
+            
+        Returns:
+            Dictionary with weather information or None if error
+        """
+        # A cached forecast already holds the current hour
+        series = self._forecast_cache.get(self._location_key(latitude, longitude))
+        if series and time.time() - series.fetched_at < FORECAST_TTL_SECONDS:
+            current = series.hour(time.time())
+            if current:
+                return current
+        
+        key = self._location_key(latitude, longitude)
+        cached = self._weather_cache.get(key)
+        if cached and time.time() - cached[0] < WEATHER_TTL_SECONDS:
+            return cached[1]
+        
+        try:
+            params = {
+                "latitude": latitude,
+                "longitude": longitude,
+                "current": CURRENT_VARIABLES,
+                "forecast_days": 1
+            }
+            
+            response = self.breaker.request("GET", self.base_url, deadline=deadline, params=params)
+            
+            result = self._parse_current(response.json())
+            if result:
+                self._weather_cache[key] = (time.time(), result)
+            return result
             
         except requests.exceptions.RequestException as e:
             print(f"Weather API error: {e}")
+            # Serve the last known reading, marked stale
+            if cached:
+                return dict(cached[1], stale=True)
+            return None
+    
+    def get_weather_many(self, coords: List[Tuple[float, float]], refresh: bool = False,
+                         deadline: Optional[Deadline] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get current weather for many locations with as few requests as possible
+        Cache misses are deduplicated and sent as comma-separated coordinate
+        lists, BULK_CHUNK_SIZE locations per request, and fill the weather cache
+        
+        Args:
+            coords: List of (latitude, longitude) tuples
+            refresh: Refetch every location even if it is cached
+            deadline: Optional request deadline bounding the upstream calls
+            
+        Returns:
+            List of weather dictionaries (or None on error), in input order
+        """
+        now = time.time()
+        keys = [self._location_key(lat, lon) for lat, lon in coords]
+        
+        # One upstream location per distinct cache key; readings are collected
+        # here too, since a large batch can evict its own entries from the cache
+        missing: Dict[Tuple[float, float], Tuple[float, float]] = {}
+        readings: Dict[Tuple[float, float], Tuple[float, Dict[str, Any]]] = {}
+        for key, point in zip(keys, coords):
+            cached = self._weather_cache.get(key)
+            if cached:
+                readings[key] = cached
+            if refresh or not cached or now - cached[0] >= WEATHER_TTL_SECONDS:
+                missing.setdefault(key, point)
+        
+        pending = list(missing.items())
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_CHUNK_SIZE]
+            try:
+                params = {
+                    "latitude": ",".join(str(lat) for _, (lat, _lon) in chunk),
+                    "longitude": ",".join(str(lon) for _, (_lat, lon) in chunk),
+                    "current": CURRENT_VARIABLES,
+                    "forecast_days": 1
+                }
+                
+                response = self.breaker.request("GET", self.base_url, deadline=deadline, params=params)
+                
+                data = response.json()
+                # A single location comes back as an object, several as a list in request order
+                results = data if isinstance(data, list) else [data]
+                print(f"[DEBUG] Bulk weather request returned {len(results)} locations")
+                
+                fetched_at = time.time()
+                for (key, _), location_data in zip(chunk, results):
+                    result = self._parse_current(location_data)
+                    if result:
+                        readings[key] = self._weather_cache[key] = (fetched_at, result)
+                
+            except requests.exceptions.RequestException as e:
+                print(f"Weather API error: {e}")
+        
+        # Entries a failed chunk could not refresh are served stale
+        now = time.time()
+        results: List[Optional[Dict[str, Any]]] = []
+        for key in keys:
+            cached = readings.get(key)
+            if not cached:
+                results.append(None)
+            elif now - cached[0] >= WEATHER_TTL_SECONDS:
+                results.append(dict(cached[1], stale=True))
+            else:
+                results.append(cached[1])
+        return results
+    
+    @staticmethod
+    def _parse_current(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse the 'current' block of an Open-Meteo response"""
+        if "current" not in data:
             return None
+        
+        current = data["current"]
+        temperature = current.get("temperature_2m")
+        precipitation_prob = current.get("precipitation_probability", 0)
+        
+        # Handle None temperature values
+        if temperature is None:
+            temperature = "N/A"
+        else:
+            # Ensure temperature is a number
+            try:
+                temperature = float(temperature)
+            except (ValueError, TypeError):
+                temperature = "N/A"
+        
+        # Ensure precipitation_probability is a number
+        try:
+            precipitation_prob = int(precipitation_prob) if precipitation_prob is not None else 0
+        except (ValueError, TypeError):
+            precipitation_prob = 0
+        
+        return {
+            "temperature": temperature,
+            "precipitation_probability": precipitation_prob,
+            "success": True
+        }
     
     def format_weather_response(self, place_name: str, weather_data: Dict[str, Any]) -> str:
         """
@@ -92,5 +431,41 @@ class WeatherAgent:
         else:
             temp_str = str(temp)
         
+        if weather_data.get("stale"):
+            return f"In {place_name} it was last reported at {temp_str}°C with a chance of {rain_chance}% to rain."
         return f"In {place_name} it's currently {temp_str}°C with a chance of {rain_chance}% to rain."
-
+    
+    def format_beyond_horizon_response(self, place_name: str, when: str) -> str:
+        """Answer for a day past the last forecast day"""
+        return (f"Weather forecasts only reach {MAX_FORECAST_DAYS} days ahead, so I can't tell you "
+                f"the weather in {place_name} {when} yet.")
+    
+    def format_forecast_response(self, place_name: str, day_data: Dict[str, Any], when: str) -> str:
+        """
+        Format a daily forecast into user-friendly response
+        
+        Args:
+            place_name: Name of the place
+            day_data: Daily forecast dictionary from ForecastSeries.day
+            when: How the user referred to the day (e.g. "tomorrow")
+            
+        Returns:
+            Formatted string response
+        """
+        if not day_data or not day_data.get("success"):
+            return f"Sorry, I couldn't fetch the forecast for {place_name} {when}."
+        
+        low = day_data.get("temperature_min")
+        high = day_data.get("temperature_max")
+        rain_chance = day_data.get("precipitation_probability")
+        
+        if isinstance(low, (int, float)) and isinstance(high, (int, float)):
+            temp_str = f"between {int(low)}°C and {int(high)}°C"
+        else:
+            temp_str = "N/A"
+        rain_str = f"{int(rain_chance)}%" if isinstance(rain_chance, (int, float)) else "an unknown"
+        
+        response = f"In {place_name} {when} ({day_data['date']}) it will be {temp_str} with a chance of {rain_str} to rain."
+        if day_data.get("stale"):
+            response += " (last known forecast)"
+        return response